@@ -0,0 +1,99 @@
+# benchmarks/bench_gates.py
+
+"""
+Gate throughput benchmark: per-index Python loop vs. vectorized kernels.
+
+Run from the repository root:
+    python -m benchmarks.bench_gates [--min-qubits 8] [--max-qubits 24] [--loop-max-qubits 16]
+
+The loop reference is the pre-vectorization Hadamard/CNOT implementation
+(SWAP = three CNOTs, as it used to be) and is only timed up to
+--loop-max-qubits (it needs minutes at 24 qubits).
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.alu import QuantumALU
+from src.registers import QuantumRegisters
+
+
+def loop_h_gate(state, num_qubits, qubit):
+    """Reference Hadamard: one Python iteration per basis index."""
+    new_state = np.zeros_like(state)
+    sqrt2 = 1.0 / np.sqrt(2)
+    for i in range(2**num_qubits):
+        i0 = i & ~(1 << qubit)
+        i1 = i | (1 << qubit)
+        if (i >> qubit) & 1 == 0:
+            new_state[i0] += sqrt2 * state[i]
+            new_state[i1] += sqrt2 * state[i]
+        else:
+            new_state[i0] += sqrt2 * state[i]
+            new_state[i1] -= sqrt2 * state[i]
+    return new_state
+
+
+def loop_cnot_gate(state, num_qubits, control, target):
+    """Reference CNOT: one Python iteration per basis index."""
+    new_state = np.zeros_like(state)
+    for i in range(2**num_qubits):
+        if (i >> control) & 1:
+            new_state[i ^ (1 << target)] = state[i]
+        else:
+            new_state[i] = state[i]
+    return new_state
+
+
+def loop_swap_gate(state, num_qubits, q1, q2):
+    """Reference SWAP: three loop CNOTs."""
+    state = loop_cnot_gate(state, num_qubits, q1, q2)
+    state = loop_cnot_gate(state, num_qubits, q2, q1)
+    return loop_cnot_gate(state, num_qubits, q1, q2)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-qubits", type=int, default=8)
+    parser.add_argument("--max-qubits", type=int, default=24)
+    parser.add_argument("--step", type=int, default=4)
+    parser.add_argument("--loop-max-qubits", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'qubits':>6} {'gate':>5} {'loop [s]':>12} {'vector [s]':>12} {'speedup':>10}")
+    for n in range(args.min_qubits, args.max_qubits + 1, args.step):
+        qregs = QuantumRegisters(num_qubits=n)
+        alu = QuantumALU(qregs)
+        alu.h_gate(0)
+        target = n // 2
+        cases = [
+            ("h", lambda: alu.h_gate(target),
+                  lambda: loop_h_gate(qregs.state, n, target)),
+            ("cx", lambda: alu.cnot_gate(0, target),
+                   lambda: loop_cnot_gate(qregs.state, n, 0, target)),
+            ("swap", lambda: alu.swap_gate(0, target),
+                     lambda: loop_swap_gate(qregs.state, n, 0, target)),
+        ]
+        for name, vector_fn, loop_fn in cases:
+            vector_t = best_of(vector_fn, args.repeat)
+            if n <= args.loop_max_qubits:
+                loop_t = best_of(loop_fn, 1)
+                print(f"{n:>6} {name:>5} {loop_t:>12.6f} {vector_t:>12.6f} {loop_t / vector_t:>9.0f}x")
+            else:
+                print(f"{n:>6} {name:>5} {'-':>12} {vector_t:>12.6f} {'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
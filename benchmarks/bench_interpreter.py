@@ -0,0 +1,94 @@
+# benchmarks/bench_interpreter.py
+
+"""
+Classical interpreter throughput in instructions per second.
+
+Run from the repository root:
+    python -m benchmarks.bench_interpreter [--program programs/gcd.asm] [--inputs 255 2] [--runs 200] [--engine step]
+
+The program is loaded once and run --runs times from a reset processor; the
+values of --inputs answer its `in` instructions. Throughput is the number of
+executed instructions (clock cycles) divided by the wall time of the run loop
+(--engine: the step() loop, the closure-compiled run_fast or the basic-block
+compiler run_compiled).
+"""
+
+import argparse
+import time
+
+from src.execution import run_compiled, run_fast
+from src.procesor import Procesor
+
+
+class _QuietOutput:
+    """Output handler that drops program output."""
+
+    def print_output(self, message, end='\n'):
+        pass
+
+    def print_error(self, error_message):
+        raise RuntimeError(error_message)
+
+    def print_debug(self, debug_message, debug_enabled=False):
+        pass
+
+
+class _FixedInput:
+    """Input handler that answers `in` from the same values on every run."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.position = 0
+
+    def rewind(self):
+        self.position = 0
+
+    def read_keyboard_input(self, prompt=""):
+        value = self.values[self.position % len(self.values)]
+        self.position += 1
+        return value
+
+
+ENGINES = {"fast": run_fast, "compiled": run_compiled}
+
+
+def measure(cpu, inputs, runs, engine="step"):
+    """Return (instructions, seconds) over `runs` complete runs."""
+    instructions = 0
+    elapsed = 0.0
+    for _ in range(runs):
+        cpu.reset()
+        inputs.rewind()
+        cpu.running = True
+        start = time.perf_counter()
+        if engine in ENGINES:
+            ENGINES[engine](cpu)
+        else:
+            while cpu.running and cpu.step():
+                pass
+        elapsed += time.perf_counter() - start
+        instructions += cpu.clock
+    return instructions, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--program", default="programs/gcd.asm")
+    parser.add_argument("--inputs", nargs="*", default=["255", "2"])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--engine", choices=["step", *ENGINES], default="step")
+    args = parser.parse_args()
+
+    inputs = _FixedInput(args.inputs)
+    cpu = Procesor(mode="classical", custom_output_handler=_QuietOutput(), custom_input_handler=inputs)
+    if not cpu.load_program(args.program):
+        raise SystemExit(f"Cannot load {args.program}")
+
+    measure(cpu, inputs, max(1, args.runs // 10), args.engine)     # Warm-up
+    instructions, elapsed = measure(cpu, inputs, args.runs, args.engine)
+    print(f"{args.program}: {instructions // args.runs} instructions per run, {args.runs} runs")
+    print(f"{instructions / elapsed:,.0f} instructions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_memmap.py
+
+"""
+Out-of-core statevector throughput: memmap-backed registers vs. in-RAM.
+
+Run from the repository root:
+    python -m benchmarks.bench_memmap [--qubits 24] [--chunk-qubits 16] [--dir /local/scratch]
+
+Every gate reads and writes the whole statevector once, so throughput is
+reported as 2 * state bytes / time per gate (GB/s). Gates are timed on a low
+qubit (inside a chunk), on the top qubit (pairs of chunks) and as a CNOT
+between the two. The in-RAM QuantumRegisters are timed for reference when
+the state fits into --ram-limit MiB.
+"""
+
+import argparse
+import time
+
+from src.alu import MemmapQuantumALU, QuantumALU
+from src.registers import MemmapQuantumRegisters, QuantumRegisters, estimate_memory
+
+
+def gate_cases(num_qubits):
+    top = num_qubits - 1
+    return [
+        ("h q0", lambda alu: alu.h_gate(0)),
+        (f"h q{top}", lambda alu: alu.h_gate(top)),
+        ("rx q1", lambda alu: alu.rx_gate(1, 0.3)),
+        ("t q0", lambda alu: alu.t_gate(0)),
+        (f"cx q0 q{top}", lambda alu: alu.cnot_gate(0, top)),
+        (f"swap q0 q{top}", lambda alu: alu.swap_gate(0, top)),
+    ]
+
+
+def throughput(alu, gate, state_bytes, repeat):
+    gate(alu)   # Warm-up (page cache, plan selection)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        gate(alu)
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed, 2 * state_bytes / elapsed / 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--qubits", type=int, default=24)
+    parser.add_argument("--chunk-qubits", type=int, default=16)
+    parser.add_argument("--dir", default=None, help="directory for the state file (default: system temp)")
+    parser.add_argument("--precision", choices=["single", "double"], default="double")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ram-limit", type=float, default=2048,
+                        help="time the in-RAM registers only below this many MiB")
+    args = parser.parse_args()
+
+    state_bytes = estimate_memory(args.qubits, args.precision) // 2
+    registers = MemmapQuantumRegisters(args.qubits, precision=args.precision, directory=args.dir,
+                                       chunk_qubits=args.chunk_qubits)
+    memmap_alu = MemmapQuantumALU(registers)
+    ram_alu = None
+    if 2 * state_bytes <= args.ram_limit * 1024**2:
+        ram_alu = QuantumALU(QuantumRegisters(args.qubits, precision=args.precision, memory_budget=None))
+
+    print(f"{args.qubits} qubits, {state_bytes / 1024**2:.0f} MiB state, "
+          f"chunks of 2**{registers.chunk_qubits} amplitudes")
+    print(f"{'gate':>14} {'memmap [s]':>11} {'GB/s':>7} {'RAM [s]':>9} {'GB/s':>7}")
+    for name, gate in gate_cases(args.qubits):
+        elapsed, rate = throughput(memmap_alu, gate, state_bytes, args.repeat)
+        line = f"{name:>14} {elapsed:>11.3f} {rate:>7.2f}"
+        if ram_alu is not None:
+            ram_elapsed, ram_rate = throughput(ram_alu, gate, state_bytes, args.repeat)
+            line += f" {ram_elapsed:>9.3f} {ram_rate:>7.2f}"
+        print(line)
+    registers.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_parallel.py
+
+"""
+Shot farm scaling: in-process shots vs. a process pool of 1..N workers.
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel [--qubits 16] [--shots 400] [--max-workers N]
+
+The workload is a measurement-feedback program (every shot re-runs the part
+after the first measurement), so the work per shot is a few full passes over
+the statevector and should scale close to linearly with the worker count up
+to the number of physical cores.
+"""
+
+import argparse
+import os
+import time
+
+from src.procesor import Procesor
+
+
+def feedback_program(num_qubits):
+    """H on every qubit, measure q0, then more gates chosen by the outcome."""
+    lines = [f"h q{q}" for q in range(num_qubits)]
+    lines += [
+        "measure q0 p0",
+        "set p1 1",
+        "cmp p0 p1",
+        f"jmpif {2 * num_qubits + 3}",  # outcome 1 skips the rx block
+    ]
+    lines += [f"rx 0.3 q{q}" for q in range(1, num_qubits)]
+    lines += [f"cx q{q} q{q + 1}" for q in range(1, num_qubits - 1)]
+    lines += [f"measure q{q} p2" for q in range(1, 4)]
+    return "\n".join(lines)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--qubits", type=int, default=16)
+    parser.add_argument("--shots", type=int, default=400)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cpu = Procesor(mode="quantum", num_qubits=args.qubits, seed=1, backend="statevector")
+    cpu.load_program_from_string(feedback_program(args.qubits))
+
+    serial = timed(lambda: cpu.run_shots(args.shots))
+    print(f"{args.qubits} qubits, {args.shots} shots, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'time [s]':>10} {'speedup':>8}")
+    print(f"{'serial':>7} {serial:>10.3f} {1.0:>7.2f}x")
+    workers = 2
+    while workers <= args.max_workers:
+        elapsed = timed(lambda: cpu.run_shots(args.shots, workers=workers))
+        print(f"{workers:>7} {elapsed:>10.3f} {serial / elapsed:>7.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
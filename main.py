@@ -1,9 +1,15 @@
 # main.py
 
+import argparse
+
 import pygame
 
 from src.rendering import render_main
 from src.procesor import Procesor
+from src.registers import estimate_memory
+from src.registers.quantum_registers import DEFAULT_MEMORY_BUDGET
+from src.registers.sparse_registers import DEFAULT_FILL_RATIO
+from src.registers.memmap_registers import DEFAULT_CHUNK_QUBITS
 from src.io.gui_output_handler import GUIOutputHandler
 from src.io.gui_input_handler import GUIInputHandler
 from copy import copy
@@ -19,7 +25,44 @@ def convert_piquang_to_assembly(piquang_code):
     code = parsing.Parse(parsing.Tokenize(piquang_code))
     return code
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pearl Quantum Procesor")
+    parser.add_argument("--qubits", type=int, default=8,
+                        help="number of qubits in the quantum register (default: 8)")
+    parser.add_argument("--precision", choices=["single", "double"], default="double",
+                        help="amplitude precision: single = complex64, double = complex128 (default: double)")
+    parser.add_argument("--memory-budget", type=float, default=DEFAULT_MEMORY_BUDGET / 1024**2,
+                        help="refuse quantum states needing more than this many MiB (default: %(default).0f)")
+    parser.add_argument("--backend", choices=["auto", "statevector", "stabilizer", "sparse", "memmap"], default="auto",
+                        help="quantum simulator; auto uses the dense statevector whenever it fits the memory budget, "
+                             "otherwise the stabilizer tableau for Clifford-only programs and the sparse "
+                             "statevector for the rest; "
+                             "memmap keeps the statevector in a file on disk (default: auto)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for measurement outcomes; the same seed reproduces a run (default: random)")
+    parser.add_argument("--fill-ratio", type=float, default=DEFAULT_FILL_RATIO,
+                        help="share of non-zero amplitudes at which the sparse backend turns dense (default: %(default)s)")
+    parser.add_argument("--memmap-dir", default=None,
+                        help="directory for the memmap backend's state file (default: system temp)")
+    parser.add_argument("--chunk-qubits", type=int, default=DEFAULT_CHUNK_QUBITS,
+                        help="memmap backend processes 2**N amplitudes at a time (default: %(default)s)")
+    parser.add_argument("--defer-gates", action="store_true",
+                        help="buffer quantum gates and run them as one compiled block at the next measure/barrier")
+    parser.add_argument("--debug", action="store_true",
+                        help="print every executed instruction and clock cycle, plus registers and memory each frame")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    memory_budget = int(args.memory_budget * 1024**2)
+    required = estimate_memory(args.qubits, args.precision)
+    print(f"Quantum state: {args.qubits} qubits, {args.precision} precision, {required / 1024**2:.1f} MiB")
+    if required > memory_budget and args.backend != "memmap":
+        if args.backend == "statevector":
+            print(f"Refusing to start: state needs more than the {args.memory_budget:.0f} MiB memory budget")
+            return
+        print("Statevector exceeds the memory budget; using the stabilizer or sparse backend")
+
     pygame.init()
     rendering = render_main.RenderMain()
     highlight_line = None
@@ -28,9 +71,12 @@ def main():
     gui_output_handler = GUIOutputHandler(rendering)
     gui_input_handler = GUIInputHandler(rendering)
     
-    # Toggleable debug mode - set to False to disable debug output
-    debug_mode = False
-    cpu = Procesor(debug=debug_mode, custom_output_handler=gui_output_handler, custom_input_handler=gui_input_handler, mode="hybrid")
+    # Debug mode (--debug): instruction trace from the processor's debug hooks and GUI loop state
+    debug_mode = args.debug
+    cpu = Procesor(debug=debug_mode, custom_output_handler=gui_output_handler, custom_input_handler=gui_input_handler, mode="hybrid",
+                   num_qubits=args.qubits, precision=args.precision, memory_budget=memory_budget,
+                   backend=args.backend, fill_ratio=args.fill_ratio, seed=args.seed,
+                   defer_gates=args.defer_gates, memmap_dir=args.memmap_dir, chunk_qubits=args.chunk_qubits)
 
     cpu_running = ""  # Track CPU run state: "", "run", or "step"
     memory_display = ""
@@ -10,9 +10,18 @@ following a common interface defined in alu_interface.py.
 from .alu_interface import ALUInterface
 from .classical_alu import ClassicalALU
 from .quantum_alu import QuantumALU
+from .stabilizer_alu import StabilizerALU, is_clifford_program
+from .sparse_alu import SparseQuantumALU
+from .batched_alu import BatchedQuantumALU
+from .memmap_alu import MemmapQuantumALU
 
 __all__ = [
     "ALUInterface",
     "ClassicalALU",
     "QuantumALU",
+    "StabilizerALU",
+    "SparseQuantumALU",
+    "BatchedQuantumALU",
+    "MemmapQuantumALU",
+    "is_clifford_program",
 ]
@@ -0,0 +1,84 @@
+# src/alu/batched_alu.py
+
+from .quantum_alu import QuantumALU
+from . import statevector_kernels as kernels
+import numpy as np
+
+# Kernely, jejichž první argument je matice (ostatní berou skalární fáze)
+_MATRIX_KERNELS = (kernels.apply_matrix, kernels.apply_matrix4)
+
+
+class BatchedQuantumALU(QuantumALU):
+    """
+    QuantumALU nad BatchedQuantumRegisters. Brány jsou stejné jako
+    v QuantumALU, jen úhly rotací (rx, ry, rz, controlled rz) mohou být
+    pole délky batch - každý člen dávky pak dostane svůj úhel.
+    """
+    # Fáze s úhlem pro každý člen dávky se nesčítají, aplikují se hned
+    accumulate_phases = False
+
+    def __init__(self, quantum_registers):
+        super().__init__(quantum_registers)
+        self.batch = quantum_registers.batch
+
+    def _tensor_index(self, controls):
+        """Index do tenzoru (batch, 2, ..., 2) s nastavenými řídicími qubity"""
+        n = self.num_qubits
+        index = [slice(None)] * (n + 1) + [Ellipsis]
+        for control in controls:
+            index[n - control] = 1
+        return index
+
+    def _batched_args(self, kernel, args, ndim):
+        """Přesune osu dávky u vektorových úhlů tak, aby se broadcastovala s pohledy"""
+        scalar_ndim = 2 if kernel in _MATRIX_KERNELS else 0
+        result = []
+        for arg in args:
+            if np.ndim(arg) == scalar_ndim + 1:
+                arg = np.asarray(arg)
+                if arg.shape[-1] != self.batch:
+                    raise ValueError(f"Expected {self.batch} angles, got {arg.shape[-1]}")
+                # (..., batch) -> (..., batch, 1, ..., 1) pro pohled s ndim osami
+                arg = arg.reshape(arg.shape + (1,) * (ndim - 1))
+            result.append(arg)
+        return result
+
+    def _apply(self, target, kernel, *args, controls=()):
+        """Aplikuje kernel na poloviny všech stavů dávky"""
+        n = self.num_qubits
+        tensor = self.qregs.view().reshape((self.batch,) + (2,) * n)
+        index = self._tensor_index(controls)
+        index[n - target] = 0
+        a0 = tensor[tuple(index)]
+        index[n - target] = 1
+        a1 = tensor[tuple(index)]
+        kernel(a0, a1, *self._batched_args(kernel, args, a0.ndim), scratch=self.qregs.scratch)
+        self.qregs.mark_modified()
+
+    def _apply_pair(self, first, second, kernel, *args, controls=()):
+        """Aplikuje dvouqubitový kernel na čtyři bloky všech stavů dávky"""
+        n = self.num_qubits
+        tensor = self.qregs.view().reshape((self.batch,) + (2,) * n)
+        index = self._tensor_index(controls)
+        blocks = []
+        for bit_first in (0, 1):
+            for bit_second in (0, 1):
+                index[n - first] = bit_first
+                index[n - second] = bit_second
+                blocks.append(tensor[tuple(index)])
+        kernel(blocks, *self._batched_args(kernel, args, blocks[0].ndim), scratch=self.qregs.scratch)
+        self.qregs.mark_modified()
+
+    def permute_qubits(self, order):
+        """Přeuspořádá qubity ve všech stavech dávky"""
+        order = [int(q) for q in order]
+        if sorted(order) != list(range(self.num_qubits)):
+            raise ValueError(f"order must be a permutation of 0..{self.num_qubits - 1}")
+        self.flush()
+        n = self.num_qubits
+        axes = [0] + [1 + n - 1 - order[n - 1 - axis] for axis in range(n)]
+        state = self.qregs.view()
+        tensor = state.reshape((self.batch,) + (2,) * n)
+        np.copyto(self.qregs.scratch.reshape(tensor.shape), tensor.transpose(axes))
+        np.copyto(state, self.qregs.scratch.reshape(state.shape))
+        self.qregs.mark_modified()
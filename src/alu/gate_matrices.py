@@ -0,0 +1,146 @@
+# src/alu/gate_matrices.py
+
+"""
+Unitary matrices of the instruction-set gates.
+
+Two-qubit matrices act on the basis index 2*b_first + b_second, where
+b_first/b_second are the bits of the first/second qubit operand
+(for controlled gates the first operand is the control).
+
+Fixed gates are module constants (read-only arrays). Parameterized gates go
+through GateRegistry, which keeps recently used (opcode, angle) matrices in
+a bounded LRU cache.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+I2 = np.eye(2, dtype=complex)
+X = np.array([[0, 1], [1, 0]], dtype=complex)
+Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+Z = np.array([[1, 0], [0, -1]], dtype=complex)
+H = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+S = np.array([[1, 0], [0, 1j]], dtype=complex)
+T = np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex)
+
+
+def controlled(matrix):
+    """4x4 matrix applying `matrix` to the second qubit when the first is |1⟩."""
+    result = np.eye(4, dtype=complex)
+    result[2:, 2:] = matrix
+    return result
+
+
+CX = controlled(X)
+CY = controlled(Y)
+CZ = controlled(Z)
+CH = controlled(H)
+CS = controlled(S)
+CT = controlled(T)
+SWAP = np.array([[1, 0, 0, 0],
+                 [0, 0, 1, 0],
+                 [0, 1, 0, 0],
+                 [0, 0, 0, 1]], dtype=complex)
+ISWAP = np.array([[1, 0, 0, 0],
+                  [0, 0, 1j, 0],
+                  [0, 1j, 0, 0],
+                  [0, 0, 0, 1]], dtype=complex)
+
+SINGLE_QUBIT_GATES = {"h": H, "x": X, "y": Y, "z": Z, "s": S, "t": T}
+ROTATION_GATES = ("rx", "ry", "rz")
+TWO_QUBIT_GATES = {"cx": CX, "cnot": CX, "cy": CY, "cz": CZ, "ch": CH, "cs": CS, "ct": CT,
+                   "swap": SWAP, "iswap": ISWAP}
+
+
+def rotation(opcode, theta):
+    """
+    Matrix of rx/ry/rz/p for the angle theta (radians).
+
+    theta may be an array of angles; the result then has shape (2, 2, *theta.shape).
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    matrix = np.zeros((2, 2) + theta.shape, dtype=complex)
+    if opcode in ("rx", "ry"):
+        cos_half = np.cos(theta / 2)
+        sin_half = np.sin(theta / 2)
+        matrix[0, 0] = matrix[1, 1] = cos_half
+        if opcode == "rx":
+            matrix[0, 1] = matrix[1, 0] = -1j * sin_half
+        else:
+            matrix[0, 1] = -sin_half
+            matrix[1, 0] = sin_half
+    elif opcode == "rz":
+        matrix[0, 0] = np.exp(-1j * theta / 2)
+        matrix[1, 1] = np.exp(1j * theta / 2)
+    elif opcode == "p":
+        matrix[0, 0] = 1
+        matrix[1, 1] = np.exp(1j * theta)
+    else:
+        raise ValueError(f"Unknown rotation gate: {opcode}")
+    return matrix
+
+
+def embed(matrix, position):
+    """Lift a single-qubit matrix onto the first (0) or second (1) qubit of a pair."""
+    return np.kron(matrix, I2) if position == 0 else np.kron(I2, matrix)
+
+
+FIXED_GATES = {**SINGLE_QUBIT_GATES, **TWO_QUBIT_GATES}
+PARAMETERIZED_GATES = ROTATION_GATES + ("p",)
+
+for _matrix in (I2, ISWAP, *FIXED_GATES.values()):
+    _matrix.flags.writeable = False
+
+
+class GateRegistry:
+    """
+    Lookup of gate matrices: fixed gates from FIXED_GATES, parameterized
+    gates from a bounded LRU cache keyed by (opcode, angle).
+
+    Arrays of angles (batched sweeps) are computed directly and not cached.
+    Returned matrices are read-only and shared between callers.
+    """
+
+    def __init__(self, max_size=1024):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def matrix(self, opcode, angle=None):
+        """Matrix of a fixed gate (angle=None) or of a parameterized gate at `angle`."""
+        if angle is None:
+            return FIXED_GATES[opcode]
+        if not isinstance(angle, (float, int)) and np.ndim(angle):
+            return rotation(opcode, angle)
+        key = (opcode, float(angle))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return cached
+        self.misses += 1
+        cached = rotation(opcode, key[1])
+        cached.flags.writeable = False
+        self._cache[key] = cached
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return cached
+
+    def stats(self):
+        """Cache counters: {"hits", "misses", "size", "max_size"}."""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._cache), "max_size": self.max_size}
+
+    def clear(self):
+        """Drop cached matrices and reset the counters."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by every QuantumALU that is not given its own registry
+registry = GateRegistry()
@@ -0,0 +1,55 @@
+# src/alu/memmap_alu.py
+
+from .quantum_alu import QuantumALU
+from . import statevector_kernels as kernels
+
+
+class MemmapQuantumALU(QuantumALU):
+    """
+    QuantumALU nad MemmapQuantumRegisters. Brána se provede po skupinách
+    chunků: skupina je jeden chunk (všechny qubity brány uvnitř chunku)
+    nebo 2-4 chunky lišící se v bitech vysokých cílových qubitů. Skupina se
+    načte do RAM, stejné kernely jako u QuantumALU ji zpracují jako malý
+    stav a zapíše se zpět - soubor se při jedné bráně projde nejvýš jednou.
+    Chunky, kde vysoký řídicí qubit není |1⟩, se ani nečtou.
+    """
+
+    def _run_plan(self, qubits, kernel, args, controls):
+        """Provede vybraný kernel po skupinách chunků (viz QuantumALU._execute_matrix)"""
+        qregs = self.qregs
+        c = qregs.chunk_qubits
+        high = sorted(q for q in qubits if q >= c)
+        # Vysoký cílový qubit high[k] je v načtené skupině lokální qubit c + k
+        local = {q: c + k for k, q in enumerate(high)}
+        local_qubits = [local.get(q, q) for q in qubits]
+        local_controls = tuple(q for q in controls if q < c)
+        high_controls = [q for q in controls if q >= c]
+        block_qubits = c + len(high)
+
+        for group in qregs.chunk_groups(high, high_controls):
+            block = qregs.load(group)
+            if len(qubits) == 1:
+                a0, a1 = kernels.pair_views(block, block_qubits, local_qubits[0], local_controls)
+                kernel(a0, a1, *args, scratch=qregs.scratch)
+            else:
+                blocks = kernels.quad_views(block, block_qubits, local_qubits[0], local_qubits[1], local_controls)
+                kernel(blocks, *args, scratch=qregs.scratch)
+            qregs.store(group, block)
+        qregs.mark_modified()
+
+    def permute_qubits(self, order):
+        """
+        Přeuspořádá qubity (viz QuantumALU.permute_qubits) posloupností
+        výměn SWAP - každá výměna projde soubor jednou.
+        """
+        order = [int(q) for q in order]
+        if sorted(order) != list(range(self.num_qubits)):
+            raise ValueError(f"order must be a permutation of 0..{self.num_qubits - 1}")
+        self.flush()
+        # current[i] = původní qubit, jehož stav teď drží qubit i
+        current = list(range(self.num_qubits))
+        for target in range(self.num_qubits):
+            if current[target] != order[target]:
+                source = current.index(order[target])
+                self.swap_gate(target, source)
+                current[target], current[source] = current[source], current[target]
@@ -1,212 +1,366 @@
 # src/alu/quantum_alu.py
 
 from .alu_interface import ALUInterface
+from . import statevector_kernels as kernels
+from . import gate_matrices as gates
 import numpy as np
 
+
+def _single_plan(matrix):
+    """Vybere kernel pro 2x2 matici: fáze, diagonála, prohození nebo obecná matice"""
+    if matrix.ndim == 2:
+        # Prvky jako Python complex - porovnání bez režie numpy skalárů
+        (m00, m01), (m10, m11) = matrix.tolist()
+        diagonal = m01 == 0 and m10 == 0
+        phase_only = diagonal and m00 == 1
+        flip = not diagonal and m00 == 0 and m11 == 0 and m01 == 1 and m10 == 1
+    else:
+        # Matice s osou dávky (2, 2, batch): podmínka musí platit pro celou dávku
+        m00, m01, m10, m11 = matrix[0, 0], matrix[0, 1], matrix[1, 0], matrix[1, 1]
+        diagonal = not np.any(m01) and not np.any(m10)
+        phase_only = diagonal and np.all(m00 == 1)
+        flip = (not diagonal and not np.any(m00) and not np.any(m11)
+                and np.all(m01 == 1) and np.all(m10 == 1))
+    if phase_only:
+        return kernels.apply_phase, (m11,)
+    if diagonal:
+        return kernels.apply_diagonal, (m00, m11)
+    if flip:
+        return kernels.apply_flip, ()
+    return kernels.apply_matrix, (matrix,)
+
+
+def _pair_plan(matrix):
+    """Vybere kernel pro 4x4 matici: SWAP/iSWAP jako výměna bloků, jinak obecná matice"""
+    if matrix.shape == (4, 4):
+        if np.array_equal(matrix, gates.SWAP):
+            return kernels.apply_swap, ()
+        if np.array_equal(matrix, gates.ISWAP):
+            return kernels.apply_swap, (1j,)
+    return kernels.apply_matrix4, (matrix,)
+
+
+def _is_identity(matrix):
+    """True pro 2x2 matici rovnou jednotkové (až na zaokrouhlení)"""
+    (m00, m01), (m10, m11) = matrix.tolist()
+    return abs(m00 - 1) < 1e-12 and abs(m11 - 1) < 1e-12 and abs(m01) < 1e-12 and abs(m10) < 1e-12
+
+
+def compile_circuit(pending):
+    """
+    Zkompiluje odložený obvod [(qubits, matrix, controls), ...]: po sobě
+    jdoucí jednoqubitové brány na stejném qubitu se vynásobí do jedné
+    matice a výsledné identity se vynechají. Vrací (brány, počet ušetřených).
+    """
+    compiled = []
+    open_single = {}    # qubit -> index v compiled s neřízenou jednoqubitovou bránou
+    for gate in pending:
+        qubits, matrix, controls = gate
+        if len(qubits) == 1 and not controls and matrix.ndim == 2:
+            index = open_single.get(qubits[0])
+            if index is not None:
+                # Mezi nimi se qubitu nic nedotklo - brány lze spojit
+                compiled[index] = (qubits, matrix @ compiled[index][1], controls)
+                continue
+            open_single[qubits[0]] = len(compiled)
+        else:
+            for qubit in qubits + controls:
+                open_single.pop(qubit, None)
+        compiled.append(gate)
+    compiled = [gate for gate in compiled
+                if not (len(gate[0]) == 1 and not gate[2] and gate[1].ndim == 2 and _is_identity(gate[1]))]
+    return compiled, len(pending) - len(compiled)
+
+
+# Kernely pevných bran se vyberou jednou (matice jsou neměnné konstanty)
+_FIXED_PLANS = {id(matrix): _single_plan(matrix) for matrix in gates.SINGLE_QUBIT_GATES.values()}
+_FIXED_PLANS.update({id(matrix): _pair_plan(matrix)
+                     for matrix in (*gates.TWO_QUBIT_GATES.values(), gates.ISWAP)})
+
+# Kernely diagonálních jednoqubitových bran - ty se sčítají do fází
+_PHASE_KERNELS = (kernels.apply_phase, kernels.apply_diagonal)
+
+# Fáze se aplikují po blocích 2**14 amplitud (vektor faktorů zůstane v cache)
+_PHASE_BLOCK_QUBITS = 14
+
+
 class QuantumALU(ALUInterface):
-    def __init__(self, quantum_registers):
+    # Diagonální brány (fáze) se sčítají do fázového popisu a stav se jimi
+    # vynásobí najednou (viz _apply_phases); dávkové ALU má úhly jako pole
+    accumulate_phases = True
+
+    def __init__(self, quantum_registers, gate_registry=None, deferred=False):
+        """
+        quantum_registers: registry se stavem
+        gate_registry: GateRegistry s cache matic (None = sdílená gates.registry)
+        deferred: brány se jen zapisují do bufferu a provedou se až při
+                  flush() - měření, resetu, čtení stavu nebo instrukci barrier
+        """
         self.qregs = quantum_registers
         self.num_qubits = quantum_registers.num_qubits
-    
+        self.gates = gate_registry if gate_registry is not None else gates.registry
+        self.pending = []   # Odložené brány (qubits, matrix, controls)
+        self.phases = {}    # Nasbírané fáze: (maska, hodnota) -> faktor, viz _accumulate_phase
+        self.phase_qubits = 0   # Bitová maska qubitů, kterých se nasbírané fáze týkají
+        self._executing = False
+        self.circuit_stats = {"flushes": 0, "gates_deferred": 0, "gates_merged": 0,
+                              "phases_accumulated": 0, "phase_passes": 0}
+        self.deferred = False
+        self.set_deferred(deferred)
+
+    def set_deferred(self, enabled):
+        """Zapne/vypne odložené provádění bran (rozpracovaný buffer se nejprve provede)"""
+        self.flush()
+        self.deferred = bool(enabled)
+        # Registry před každým čtením stavu zavolají flush
+        self.qregs.sync_hook = self._sync if self.deferred or self.accumulate_phases else None
+
+    def _sync(self, discard=False):
+        """Hook registrů; kernely samotného ALU čtou stav bez flush"""
+        if not self._executing:
+            self.flush(discard)
+
+    def flush(self, discard=False):
+        """
+        Zkompiluje a provede odložené brány jedním blokem a aplikuje nasbírané
+        fáze (discard=True vše zahodí - stav se stejně přepíše, např. při resetu).
+        """
+        if self.pending:
+            # Buffer se vyprázdní předem: kernely čtou registry, které volají flush znovu
+            pending, self.pending = self.pending, []
+            if not discard:
+                compiled, merged = compile_circuit(pending)
+                self.circuit_stats["flushes"] += 1
+                self.circuit_stats["gates_merged"] += merged
+                for qubits, matrix, controls in compiled:
+                    self._execute_matrix(qubits, matrix, controls)
+        if self.phases:
+            if discard:
+                self.phases = {}
+                self.phase_qubits = 0
+            else:
+                self._apply_phases()
+
+    def _accumulate_phase(self, target, kernel, args, controls):
+        """
+        Zapíše diagonální bránu do fázového popisu místo průchodu stavem.
+        Člen (maska, hodnota) násobí faktorem amplitudy s indexem i, pro
+        který i & maska == hodnota; stejné členy se slučují do jednoho.
+        """
+        base = 0
+        for control in controls:
+            base |= 1 << control
+        bit = 1 << target
+        mask = base | bit
+        if kernel is kernels.apply_phase:
+            terms = (((mask, mask), args[0]),)
+        else:
+            terms = (((mask, base), args[0]), ((mask, mask), args[1]))
+        phases = self.phases
+        for key, factor in terms:
+            phases[key] = phases.get(key, 1) * complex(factor)
+        self.phase_qubits |= mask
+        self.circuit_stats["phases_accumulated"] += 1
+
+    def _apply_phases(self):
+        """
+        Vynásobí stav nasbíranými fázemi jedním průchodem. Stav se bere po
+        blocích 2**_PHASE_BLOCK_QUBITS amplitud: členy s podmínkou jen na
+        nízkých bitech dají pro blok vektor faktorů (spočtený jednou), vysoké
+        bity podmínky rozhodnou, které vektory na blok patří.
+        """
+        terms, self.phases = self.phases, {}
+        self.phase_qubits = 0
+        self._executing = True
+        try:
+            state = self.qregs.view()
+            bits = min(self.num_qubits, _PHASE_BLOCK_QUBITS)
+            size = 1 << bits
+            low = size - 1
+            offsets = np.arange(size)
+            groups = {}     # (vysoká maska, vysoká hodnota) -> vektor faktorů bloku
+            for (mask, value), factor in terms.items():
+                key = (mask >> bits, value >> bits)
+                vector = groups.get(key)
+                if vector is None:
+                    vector = groups[key] = np.ones(size, dtype=np.complex128)
+                if mask & low:
+                    vector[(offsets & (mask & low)) == (value & low)] *= factor
+                else:
+                    vector *= factor
+            groups = [(mask, value, vector.astype(state.dtype)) for (mask, value), vector in groups.items()]
+            combined = np.empty(size, dtype=state.dtype)
+            for block in range(len(state) >> bits):
+                active = [vector for mask, value, vector in groups if block & mask == value]
+                if not active:
+                    continue
+                if len(active) > 1:
+                    np.multiply(active[0], active[1], out=combined)
+                    for vector in active[2:]:
+                        combined *= vector
+                    active = [combined]
+                state[block << bits:(block + 1) << bits] *= active[0]
+            self.qregs.mark_modified()
+        finally:
+            self._executing = False
+        self.circuit_stats["phase_passes"] += 1
+
+    def _apply(self, target, kernel, *args, controls=()):
+        """Aplikuje vektorizovaný kernel na poloviny stavu podle cílového qubitu"""
+        state = self.qregs.view()
+        a0, a1 = kernels.pair_views(state, self.num_qubits, target, controls)
+        kernel(a0, a1, *args, scratch=self.qregs.scratch)
+        self.qregs.mark_modified()
+
+    def _apply_pair(self, first, second, kernel, *args, controls=()):
+        """Aplikuje dvouqubitový kernel na čtyři bloky stavu podle dvojice qubitů"""
+        blocks = kernels.quad_views(self.qregs.view(), self.num_qubits, first, second, controls)
+        kernel(blocks, *args, scratch=self.qregs.scratch)
+        self.qregs.mark_modified()
+
+    def apply_matrix(self, qubits, matrix, controls=()):
+        """
+        Aplikuje matici brány: 2x2 na jeden qubit nebo 4x4 na dvojici qubitů,
+        volitelně řízenou qubity controls. Všechny brány ALU vedou sem; podle
+        tvaru matice se vybere nejlevnější kernel (fáze, prohození, obecná).
+        V odloženém režimu se brána jen zapíše do bufferu.
+        """
+        if self.deferred:
+            self.pending.append((tuple(qubits), np.asarray(matrix), tuple(controls)))
+            self.circuit_stats["gates_deferred"] += 1
+            return
+        self._execute_matrix(qubits, matrix, controls)
+
+    def _execute_matrix(self, qubits, matrix, controls=()):
+        """
+        Okamžitě aplikuje matici brány na stav (viz apply_matrix). Diagonální
+        jednoqubitová brána se jen přidá k nasbíraným fázím; ty se aplikují
+        před první nediagonální bránou na některém z jejich qubitů (brány na
+        jiných qubitech s nimi komutují, řídicí qubity také).
+        """
+        plan = _FIXED_PLANS.get(id(matrix))
+        if len(qubits) == 1:
+            kernel, args = plan or _single_plan(np.asarray(matrix))
+            if kernel in _PHASE_KERNELS and self.accumulate_phases:
+                self._accumulate_phase(qubits[0], kernel, args, controls)
+                return
+        elif len(qubits) == 2:
+            kernel, args = plan or _pair_plan(np.asarray(matrix))
+        else:
+            raise ValueError(f"apply_matrix supports 1 or 2 qubits, got {len(qubits)}")
+        if self.phase_qubits:
+            for qubit in qubits:
+                if self.phase_qubits >> qubit & 1:
+                    self._apply_phases()
+                    break
+        self._executing = True
+        try:
+            self._run_plan(qubits, kernel, args, controls)
+        finally:
+            self._executing = False
+
+    def _run_plan(self, qubits, kernel, args, controls):
+        """Provede vybraný kernel na stavu"""
+        if len(qubits) == 1:
+            self._apply(qubits[0], kernel, *args, controls=controls)
+        else:
+            self._apply_pair(qubits[0], qubits[1], kernel, *args, controls=controls)
+
+    def apply_unitary(self, qubits, matrix):
+        """Aplikuje libovolnou 2x2 (1 qubit) nebo 4x4 (2 qubity) unitární matici"""
+        self.apply_matrix(qubits, matrix)
+
     # === JEDNOQUBITOVÉ BRÁNY ===
     
     def x_gate(self, qubit):
         """Pauli-X (NOT) brána"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        for i in range(2**self.num_qubits):
-            # Flip bit na pozici qubit
-            flipped = i ^ (1 << qubit)
-            new_state[flipped] = state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), gates.X)
     
     def y_gate(self, qubit):
         """Pauli-Y brána"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        for i in range(2**self.num_qubits):
-            flipped = i ^ (1 << qubit)
-            if (i >> qubit) & 1:  # |1⟩ -> -i|0⟩
-                new_state[flipped] = -1j * state[i]
-            else:  # |0⟩ -> i|1⟩
-                new_state[flipped] = 1j * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), gates.Y)
     
     def z_gate(self, qubit):
         """Pauli-Z brána"""
-        state = self.qregs.get_full_state()
-        new_state = state.copy()
-        
-        for i in range(2**self.num_qubits):
-            if (i >> qubit) & 1:  # |1⟩ -> -|1⟩
-                new_state[i] = -state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), gates.Z)
     
     def h_gate(self, qubit):
         """Hadamard brána - vytvoří superpozici"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        sqrt2 = 1.0 / np.sqrt(2)
-        
-        for i in range(2**self.num_qubits):
-            i0 = i & ~(1 << qubit)  # Set qubit to 0
-            i1 = i | (1 << qubit)   # Set qubit to 1
-            
-            if (i >> qubit) & 1 == 0:  # Current state has qubit=0
-                new_state[i0] += sqrt2 * state[i]
-                new_state[i1] += sqrt2 * state[i]
-            else:  # Current state has qubit=1
-                new_state[i0] += sqrt2 * state[i]
-                new_state[i1] -= sqrt2 * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), gates.H)
     
     def s_gate(self, qubit):
         """S brána (fázová brána π/2)"""
-        state = self.qregs.get_full_state()
-        new_state = state.copy()
-        
-        for i in range(2**self.num_qubits):
-            if (i >> qubit) & 1:  # |1⟩ -> i|1⟩
-                new_state[i] = 1j * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), gates.S)
     
     def t_gate(self, qubit):
         """T brána (fázová brána π/4)"""
-        state = self.qregs.get_full_state()
-        new_state = state.copy()
-        phase = np.exp(1j * np.pi / 4)
-        
-        for i in range(2**self.num_qubits):
-            if (i >> qubit) & 1:  # |1⟩ -> e^(iπ/4)|1⟩
-                new_state[i] = phase * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), gates.T)
     
     def rx_gate(self, qubit, theta):
         """Rotace kolem X-osy o úhel theta"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        cos_half = np.cos(theta / 2)
-        sin_half = -1j * np.sin(theta / 2)
-        
-        for i in range(2**self.num_qubits):
-            i0 = i & ~(1 << qubit)
-            i1 = i | (1 << qubit)
-            
-            if (i >> qubit) & 1 == 0:
-                new_state[i0] += cos_half * state[i]
-                new_state[i1] += sin_half * state[i]
-            else:
-                new_state[i0] += sin_half * state[i]
-                new_state[i1] += cos_half * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), self.gates.matrix("rx", theta))
     
     def ry_gate(self, qubit, theta):
         """Rotace kolem Y-osy o úhel theta"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        cos_half = np.cos(theta / 2)
-        sin_half = np.sin(theta / 2)
-        
-        for i in range(2**self.num_qubits):
-            i0 = i & ~(1 << qubit)
-            i1 = i | (1 << qubit)
-            
-            if (i >> qubit) & 1 == 0:
-                new_state[i0] += cos_half * state[i]
-                new_state[i1] += sin_half * state[i]
-            else:
-                new_state[i0] += -sin_half * state[i]
-                new_state[i1] += cos_half * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), self.gates.matrix("ry", theta))
     
     def rz_gate(self, qubit, theta):
         """Rotace kolem Z-osy o úhel theta"""
-        state = self.qregs.get_full_state()
-        new_state = state.copy()
-        
-        phase_0 = np.exp(-1j * theta / 2)
-        phase_1 = np.exp(1j * theta / 2)
-        
-        for i in range(2**self.num_qubits):
-            if (i >> qubit) & 1 == 0:
-                new_state[i] = phase_0 * state[i]
-            else:
-                new_state[i] = phase_1 * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((qubit,), self.gates.matrix("rz", theta))
     
     # === DVOUQUBITOVÉ BRÁNY ===
     
     def cnot_gate(self, control, target):
         """CNOT brána"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        for i in range(2**self.num_qubits):
-            if (i >> control) & 1:  # Control je |1⟩
-                # Flip target bit
-                flipped = i ^ (1 << target)
-                new_state[flipped] = state[i]
-            else:
-                new_state[i] = state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((target,), gates.X, controls=(control,))
     
     def cz_gate(self, control, target):
         """Controlled-Z brána"""
-        state = self.qregs.get_full_state()
-        new_state = state.copy()
-        
-        for i in range(2**self.num_qubits):
-            if ((i >> control) & 1) and ((i >> target) & 1):
-                new_state[i] = -state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((target,), gates.Z, controls=(control,))
     
     def cy_gate(self, control, target):
         """Controlled-Y brána"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        for i in range(2**self.num_qubits):
-            if (i >> control) & 1:  # Control je |1⟩
-                # Apply Y gate to target
-                flipped = i ^ (1 << target)
-                if (i >> target) & 1:  # Target |1⟩ -> -i|0⟩
-                    new_state[flipped] = -1j * state[i]
-                else:  # Target |0⟩ -> i|1⟩
-                    new_state[flipped] = 1j * state[i]
-            else:
-                new_state[i] = state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((target,), gates.Y, controls=(control,))
     
+    def ch_gate(self, control, target):
+        """Controlled-Hadamard brána"""
+        self.apply_matrix((target,), gates.H, controls=(control,))
+
+    def cs_gate(self, control, target):
+        """Controlled-S brána"""
+        self.apply_matrix((target,), gates.S, controls=(control,))
+
+    def ct_gate(self, control, target):
+        """Controlled-T brána"""
+        self.apply_matrix((target,), gates.T, controls=(control,))
+
     def ccx_gate(self, control1, control2, target):
         """Toffoli (CCX) brána"""
-        state = self.qregs.get_full_state()
-        new_state = np.zeros_like(state)
-        
-        for i in range(2**self.num_qubits):
-            if ((i >> control1) & 1) and ((i >> control2) & 1):
-                # Both controls are |1⟩, flip target
-                flipped = i ^ (1 << target)
-                new_state[flipped] = state[i]
-            else:
-                new_state[i] = state[i]
-        
-        self.qregs.set_full_state(new_state)
+        self.apply_matrix((target,), gates.X, controls=(control1, control2))
+
+    # === VÍCENÁSOBNĚ ŘÍZENÉ BRÁNY ===
+
+    def controlled_gate(self, controls, qubits, matrix):
+        """
+        Řízená brána U s libovolným počtem řídicích qubitů: 2x2 matice na
+        jeden qubit nebo 4x4 na dvojici. Podprostor se všemi řídicími qubity
+        v |1⟩ se vybere jedním indexem, takže brána projde jen 2**(n-k)
+        amplitud (k = počet řídicích qubitů).
+        """
+        controls = tuple(controls)
+        qubits = tuple(qubits)
+        used = controls + qubits
+        if len(set(used)) != len(used):
+            raise ValueError(f"Controlled gate needs distinct qubits, got {list(used)}")
+        self.apply_matrix(qubits, matrix, controls=controls)
+
+    def mcx_gate(self, controls, target):
+        """Multi-controlled X (pro 1 řídicí qubit CNOT, pro 2 Toffoli)"""
+        self.controlled_gate(controls, (target,), gates.X)
+
+    def mcz_gate(self, controls, target):
+        """Multi-controlled Z (fáze -1 na stavu se všemi qubity v |1⟩)"""
+        self.controlled_gate(controls, (target,), gates.Z)
     
     # === KVANTOVÉ ALGORITMY ===
     
@@ -230,23 +384,34 @@ class QuantumALU(ALUInterface):
             self.swap_gate(qubits[i], qubits[n-1-i])
     
     def controlled_rz_gate(self, control, target, angle):
-        """Controlled RZ brána"""
-        state = self.qregs.get_full_state()
-        new_state = state.copy()
-        
-        phase = np.exp(1j * angle)
-        
-        for i in range(2**self.num_qubits):
-            if ((i >> control) & 1) and ((i >> target) & 1):
-                new_state[i] = phase * state[i]
-        
-        self.qregs.set_full_state(new_state)
+        """Controlled RZ brána (fáze e^(i·angle) na |11⟩)"""
+        self.apply_matrix((target,), self.gates.matrix("p", angle), controls=(control,))
     
     def swap_gate(self, q1, q2):
-        """SWAP brána"""
-        self.cnot_gate(q1, q2)
-        self.cnot_gate(q2, q1)
-        self.cnot_gate(q1, q2)
+        """SWAP brána (výměna dvou bloků stavu, jeden průchod)"""
+        self.apply_matrix((q1, q2), gates.SWAP)
+
+    def iswap_gate(self, q1, q2):
+        """iSWAP brána - výměna s fází i"""
+        self.apply_matrix((q1, q2), gates.ISWAP)
+
+    def cswap_gate(self, control, q1, q2):
+        """Fredkin (controlled SWAP) brána"""
+        self.apply_matrix((q1, q2), gates.SWAP, controls=(control,))
+
+    def permute_qubits(self, order):
+        """
+        Přeuspořádá qubity jedním průchodem stavem: qubit i pak drží stav,
+        který měl qubit order[i]. Např. order=[1, 0, 2] prohodí q0 a q1.
+        """
+        order = [int(q) for q in order]
+        if sorted(order) != list(range(self.num_qubits)):
+            raise ValueError(f"order must be a permutation of 0..{self.num_qubits - 1}")
+        self.flush()
+        if order == sorted(order):
+            return
+        kernels.permute_qubits(self.qregs.view(), self.num_qubits, order, self.qregs.scratch)
+        self.qregs.mark_modified()
     
     # === KLASICKÉ FALLBACKY (pro kompatibilitu s ALU interface) ===
     
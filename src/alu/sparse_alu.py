@@ -0,0 +1,34 @@
+# src/alu/sparse_alu.py
+
+from .quantum_alu import QuantumALU
+from . import sparse_kernels
+
+
+class SparseQuantumALU(QuantumALU):
+    """
+    QuantumALU nad SparseQuantumRegisters. Dokud je stav řídký, brány se
+    počítají nad uloženými amplitudami; po přechodu na hustý stav se použijí
+    kernely QuantumALU beze změny.
+    """
+
+    def _execute_matrix(self, qubits, matrix, controls=()):
+        """Aplikuje matici brány na řídký stav, nebo předá hustým kernelům"""
+        if not self.qregs.is_sparse:
+            return super()._execute_matrix(qubits, matrix, controls)
+        if len(qubits) not in (1, 2):
+            raise ValueError(f"apply_matrix supports 1 or 2 qubits, got {len(qubits)}")
+        qregs = self.qregs
+        indices, values = sparse_kernels.apply_matrix(
+            qregs.indices, qregs.values, tuple(qubits), matrix, controls, qregs.tolerance)
+        qregs.set_sparse_state(indices, values)
+
+    def permute_qubits(self, order):
+        """Přeuspořádá qubity (viz QuantumALU.permute_qubits)"""
+        self.flush()
+        if not self.qregs.is_sparse:
+            return super().permute_qubits(order)
+        order = [int(q) for q in order]
+        if sorted(order) != list(range(self.num_qubits)):
+            raise ValueError(f"order must be a permutation of 0..{self.num_qubits - 1}")
+        indices, values = sparse_kernels.permute_qubits(self.qregs.indices, self.qregs.values, order)
+        self.qregs.set_sparse_state(indices, values)
@@ -0,0 +1,80 @@
+# src/alu/sparse_kernels.py
+
+"""
+Gate kernels for the sparse statevector.
+
+A sparse state is a pair of arrays: sorted basis indices (int64) and the
+matching non-zero amplitudes. A gate on k qubits groups the stored entries by
+their index with the gate qubits cleared ("base"), gathers each group into a
+row of 2**k amplitudes, multiplies all rows by the gate matrix at once and
+scatters the results back. The cost depends on the number of stored entries,
+not on 2**n.
+"""
+
+import numpy as np
+
+
+def bit_masks(qubits):
+    """Bit mask of every qubit, in operand order."""
+    return [np.int64(1) << np.int64(q) for q in qubits]
+
+
+def apply_matrix(indices, values, qubits, matrix, controls=(), tolerance=0.0):
+    """
+    Apply a 2**k x 2**k matrix to the given qubits of a sparse state.
+
+    Row/column index of the matrix is built from the qubit bits in operand
+    order, first operand most significant (2*b_first + b_second), as in
+    gate_matrices. Entries whose control qubits are not all |1⟩ are left
+    untouched. Returns new (indices, values); amplitudes with magnitude at or
+    below `tolerance` are dropped.
+    """
+    matrix = np.asarray(matrix, dtype=values.dtype)
+    masks = bit_masks(qubits)
+    gate_mask = np.int64(0)
+    for mask in masks:
+        gate_mask |= mask
+    control_mask = np.int64(0)
+    for mask in bit_masks(controls):
+        control_mask |= mask
+
+    active = (indices & control_mask) == control_mask
+    idle_indices = indices[~active]
+    idle_values = values[~active]
+    indices = indices[active]
+    values = values[active]
+
+    # Column of each stored amplitude inside its group of 2**k
+    k = len(qubits)
+    column = np.zeros(indices.shape, dtype=np.int64)
+    for position, mask in enumerate(masks):
+        column |= ((indices & mask) != 0).astype(np.int64) << (k - 1 - position)
+
+    bases, group = np.unique(indices & ~gate_mask, return_inverse=True)
+    rows = np.zeros((bases.size, 1 << k), dtype=values.dtype)
+    rows[group, column] = values
+    rows = rows @ matrix.T
+
+    # Index of every output column: base with the gate qubits set accordingly
+    offsets = np.zeros(1 << k, dtype=np.int64)
+    for col in range(1 << k):
+        for position, mask in enumerate(masks):
+            if (col >> (k - 1 - position)) & 1:
+                offsets[col] |= mask
+    new_indices = (bases[:, None] | offsets[None, :]).ravel()
+    new_values = rows.ravel()
+    keep = np.abs(new_values) > tolerance
+
+    indices = np.concatenate((idle_indices, new_indices[keep]))
+    values = np.concatenate((idle_values, new_values[keep]))
+    order = np.argsort(indices, kind="stable")
+    return indices[order], values[order]
+
+
+def permute_qubits(indices, values, order):
+    """Reorder qubits: afterwards qubit i holds what was qubit order[i]. Returns new (indices, values)."""
+    new_indices = np.zeros_like(indices)
+    for qubit, source in enumerate(order):
+        new_indices |= ((indices >> np.int64(source)) & 1) << np.int64(qubit)
+    sort = np.argsort(new_indices, kind="stable")
+    return new_indices[sort], values[sort]
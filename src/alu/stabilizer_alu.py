@@ -0,0 +1,213 @@
+# src/alu/stabilizer_alu.py
+
+import math
+
+from .alu_interface import ALUInterface
+
+# Instrukce, které stabilizer backend umí provést
+CLIFFORD_OPCODES = {
+    "h", "x", "y", "z", "s",
+    "cx", "cnot", "cz", "cy", "swap", "iswap",
+    "measure", "measure_all", "measure_reg", "reset",
+}
+
+# Kvantové instrukce mimo Cliffordovu grupu - vyžadují stavový vektor
+NON_CLIFFORD_OPCODES = {
+    "t", "rx", "ry", "rz", "ch", "cs", "ct", "ccx", "toffoli", "cswap", "mcx", "mcz", "unitary",
+}
+
+
+def non_clifford_opcodes(program):
+    """Množina kvantových instrukcí programu, které stabilizer backend neumí"""
+    return {instr.get("opcode", "").lower() for instr in program} & NON_CLIFFORD_OPCODES
+
+
+def is_clifford_program(program):
+    """True, pokud program používá kvantové instrukce a všechny jsou Cliffordovské"""
+    opcodes = {instr.get("opcode", "").lower() for instr in program}
+    return bool(opcodes & CLIFFORD_OPCODES) and not (opcodes & NON_CLIFFORD_OPCODES)
+
+
+class StabilizerALU(ALUInterface):
+    """Kvantové ALU nad stabilizer tableau - stejné názvy bran jako QuantumALU"""
+
+    def __init__(self, quantum_registers):
+        self.qregs = quantum_registers
+        self.num_qubits = quantum_registers.num_qubits
+
+    def flush(self, discard=False):
+        """Tableau brány neodkládá - není co provést (rozhraní jako QuantumALU)"""
+
+    def _non_clifford(self, name):
+        raise ValueError(f"{name} is not a Clifford gate; use the statevector backend")
+
+    # === JEDNOQUBITOVÉ BRÁNY ===
+
+    def x_gate(self, qubit):
+        """Pauli-X (NOT) brána"""
+        self.qregs.tableau.x_gate(qubit)
+        self.qregs.mark_modified()
+
+    def y_gate(self, qubit):
+        """Pauli-Y brána"""
+        self.qregs.tableau.y_gate(qubit)
+        self.qregs.mark_modified()
+
+    def z_gate(self, qubit):
+        """Pauli-Z brána"""
+        self.qregs.tableau.z_gate(qubit)
+        self.qregs.mark_modified()
+
+    def h_gate(self, qubit):
+        """Hadamard brána - vytvoří superpozici"""
+        self.qregs.tableau.h(qubit)
+        self.qregs.mark_modified()
+
+    def s_gate(self, qubit):
+        """S brána (fázová brána π/2)"""
+        self.qregs.tableau.s(qubit)
+        self.qregs.mark_modified()
+
+    def t_gate(self, qubit):
+        self._non_clifford("t")
+
+    def rx_gate(self, qubit, theta):
+        self._non_clifford("rx")
+
+    def ry_gate(self, qubit, theta):
+        self._non_clifford("ry")
+
+    def rz_gate(self, qubit, theta):
+        self._non_clifford("rz")
+
+    def apply_unitary(self, qubits, matrix):
+        self._non_clifford("unitary")
+
+    def apply_matrix(self, qubits, matrix, controls=()):
+        self._non_clifford("unitary")
+
+    # === DVOUQUBITOVÉ BRÁNY ===
+
+    def cnot_gate(self, control, target):
+        """CNOT brána"""
+        self.qregs.tableau.cx(control, target)
+        self.qregs.mark_modified()
+
+    def cz_gate(self, control, target):
+        """Controlled-Z brána (H · CX · H na cíli)"""
+        tableau = self.qregs.tableau
+        tableau.h(target)
+        tableau.cx(control, target)
+        tableau.h(target)
+        self.qregs.mark_modified()
+
+    def cy_gate(self, control, target):
+        """Controlled-Y brána (S · CX · S† na cíli)"""
+        tableau = self.qregs.tableau
+        for _ in range(3):          # S† = S³
+            tableau.s(target)
+        tableau.cx(control, target)
+        tableau.s(target)
+        self.qregs.mark_modified()
+
+    def swap_gate(self, q1, q2):
+        """SWAP brána"""
+        tableau = self.qregs.tableau
+        tableau.cx(q1, q2)
+        tableau.cx(q2, q1)
+        tableau.cx(q1, q2)
+        self.qregs.mark_modified()
+
+    def iswap_gate(self, q1, q2):
+        """iSWAP brána = SWAP · CZ · (S ⊗ S)"""
+        tableau = self.qregs.tableau
+        tableau.s(q1)
+        tableau.s(q2)
+        tableau.h(q2)
+        tableau.cx(q1, q2)
+        tableau.h(q2)
+        tableau.cx(q1, q2)
+        tableau.cx(q2, q1)
+        tableau.cx(q1, q2)
+        self.qregs.mark_modified()
+
+    def cswap_gate(self, control, q1, q2):
+        self._non_clifford("cswap")
+
+    def permute_qubits(self, order):
+        """Přeuspořádá qubity: qubit i pak drží stav, který měl qubit order[i]"""
+        order = [int(q) for q in order]
+        if sorted(order) != list(range(self.num_qubits)):
+            raise ValueError(f"order must be a permutation of 0..{self.num_qubits - 1}")
+        tableau = self.qregs.tableau
+        tableau.x[:] = tableau.x[:, order]
+        tableau.z[:] = tableau.z[:, order]
+        self.qregs.mark_modified()
+
+    def ch_gate(self, control, target):
+        self._non_clifford("ch")
+
+    def cs_gate(self, control, target):
+        self._non_clifford("cs")
+
+    def ct_gate(self, control, target):
+        self._non_clifford("ct")
+
+    def ccx_gate(self, control1, control2, target):
+        self._non_clifford("ccx")
+
+    def controlled_gate(self, controls, qubits, matrix):
+        self._non_clifford("controlled unitary")
+
+    def mcx_gate(self, controls, target):
+        self._non_clifford("mcx")
+
+    def mcz_gate(self, controls, target):
+        self._non_clifford("mcz")
+
+    def controlled_rz_gate(self, control, target, angle):
+        self._non_clifford("controlled rz")
+
+    # === KVANTOVÉ ALGORITMY ===
+
+    def create_bell_state(self, q1, q2):
+        """Vytvoří Bell state (maximálně provázaný stav)"""
+        self.h_gate(q1)
+        self.cnot_gate(q1, q2)
+
+    def quantum_fourier_transform(self, qubits):
+        """Kvantová Fourierova transformace (Cliffordovská jen pro jeden qubit)"""
+        n = len(qubits)
+        for j in range(n):
+            self.h_gate(qubits[j])
+            for k in range(j+1, n):
+                self.controlled_rz_gate(qubits[k], qubits[j], math.pi / (2**(k-j)))
+
+        for i in range(n//2):
+            self.swap_gate(qubits[i], qubits[n-1-i])
+
+    # === KLASICKÉ FALLBACKY (pro kompatibilitu s ALU interface) ===
+
+    def add(self, a, b):
+        return a + b, 0
+
+    def sub(self, a, b):
+        return a - b, 0
+
+    def bitwise_and(self, a, b):
+        return a & b
+
+    def bitwise_or(self, a, b):
+        return a | b
+
+    def bitwise_xor(self, a, b):
+        return a ^ b
+
+    def bitwise_not(self, a):
+        return ~a
+
+    def inc(self, a):
+        return self.add(a, 1)
+
+    def dec(self, a):
+        return self.sub(a, 1)
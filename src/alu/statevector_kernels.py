@@ -0,0 +1,151 @@
+# src/alu/statevector_kernels.py
+
+"""
+Vectorized kernels for the statevector simulator.
+
+The state of n qubits is a flat array of 2**n amplitudes where bit q of the
+basis index holds the value of qubit q. Reshaping that array puts a qubit on
+its own axis, so every gate becomes a few whole-array NumPy operations on the
+two halves of the state (target qubit = 0 / target qubit = 1) instead of a
+Python loop over all basis indices.
+
+Kernels work in place on views of the register's state and take their
+temporaries from the register's preallocated scratch buffer (one statevector
+in size), so applying a gate allocates no statevector-sized arrays.
+"""
+
+import numpy as np
+
+
+def pair_views(state, num_qubits, target, controls=()):
+    """
+    Return views (a0, a1) of the amplitudes where the target qubit is 0 / 1.
+
+    When control qubits are given, only amplitudes with every control set to
+    |1⟩ are included, so a controlled gate touches 2**(n-k) amplitudes.
+    Both views share memory with `state`; writing to them updates the state.
+    """
+    if not controls:
+        view = state.reshape(-1, 2, 1 << target)
+        return view[:, 0, :], view[:, 1, :]
+
+    tensor = state.reshape((2,) * num_qubits)
+    # The trailing Ellipsis keeps a 0-d view (not a scalar copy) when every
+    # axis is indexed, e.g. a Toffoli on a 3-qubit register
+    index = [slice(None)] * num_qubits + [Ellipsis]
+    for control in controls:
+        index[num_qubits - 1 - control] = 1
+    index[num_qubits - 1 - target] = 0
+    a0 = tensor[tuple(index)]
+    index[num_qubits - 1 - target] = 1
+    a1 = tensor[tuple(index)]
+    return a0, a1
+
+
+def quad_views(state, num_qubits, first, second, controls=()):
+    """
+    Return views [a00, a01, a10, a11] of the amplitudes split by two qubits.
+
+    Block ij holds the amplitudes with first = i and second = j, matching the
+    basis index 2*i + j of a 4x4 gate matrix.
+    """
+    tensor = state.reshape((2,) * num_qubits)
+    index = [slice(None)] * num_qubits + [Ellipsis]
+    for control in controls:
+        index[num_qubits - 1 - control] = 1
+    blocks = []
+    for bit_first in (0, 1):
+        for bit_second in (0, 1):
+            index[num_qubits - 1 - first] = bit_first
+            index[num_qubits - 1 - second] = bit_second
+            blocks.append(tensor[tuple(index)])
+    return blocks
+
+
+def scratch_views(scratch, shape, count):
+    """Carve `count` arrays of the given shape out of a preallocated scratch buffer."""
+    size = 1
+    for dim in shape:
+        size *= dim
+    return [scratch[i * size:(i + 1) * size].reshape(shape) for i in range(count)]
+
+
+def apply_matrix(a0, a1, matrix, scratch):
+    """Apply a general 2x2 unitary to the pair of halves in place."""
+    matrix = np.asarray(matrix, dtype=a0.dtype)
+    t0, t1 = scratch_views(scratch, a0.shape, 2)
+    np.multiply(a1, matrix[0, 1], out=t0)
+    np.multiply(a0, matrix[1, 0], out=t1)
+    a0 *= matrix[0, 0]
+    a0 += t0
+    a1 *= matrix[1, 1]
+    a1 += t1
+
+
+def apply_flip(a0, a1, scratch):
+    """Exchange the halves in place (Pauli-X on the target)."""
+    # Both halves go through scratch: copying one view of the state straight
+    # into another makes NumPy allocate a temporary for the overlap check.
+    t0, t1 = scratch_views(scratch, a0.shape, 2)
+    np.copyto(t0, a0)
+    np.copyto(t1, a1)
+    np.copyto(a0, t1)
+    np.copyto(a1, t0)
+
+
+def apply_diagonal(a0, a1, phase0, phase1, scratch=None):
+    """Multiply the halves by diagonal phases."""
+    a0 *= a0.dtype.type(phase0)
+    a1 *= a1.dtype.type(phase1)
+
+
+def apply_phase(a0, a1, phase, scratch=None):
+    """Multiply only the |1⟩ half by a phase (Z, S, T, controlled phases)."""
+    a1 *= a1.dtype.type(phase)
+
+
+def apply_matrix4(blocks, matrix, scratch):
+    """Apply a 4x4 unitary to the four blocks from quad_views() in place."""
+    matrix = np.asarray(matrix, dtype=blocks[0].dtype)
+    old = scratch_views(scratch, blocks[0].shape, 4)
+    for src, dst in zip(blocks, old):
+        np.copyto(dst, src)
+    # Block 3 is written last, so until then it doubles as the temporary
+    temp = blocks[3]
+    for k in range(3):
+        np.multiply(old[0], matrix[k, 0], out=blocks[k])
+        for l in range(1, 4):
+            np.multiply(old[l], matrix[k, l], out=temp)
+            blocks[k] += temp
+    # The saved blocks are not needed after the last row and are scaled in place
+    np.multiply(old[0], matrix[3, 0], out=blocks[3])
+    for l in range(1, 4):
+        old[l] *= matrix[3, l]
+        blocks[3] += old[l]
+
+
+def apply_swap(blocks, phase=1, scratch=None):
+    """Exchange blocks 01 and 10 from quad_views() in place (SWAP; iSWAP with phase 1j)."""
+    t01, t10 = scratch_views(scratch, blocks[1].shape, 2)
+    np.copyto(t01, blocks[1])
+    np.copyto(t10, blocks[2])
+    if phase == 1:
+        np.copyto(blocks[1], t10)
+        np.copyto(blocks[2], t01)
+    else:
+        phase = blocks[1].dtype.type(phase)
+        np.multiply(t10, phase, out=blocks[1])
+        np.multiply(t01, phase, out=blocks[2])
+
+
+def permute_qubits(state, num_qubits, order, scratch):
+    """
+    Reorder the qubits in place: afterwards qubit i holds what was qubit order[i].
+
+    The whole permutation is one transposed copy into scratch and one copy back.
+    """
+    # Axis a of the tensor is qubit n-1-a
+    axes = [num_qubits - 1 - order[num_qubits - 1 - axis] for axis in range(num_qubits)]
+    tensor = state.reshape((2,) * num_qubits)
+    np.copyto(scratch.reshape((2,) * num_qubits), tensor.transpose(axes))
+    np.copyto(state, scratch)
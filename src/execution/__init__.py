@@ -0,0 +1,30 @@
+# src/execution/__init__.py
+
+"""
+Execution engines built on top of the Procesor.
+
+These drive a loaded program in ways the single-stepping run loop does not,
+e.g. many shots of the same program, one batched pass over a parameter sweep,
+the closure-compiled run_fast loop or classical blocks compiled to Python.
+"""
+
+from .decode import Instruction, decode_program
+from .fast import compile_program, run_fast
+from .blocks import compile_blocks, run_compiled
+from .shots import run_shots, terminal_measurements
+from .sweep import run_sweep
+from .parallel import run_shots_parallel, run_inputs_parallel
+
+__all__ = [
+    "Instruction",
+    "decode_program",
+    "compile_program",
+    "run_fast",
+    "compile_blocks",
+    "run_compiled",
+    "run_shots",
+    "run_shots_parallel",
+    "run_inputs_parallel",
+    "run_sweep",
+    "terminal_measurements",
+]
@@ -0,0 +1,462 @@
+# src/execution/blocks.py
+
+"""
+Basic-block compilation of classical code to Python source.
+
+compile_blocks generates one Python function per block of classical
+instructions. A block starts at the program start, after an instruction
+that cannot be inlined, and at every jump target and fall-through another
+block leads to. It runs up to the next conditional jump, following
+unconditional jumps, so one call executes e.g. `sub p1 p2 / jmp 13 /
+jmp 6 / eqq p1 p2 / jmpif 15` of programs/gcd.asm. Inside a block the
+registers p0..p7 and the b flag are locals (loaded once on entry, stored
+once on exit) and memory is indexed directly:
+
+    def _block_10():
+        regs = registers.regs
+        p1 = regs[1]
+        p2 = regs[2]
+        p1 = (p1 - p2) & 255
+        b = p1 == p2
+        regs[1] = p1
+        registers.b = b
+        return 15 if b else 8
+
+The whole program is generated as one module and compile()d once per
+decoded program. Quantum gates, measurements, I/O, plugin instructions and
+instructions with unusual operands (e.g. invalid registers) are not
+inlined: they run as single-instruction closures of execution.fast that
+call the processor handlers (and through them the QuantumALU).
+
+run_compiled dispatches on the pc like run_fast, but one call runs a whole
+block. An error inside a block is mapped back to the failing instruction
+through the line number of the generated code, and the registers computed
+before it are written back, so the final state matches step()/run().
+"""
+
+import operator
+
+from ..alu.classical_alu import ClassicalALU
+from ..memory.classical_memory import ClassicalMemory
+from .fast import _Wait, _compile_handler, run_fast
+
+_FILENAME = "<compiled blocks>"
+
+# Longest block (in executed instructions) generated from one start
+_MAX_BLOCK = 64
+
+_COMPARE_OPERATORS = {operator.gt: ">", operator.lt: "<", operator.eq: "=="}
+
+
+class _Block:
+    """Generated source of one (extended) basic block plus what it reads and writes."""
+
+    def __init__(self, start):
+        self.start = start
+        self.size = 0           # Instructions executed by one call
+        self.lines = []         # (pc, instructions before it, statement) of the body
+        self.loads = []         # Registers read before they are written
+        self.stores = set()     # Registers written
+        self.loads_b = False
+        self.stores_b = False
+        self.uses_memory = False
+        self.jump = None        # Unconditional successor set by jmp
+        self.branch = None      # (target, fall-through) set by jmpif, ends the block
+        self.exits = []         # Possible next pcs
+
+    def add(self, pc, statement):
+        self.lines.append((pc, self.size, statement))
+
+    def read(self, name):
+        if name == "b":
+            self.loads_b = self.loads_b or not self.stores_b
+        elif name not in self.stores and name not in self.loads:
+            self.loads.append(name)
+
+    def write(self, name):
+        if name == "b":
+            self.stores_b = True
+        else:
+            self.stores.add(name)
+
+
+class _Generator:
+    """Python source for the inlinable instructions of one processor."""
+
+    def __init__(self, procesor):
+        self.procesor = procesor
+        self.num_registers = len(procesor.registers.regs)
+        memory = procesor.memory
+        # Memory is inlined as dict access only for the plain ClassicalMemory
+        self.memory_size = memory.max_size if (
+            type(memory).read is ClassicalMemory.read and type(memory).write is ClassicalMemory.write) else None
+        self.constants = []
+
+    def constant(self, value):
+        """Name of a factory-level constant holding `value`."""
+        self.constants.append(value)
+        return f"k{len(self.constants) - 1}"
+
+    # --- Operands: expression for reading, statement template for writing ---
+
+    def readable(self, operand):
+        kind, value = operand
+        if kind in ("immediate", "boolean"):
+            return True
+        if kind == "register":
+            return 0 <= value < self.num_registers
+        if kind == "memory_addr":
+            return self.memory_size is not None
+        if kind == "memory_ref":
+            return self.memory_size is not None and 0 <= value < self.num_registers
+        return False
+
+    def value(self, block, operand):
+        """Expression reading a readable operand."""
+        kind, value = operand
+        if kind == "register":
+            block.read(f"p{value}")
+            return f"p{value}"
+        if kind == "immediate":
+            return repr(value)
+        if kind == "boolean":
+            block.read("b")
+            return "b"
+        block.uses_memory = True
+        if kind == "memory_addr":
+            return f"mem.get({value!r}, 0)"
+        block.read(f"p{value}")
+        return f"mem.get(p{value}, 0)"
+
+    def target(self, operand):
+        """(local written or None, statement template) of a writable operand, else None."""
+        kind, value = operand
+        if kind == "register" and 0 <= value < self.num_registers:
+            return f"p{value}", f"p{value} = {{}}"
+        if kind == "boolean":
+            return "b", "b = bool({})"
+        if kind == "memory_addr" and self.memory_size is not None and 0 <= value < self.memory_size:
+            return None, f"mem[{value!r}] = {{}}"
+        return None
+
+    def assign(self, block, pc, dst, expression):
+        written, template = self.target(dst)
+        if written is None:
+            block.uses_memory = True
+        else:
+            block.write(written)
+        block.add(pc, template.format(expression))
+
+    # --- Instructions: append to the block, or return False (before touching it) ---
+
+    def emit(self, block, pc, instr):
+        generate = getattr(self, "_emit" + instr.handler.__name__, None)
+        if generate is None:
+            return False
+        return generate(block, pc, *instr.args) is not False
+
+    def _operands(self, block, reads, dst=None):
+        """Expressions of `reads` if they and the destination can be inlined, else None."""
+        if dst is not None and self.target(dst) is None:
+            return None
+        if not all(self.readable(operand) for operand in reads):
+            return None
+        return [self.value(block, operand) for operand in reads]
+
+    def _emit_execute_nop(self, block, pc):
+        pass
+
+    def _emit_execute_mov(self, block, pc, src, dst):
+        expressions = self._operands(block, (src,), dst)
+        if expressions is None:
+            return False
+        self.assign(block, pc, dst, expressions[0])
+
+    def _emit_execute_alu(self, block, pc, fn, dst, src):
+        expressions = self._operands(block, (dst, src), dst)
+        if expressions is None:
+            return False
+        a, b = expressions
+        # The ClassicalALU add/sub (not overridden) are inlined as masked arithmetic
+        method = getattr(fn, "__func__", None)
+        if method is ClassicalALU.add:
+            expression = f"({a} + {b}) & {fn.__self__.max_value!r}"
+        elif method is ClassicalALU.sub:
+            expression = f"({a} - {b}) & {fn.__self__.max_value!r}"
+        else:
+            expression = f"{self.constant(fn)}({a}, {b})[0]"
+        self.assign(block, pc, dst, expression)
+
+    def _emit_execute_mul(self, block, pc, dst, src):
+        expressions = self._operands(block, (dst, src), dst)
+        if expressions is None:
+            return False
+        self.assign(block, pc, dst, "{} * {}".format(*expressions))
+
+    def _emit_execute_dvd(self, block, pc, dst, src):
+        expressions = self._operands(block, (dst, src), dst)
+        if expressions is None:
+            return False
+        block.add(pc, f"if {expressions[1]} == 0: raise ValueError('Division by zero')")
+        self.assign(block, pc, dst, "{} // {}".format(*expressions))
+
+    def _emit_execute_neg(self, block, pc, dst):
+        expressions = self._operands(block, (dst,), dst)
+        if expressions is None:
+            return False
+        self.assign(block, pc, dst, f"-{expressions[0]}")
+
+    def _emit_execute_compare(self, block, pc, test, a, b):
+        expressions = self._operands(block, (a, b))
+        if expressions is None:
+            return False
+        symbol = _COMPARE_OPERATORS.get(test)
+        if symbol is None:
+            expression = "bool({}({}, {}))".format(self.constant(test), *expressions)
+        else:
+            expression = "{} {} {}".format(expressions[0], symbol, expressions[1])
+        block.write("b")
+        block.add(pc, f"b = {expression}")
+
+    def _logic(self, block, pc, src, combine):
+        expressions = self._operands(block, (src,))
+        if expressions is None:
+            return False
+        block.read("b")
+        block.write("b")
+        block.add(pc, f"b = bool({expressions[0]}) {combine} bool(b)")
+
+    def _emit_execute_and(self, block, pc, src):
+        return self._logic(block, pc, src, "and")
+
+    def _emit_execute_or(self, block, pc, src):
+        return self._logic(block, pc, src, "or")
+
+    def _emit_execute_not(self, block, pc):
+        block.read("b")
+        block.write("b")
+        block.add(pc, "b = not b")
+
+    def _emit_execute_jmp(self, block, pc, target):
+        if not 0 <= target < len(self.procesor.program):
+            return False
+        # step() advances when pc is unchanged, so a jump to itself falls through
+        block.jump = pc + 1 if target == pc else target
+
+    def _emit_execute_jmpif(self, block, pc, target):
+        if not 0 <= target < len(self.procesor.program):
+            return False
+        if target == pc:
+            block.jump = pc + 1
+            return
+        block.read("b")
+        block.branch = (target, pc + 1)
+
+
+def _inlinable(procesor, instr):
+    """Built-in, non-overridden handler of the processor (see execution.fast)."""
+    handler = instr.handler
+    return (getattr(handler, "__self__", None) is procesor
+            and getattr(type(procesor), handler.__name__, None) is handler.__func__)
+
+
+def _extended_block(generator, decoded, inline, start):
+    """
+    Block starting at `start`: inlinable instructions up to the next
+    conditional jump, following unconditional jumps and fall-throughs (so a
+    block may continue past another block's start). Stops before an
+    instruction that cannot be inlined, before the end of the program, at an
+    instruction it already contains or after _MAX_BLOCK instructions.
+    """
+    block = _Block(start)
+    seen = set()
+    pc = start
+    while pc < len(decoded) and inline[pc] and pc not in seen and block.size < _MAX_BLOCK:
+        seen.add(pc)
+        generator.emit(block, pc, decoded[pc])
+        block.size += 1
+        if block.branch is not None:
+            block.exits = list(block.branch)
+            return block
+        if block.jump is not None:
+            pc, block.jump = block.jump, None
+        else:
+            pc += 1
+    block.exits = [pc]
+    return block
+
+
+def _block_source(block):
+    """Source of the block function; returns (lines, (pc, offset) of every line)."""
+    lines = [f"    def _block_{block.start}():"]
+    positions = [(block.start, 0)]
+    # registers.regs is looked up per call: reset() replaces the list
+    prologue = ["regs = registers.regs"] if block.loads or block.stores else []
+    prologue += [f"{name} = regs[{name[1:]}]" for name in block.loads]
+    if block.loads_b:
+        prologue.append("b = registers.b")
+    if block.uses_memory:
+        prologue.append("mem = memory.memory")
+    body = [(block.start, 0, statement) for statement in prologue] + block.lines
+    epilogue = [f"regs[{name[1:]}] = {name}" for name in sorted(block.stores)]
+    if block.stores_b:
+        epilogue.append("registers.b = b")
+    if block.branch is not None:
+        epilogue.append("return {!r} if b else {!r}".format(*block.branch))
+    else:
+        epilogue.append(f"return {block.exits[0]!r}")
+    # Errors cannot happen in the epilogue; it belongs to the last instruction
+    last = block.lines[-1][:2] if block.lines else (block.start, 0)
+    body += [(*last, statement) for statement in epilogue]
+    for pc, offset, statement in body:
+        lines.append("        " + statement)
+        positions.append((pc, offset))
+    return lines, positions
+
+
+class CompiledBlocks:
+    """
+    Generated code of one decoded program. `code` holds the entry of every
+    pc, (function returning the next pc, instructions it executes): the
+    block function where a block starts, else a closure calling the
+    instruction's handler. `positions` maps each line of the generated
+    source to (pc of its instruction, instructions of the block executed
+    before it).
+    """
+
+    def __init__(self, procesor, factory, constants, blocks, positions, source):
+        self.decoded = procesor.decoded
+        functions = factory(procesor.registers, procesor.memory, *constants)
+        sizes = {block.start: block.size for block in blocks}
+        # Not inlined, or a pc inside a block (reached by a plugin jump or a restart)
+        self.code = [(functions[pc], sizes[pc]) if pc in functions
+                     else (_compile_handler(procesor, pc, instr), 1)
+                     for pc, instr in enumerate(self.decoded)]
+        self.starts = set(sizes)
+        # Block start -> (registers written, writes b), for _recover
+        self.stores = {block.start: (sorted(block.stores), block.stores_b) for block in blocks}
+        self.positions = positions
+        self.source = source        # Generated Python, handy for debugging
+
+
+def compile_blocks(procesor):
+    """Compile the processor's decoded program into block functions (CompiledBlocks)."""
+    decoded = procesor.decoded
+    generator = _Generator(procesor)
+    probe = _Generator(procesor)
+    inline = [_inlinable(procesor, instr) and probe.emit(_Block(pc), pc, instr)
+              for pc, instr in enumerate(decoded)]
+    # Blocks start at the program start, after every instruction that is not
+    # inlined and at every exit of another block
+    pending = [0] + [pc + 1 for pc, inlined in enumerate(inline) if not inlined]
+    blocks = {}
+    while pending:
+        start = pending.pop()
+        if start in blocks or start >= len(decoded) or not inline[start]:
+            continue
+        block = blocks[start] = _extended_block(generator, decoded, inline, start)
+        pending.extend(block.exits)
+    blocks = [blocks[start] for start in sorted(blocks)]
+
+    parameters = ", ".join(["registers", "memory"]
+                           + [f"k{i}" for i in range(len(generator.constants))])
+    source = [f"def _factory({parameters}):"]
+    positions = [None]
+    for block in blocks:
+        lines, block_positions = _block_source(block)
+        source.extend(lines)
+        positions.extend(block_positions)
+    functions = ", ".join(f"{block.start}: _block_{block.start}" for block in blocks)
+    source.append(f"    return {{{functions}}}")
+    positions.append(None)
+    source = "\n".join(source) + "\n"
+
+    namespace = {}
+    exec(compile(source, _FILENAME, "exec"), namespace)
+    return CompiledBlocks(procesor, namespace["_factory"], generator.constants, blocks, positions, source)
+
+
+def _recover(compiled, procesor, error, start):
+    """
+    (pc, instructions executed before it) of the instruction that raised
+    `error` inside the block at `start`; writes the registers the block
+    computed before it back to the processor.
+    """
+    traceback = error.__traceback__
+    frame = None
+    while traceback is not None:
+        if traceback.tb_frame.f_code.co_filename == _FILENAME:
+            frame, lineno = traceback.tb_frame, traceback.tb_lineno
+        traceback = traceback.tb_next
+    if frame is None:
+        return start, 0
+    values = frame.f_locals
+    names, writes_b = compiled.stores[start]
+    regs = procesor.registers.regs
+    for name in names:
+        if name in values:
+            regs[int(name[1:])] = values[name]
+    if writes_b and "b" in values:
+        procesor.registers.b = values["b"]
+    return compiled.positions[lineno - 1]
+
+
+def _compiled_for(procesor):
+    """Compiled blocks of the current program, generated once per decoded program."""
+    if procesor._decoded_from is not procesor.program:
+        procesor._decode_program()
+    compiled = procesor._compiled_blocks
+    if compiled is None or compiled.decoded is not procesor.decoded:
+        compiled = procesor._compiled_blocks = compile_blocks(procesor)
+    return compiled
+
+
+def run_compiled(procesor, max_cycles=None):
+    """
+    Run the loaded program from the current pc to the end with compiled
+    blocks.
+
+    Behaves like run_fast: same final state as Procesor.run(), an error is
+    reported and stops the processor at the failing instruction, and the
+    loop returns with `running` still set when an `in` has no input.
+    max_cycles is checked between blocks, so the loop may run up to a
+    block's length past it.
+
+    Blocks write registers and memory directly and fire no hooks, so while
+    any hook (Procesor.add_hook) is registered this runs run_fast.
+    """
+    if any(procesor.hooks.values()):
+        return run_fast(procesor, max_cycles)
+    compiled = _compiled_for(procesor)
+    code = compiled.code
+    registers = procesor.registers
+    end = len(code)
+    pc = registers.pc
+    clock = procesor.clock
+    procesor.running = True
+    try:
+        if max_cycles is None:
+            while pc < end:
+                run, size = code[pc]
+                pc = run()
+                clock += size
+        else:
+            stop = clock + max_cycles
+            while pc < end and clock < stop:
+                run, size = code[pc]
+                pc = run()
+                clock += size
+    except _Wait:
+        pass
+    except Exception as e:
+        if pc in compiled.starts:
+            failed, executed = _recover(compiled, procesor, e, pc)
+            pc = failed
+            clock += executed
+        procesor.output_handler.print_error(f"Error executing {procesor.decoded[pc].opcode}: {e}")
+        procesor.running = False
+    else:
+        if pc >= end:
+            procesor._finish()
+    registers.pc = pc
+    procesor.clock = clock
@@ -0,0 +1,286 @@
+# src/execution/decode.py
+
+"""
+Load-time decoding of programs for the Procesor run loop.
+
+The loader produces instructions as dicts of strings ({"opcode": "add",
+"operands": ["p1", "p2"]}). decode_program turns every one of them into an
+Instruction holding an opcode number, the bound handler method of the
+processor and the already parsed operands, so executing an instruction is a
+single call `instr.handler(*instr.args)` without any string work.
+
+Operands are parsed with the processor's own parse_operand / parse_qubit /
+parse_qubit_range: classical operands become (kind, value) pairs, qubits
+become ints and rotation angles floats (or the parameter name, resolved at
+run time because sweeps rebind parameters after loading).
+
+An instruction that cannot be decoded (unknown opcode, wrong operand count,
+invalid operand) does not fail the load: it decodes to a handler that raises
+the same error when - and only if - the instruction is executed, exactly as
+the string interpreter did.
+
+Every processor owns an InstructionSet (opcode -> decoder), so plugins can
+add instructions to one processor with Procesor.register_instruction.
+"""
+
+import operator
+import types
+
+# Numbers of the built-in opcodes; instructions registered by plugins get
+# the following numbers (see InstructionSet)
+OPCODES = (
+    "nop", "mov", "set", "add", "sub", "mul", "dvd", "neg",
+    "cmp", "gt", "lt", "eqq", "and", "or", "not",
+    "jmp", "jmpif", "out", "in", "push", "pop",
+    "h", "x", "y", "z", "s", "t", "rx", "ry", "rz",
+    "cx", "cnot", "cz", "cy", "ch", "cs", "ct", "ccx", "toffoli",
+    "mcx", "mcz", "swap", "iswap", "cswap", "unitary", "barrier",
+    "measure", "measure_all", "measure_reg", "reset",
+)
+OPCODE_NUMBERS = {opcode: code for code, opcode in enumerate(OPCODES)}
+
+# QuantumALU method of every gate opcode
+GATE_METHODS = {
+    "h": "h_gate", "x": "x_gate", "y": "y_gate", "z": "z_gate",
+    "s": "s_gate", "t": "t_gate",
+    "rx": "rx_gate", "ry": "ry_gate", "rz": "rz_gate",
+    "cx": "cnot_gate", "cnot": "cnot_gate",
+    "cz": "cz_gate", "cy": "cy_gate",
+    "ch": "ch_gate", "cs": "cs_gate", "ct": "ct_gate",
+    "ccx": "ccx_gate", "toffoli": "ccx_gate",
+    "mcx": "mcx_gate", "mcz": "mcz_gate",
+    "swap": "swap_gate", "iswap": "iswap_gate",
+    "cswap": "cswap_gate",
+}
+
+
+class Instruction:
+    """One decoded instruction: run it with `instr.handler(*instr.args)`."""
+
+    __slots__ = ("opcode", "code", "handler", "args", "operands")
+
+    def __init__(self, opcode, code, handler, args, operands):
+        self.opcode = opcode        # Lower-case mnemonic (for messages)
+        self.code = code            # Opcode number, -1 for unknown opcodes
+        self.handler = handler      # Bound method of the processor (or plugin handler)
+        self.args = args            # Pre-parsed operands passed to the handler
+        self.operands = operands    # Source operand strings (for messages)
+
+    def __repr__(self):
+        return f"Instruction({self.opcode} {' '.join(self.operands)})"
+
+
+def _fail(error):
+    """Handler of an instruction that did not decode: raise its error when executed."""
+    raise error.with_traceback(None)
+
+
+def _count(ops, count, message):
+    if len(ops) != count:
+        raise ValueError(message)
+
+
+def _require_quantum(procesor):
+    if procesor.mode not in ("quantum", "hybrid"):
+        raise RuntimeError("Quantum instructions disabled in classical mode")
+
+
+# === Decoders: (procesor, opcode, ops, instr) -> (bound handler, args) ===
+
+def _decode_nop(procesor, opcode, ops, instr):
+    return procesor._execute_nop, ()
+
+
+def _decode_mov(procesor, opcode, ops, instr):
+    _count(ops, 2, "MOV requires 2 operands")
+    # mov src dst, set dst src
+    src, dst = (ops[0], ops[1]) if opcode == "mov" else (ops[1], ops[0])
+    return procesor._execute_mov, (procesor.parse_operand(src), procesor.parse_operand(dst))
+
+
+def _decode_alu(procesor, opcode, ops, instr):
+    _count(ops, 2, "ALU operation requires 2 operands")
+    fn = procesor.classical_alu.add if opcode == "add" else procesor.classical_alu.sub
+    return procesor._execute_alu, (fn, procesor.parse_operand(ops[0]), procesor.parse_operand(ops[1]))
+
+
+def _decode_binary(handler, message):
+    def decode(procesor, opcode, ops, instr):
+        _count(ops, 2, message)
+        return getattr(procesor, handler), (procesor.parse_operand(ops[0]), procesor.parse_operand(ops[1]))
+    return decode
+
+
+def _decode_unary(handler, message):
+    def decode(procesor, opcode, ops, instr):
+        _count(ops, 1, message)
+        return getattr(procesor, handler), (procesor.parse_operand(ops[0]),)
+    return decode
+
+
+_COMPARISONS = {"cmp": operator.gt, "gt": operator.gt, "lt": operator.lt, "eqq": operator.eq}
+
+
+def _decode_compare(procesor, opcode, ops, instr):
+    _count(ops, 2, "EQQ requires 2 operands" if opcode == "eqq" else "CMP requires 2 operands")
+    return procesor._execute_compare, (_COMPARISONS[opcode], procesor.parse_operand(ops[0]),
+                                      procesor.parse_operand(ops[1]))
+
+
+def _decode_not(procesor, opcode, ops, instr):
+    if len(ops) != 1 or ops[0] != 'b':
+        raise ValueError("NOT only works for b register")
+    return procesor._execute_not, ()
+
+
+def _decode_jump(procesor, opcode, ops, instr):
+    _count(ops, 1, f"{opcode.upper()} requires 1 operand")
+    # The target range is checked when the jump is taken
+    return getattr(procesor, "_execute_" + opcode), (int(ops[0]),)
+
+
+def _decode_in(procesor, opcode, ops, instr):
+    _count(ops, 1, "IN requires 1 operand")
+    return procesor._execute_in, (procesor.parse_operand(ops[0]), f"IN for {ops[0]}: ")
+
+
+def _parse_angle(op):
+    try:
+        return float(op)
+    except ValueError:
+        return op   # Parameter name, see Procesor.parse_angle
+
+
+def _decode_gate(procesor, opcode, ops, instr):
+    _require_quantum(procesor)
+    method = GATE_METHODS[opcode]
+    if opcode in ("rx", "ry", "rz"):
+        return procesor._execute_rotation, (method, procesor.parse_qubit(ops[1]), _parse_angle(ops[0]))
+    if opcode in ("ccx", "toffoli"):
+        return procesor._execute_quantum_gate, (method, *[procesor.parse_qubit(ops[k]) for k in range(3)])
+    if opcode in ("mcx", "mcz"):
+        if not ops:
+            raise ValueError(f"{opcode.upper()} requires at least 1 operand")
+        qubits = [procesor.parse_qubit(op) for op in ops]
+        return procesor._execute_quantum_gate, (method, qubits[:-1], qubits[-1])
+    return procesor._execute_quantum_gate, (method, *[procesor.parse_qubit(op) for op in ops])
+
+
+def _decode_unitary(procesor, opcode, ops, instr):
+    _require_quantum(procesor)
+    return procesor._execute_unitary, ([procesor.parse_qubit(op) for op in ops], instr["matrix"])
+
+
+def _decode_barrier(procesor, opcode, ops, instr):
+    if ops:
+        raise ValueError("BARRIER takes no operands")
+    return procesor._execute_barrier, ()
+
+
+def _decode_measure(procesor, opcode, ops, instr):
+    _count(ops, 2, "MEASURE requires 2 operands")
+    return procesor._execute_measure, (procesor.parse_qubit(ops[0]), procesor.parse_operand(ops[1]))
+
+
+def _decode_measure_all(procesor, opcode, ops, instr):
+    if len(ops) > 1:
+        raise ValueError("MEASURE_ALL takes at most 1 operand")
+    return procesor._execute_measure_all, (procesor.parse_operand(ops[0]) if ops else None,)
+
+
+def _decode_measure_reg(procesor, opcode, ops, instr):
+    _count(ops, 2, "MEASURE_REG requires 2 operands")
+    first, last = procesor.parse_qubit_range(ops[0])
+    return procesor._execute_measure_reg, (first, last, procesor.parse_operand(ops[1]))
+
+
+def _decode_reset(procesor, opcode, ops, instr):
+    _count(ops, 1, "RESET requires 1 operand")
+    return procesor._execute_reset, (procesor.parse_qubit(ops[0]),)
+
+
+DECODERS = {
+    "nop": _decode_nop,
+    "mov": _decode_mov, "set": _decode_mov,
+    "add": _decode_alu, "sub": _decode_alu,
+    "mul": _decode_binary("_execute_mul", "MUL requires 2 operands"),
+    "dvd": _decode_binary("_execute_dvd", "DVD requires 2 operands"),
+    "neg": _decode_unary("_execute_neg", "NEG requires 1 operand"),
+    "cmp": _decode_compare, "gt": _decode_compare, "lt": _decode_compare, "eqq": _decode_compare,
+    "and": _decode_unary("_execute_and", "AND requires 1 operand"),
+    "or": _decode_unary("_execute_or", "OR requires 1 operand"),
+    "not": _decode_not,
+    "jmp": _decode_jump, "jmpif": _decode_jump,
+    "out": _decode_unary("_execute_out", "OUT requires 1 operand"),
+    "in": _decode_in,
+    "push": _decode_unary("_execute_push", "PUSH requires 1 operand"),
+    "pop": _decode_unary("_execute_pop", "POP requires 1 operand"),
+    "unitary": _decode_unitary,
+    "barrier": _decode_barrier,
+    "measure": _decode_measure,
+    "measure_all": _decode_measure_all,
+    "measure_reg": _decode_measure_reg,
+    "reset": _decode_reset,
+}
+DECODERS.update({opcode: _decode_gate for opcode in GATE_METHODS})
+
+
+def _plugin_decoder(handler, parse):
+    """Decoder of an instruction added by Procesor.register_instruction."""
+    def decode(procesor, opcode, ops, instr):
+        if parse is None:
+            args = tuple(procesor.parse_operand(op) for op in ops)
+        else:
+            args = tuple(parse(procesor, ops))
+        return types.MethodType(handler, procesor), args
+    return decode
+
+
+class InstructionSet:
+    """
+    Opcode table of one processor: opcode -> (number, decoder). Starts with
+    the built-in instructions; register() adds or replaces one. Looking an
+    opcode up is one dict access, whatever the opcode. `plugins` keeps the
+    registered (handler, parse) pairs so another processor (e.g. a parallel
+    worker) can replay them.
+    """
+
+    def __init__(self):
+        self.decoders = dict(DECODERS)
+        self.numbers = dict(OPCODE_NUMBERS)
+        self.plugins = {}
+
+    def __contains__(self, opcode):
+        return opcode in self.decoders
+
+    def register(self, opcode, handler, parse=None):
+        """
+        Add instruction `opcode` (or replace the built-in one).
+
+        handler(procesor, *args) executes it, see Procesor.register_instruction;
+        parse(procesor, operands) turns the operand strings into args at load
+        time (default: every operand through procesor.parse_operand).
+        """
+        opcode = opcode.lower()
+        self.plugins[opcode] = (handler, parse)
+        self.decoders[opcode] = _plugin_decoder(handler, parse)
+        self.numbers.setdefault(opcode, len(self.numbers))
+
+    def decode(self, procesor, instr):
+        """Decode one instruction dict for `procesor`."""
+        opcode = instr["opcode"].lower()
+        operands = instr.get("operands", [])
+        try:
+            decoder = self.decoders.get(opcode)
+            if decoder is None:
+                raise ValueError(f"Unknown opcode: {opcode}")
+            handler, args = decoder(procesor, opcode, operands, instr)
+        except Exception as error:
+            handler, args = _fail, (error,)
+        return Instruction(opcode, self.numbers.get(opcode, -1), handler, args, operands)
+
+
+def decode_program(procesor, program):
+    """Decode a whole program (list of instruction dicts) with the processor's instruction set."""
+    decode = procesor.instruction_set.decode
+    return [decode(procesor, instr) for instr in program]
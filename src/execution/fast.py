@@ -0,0 +1,329 @@
+# src/execution/fast.py
+
+"""
+Closure-compiled (direct-threaded) execution of a loaded program.
+
+compile_program turns the decoded program (see execution.decode) into one
+closure per instruction. A closure executes its instruction and returns the
+index of the next one, so run_fast is a tight loop over a local pc:
+
+    while pc < end:
+        pc = code[pc]()
+
+Closures capture their operand accessors: register operands read and write
+the register list directly, immediates are constants, jump targets are
+resolved at compile time. Classical data and control instructions get
+specialized closures; everything else (quantum gates, measurements, I/O,
+plugin instructions) calls its decoded handler.
+
+Unlike step(), the loop keeps pc and the clock in locals and does not apply
+cycle_delay, so it is meant for batch runs, not for the GUI single-stepper.
+The processor state (pc, clock, running) is written back when the loop
+stops. Instruction hooks (Procesor.add_hook, also used by debug output) need
+the live state, so while any is registered run_fast simply steps.
+"""
+
+import operator
+
+
+class _Wait(Exception):
+    """Raised by a closure whose instruction waits for input (`in` without a value)."""
+
+
+def _reader(procesor, operand):
+    """Zero-argument function returning the current value of a decoded operand."""
+    kind, value = operand
+    registers = procesor.registers
+    if kind == "register" and 0 <= value < len(registers.regs):
+        regs = registers.regs
+        return lambda: regs[value]
+    if kind == "immediate":
+        return lambda: value
+    if kind == "boolean":
+        return lambda: registers.b
+    get = procesor.get_operand_value
+    return lambda: get(kind, value)
+
+
+def _writer(procesor, operand):
+    """One-argument function storing a value into a decoded operand."""
+    kind, value = operand
+    registers = procesor.registers
+    if kind == "register" and 0 <= value < len(registers.regs):
+        regs = registers.regs
+
+        def write(result):
+            regs[value] = result
+        return write
+    if kind == "boolean":
+        def write(result):
+            registers.b = bool(result)
+        return write
+    put = procesor.set_operand_value
+    return lambda result: put(kind, value, result)
+
+
+def _register(procesor, operand):
+    """Register index of a plain register operand, else None."""
+    kind, value = operand
+    if kind == "register" and 0 <= value < len(procesor.registers.regs):
+        return value
+    return None
+
+
+# === Closure builders: (procesor, pc, *decoded args) -> closure ===
+
+def _compile_nop(procesor, pc):
+    following = pc + 1
+    return lambda: following
+
+
+def _compile_mov(procesor, pc, src, dst):
+    following = pc + 1
+    regs = procesor.registers.regs
+    source, target = _register(procesor, src), _register(procesor, dst)
+    if target is not None and source is not None:
+        def op():
+            regs[target] = regs[source]
+            return following
+        return op
+    if target is not None and src[0] == "immediate":
+        constant = src[1]
+
+        def op():
+            regs[target] = constant
+            return following
+        return op
+    read, write = _reader(procesor, src), _writer(procesor, dst)
+
+    def op():
+        write(read())
+        return following
+    return op
+
+
+def _compile_alu(procesor, pc, fn, dst, src):
+    following = pc + 1
+    regs = procesor.registers.regs
+    target, source = _register(procesor, dst), _register(procesor, src)
+    if target is not None and source is not None:
+        def op():
+            regs[target] = fn(regs[target], regs[source])[0]
+            return following
+        return op
+    if target is not None and src[0] == "immediate":
+        constant = src[1]
+
+        def op():
+            regs[target] = fn(regs[target], constant)[0]
+            return following
+        return op
+    read_dst, read_src, write = _reader(procesor, dst), _reader(procesor, src), _writer(procesor, dst)
+
+    def op():
+        write(fn(read_dst(), read_src())[0])
+        return following
+    return op
+
+
+def _compile_arithmetic(fn):
+    """mul / neg: same operand pattern as the ALU instructions, without carry."""
+    def build(procesor, pc, dst, src=None):
+        following = pc + 1
+        read_dst, write = _reader(procesor, dst), _writer(procesor, dst)
+        if src is None:
+            def op():
+                write(fn(read_dst()))
+                return following
+            return op
+        read_src = _reader(procesor, src)
+
+        def op():
+            write(fn(read_dst(), read_src()))
+            return following
+        return op
+    return build
+
+
+def _compile_dvd(procesor, pc, dst, src):
+    following = pc + 1
+    read_dst, read_src, write = _reader(procesor, dst), _reader(procesor, src), _writer(procesor, dst)
+
+    def op():
+        dividend, divisor = read_dst(), read_src()
+        if divisor == 0:
+            raise ValueError("Division by zero")
+        write(dividend // divisor)
+        return following
+    return op
+
+
+def _compile_compare(procesor, pc, test, a, b):
+    following = pc + 1
+    registers = procesor.registers
+    regs = registers.regs
+    first, second = _register(procesor, a), _register(procesor, b)
+    if first is not None and second is not None:
+        def op():
+            registers.b = test(regs[first], regs[second])
+            return following
+        return op
+    read_a, read_b = _reader(procesor, a), _reader(procesor, b)
+
+    def op():
+        registers.b = bool(test(read_a(), read_b()))
+        return following
+    return op
+
+
+def _compile_logic(combine):
+    def build(procesor, pc, src):
+        following = pc + 1
+        registers = procesor.registers
+        read = _reader(procesor, src)
+
+        def op():
+            registers.b = combine(bool(read()), bool(registers.b))
+            return following
+        return op
+    return build
+
+
+def _compile_not(procesor, pc):
+    following = pc + 1
+    registers = procesor.registers
+
+    def op():
+        registers.b = not registers.b
+        return following
+    return op
+
+
+def _out_of_range(target):
+    def op():
+        raise ValueError(f"Jump target {target} out of range")
+    return op
+
+
+def _compile_jmp(procesor, pc, target):
+    if not 0 <= target < len(procesor.program):
+        return _out_of_range(target)
+    if target == pc:
+        # step() advances when pc is unchanged, so a jump to itself falls through
+        target = pc + 1
+    return lambda: target
+
+
+def _compile_jmpif(procesor, pc, target):
+    following = pc + 1
+    registers = procesor.registers
+    if not 0 <= target < len(procesor.program):
+        fail = _out_of_range(target)
+        return lambda: fail() if registers.b else following
+    if target == pc:
+        target = following
+    return lambda: target if registers.b else following
+
+
+def _compile_handler(procesor, pc, instr):
+    """Generic closure: call the decoded handler, honour jumps it makes through registers.pc."""
+    following = pc + 1
+    registers = procesor.registers
+    handler, args = instr.handler, instr.args
+
+    def op():
+        registers.pc = pc
+        if handler(*args) is False:
+            raise _Wait()
+        return following if registers.pc == pc else registers.pc
+    return op
+
+
+# Handler method name -> closure builder taking the decoded args
+_BUILDERS = {
+    "_execute_nop": _compile_nop,
+    "_execute_mov": _compile_mov,
+    "_execute_alu": _compile_alu,
+    "_execute_mul": _compile_arithmetic(operator.mul),
+    "_execute_neg": _compile_arithmetic(operator.neg),
+    "_execute_dvd": _compile_dvd,
+    "_execute_compare": _compile_compare,
+    "_execute_and": _compile_logic(lambda a, b: a and b),
+    "_execute_or": _compile_logic(lambda a, b: a or b),
+    "_execute_not": _compile_not,
+    "_execute_jmp": _compile_jmp,
+    "_execute_jmpif": _compile_jmpif,
+}
+
+
+def compile_instruction(procesor, pc, instr):
+    """Closure executing decoded instruction `instr` at index `pc` and returning the next pc."""
+    handler = instr.handler
+    # Only the processor's own built-in handlers are specialized
+    if getattr(handler, "__self__", None) is procesor:
+        build = _BUILDERS.get(handler.__name__)
+        if build is not None and getattr(type(procesor), handler.__name__, None) is handler.__func__:
+            return build(procesor, pc, *instr.args)
+    return _compile_handler(procesor, pc, instr)
+
+
+def compile_program(procesor):
+    """Compile the processor's decoded program into a list of closures."""
+    return [compile_instruction(procesor, pc, instr) for pc, instr in enumerate(procesor.decoded)]
+
+
+def _run_steps(procesor, max_cycles=None):
+    """run_fast through step(), which fires the instruction hooks."""
+    end = len(procesor.program)
+    stop = None if max_cycles is None else procesor.clock + max_cycles
+    procesor.running = True
+    while procesor.running:
+        if stop is not None and procesor.clock >= stop and procesor.registers.pc < end:
+            return
+        clock = procesor.clock
+        if not procesor.step():
+            return      # Finished
+        if procesor.clock == clock:
+            return      # Error, or an `in` without input
+
+
+def run_fast(procesor, max_cycles=None):
+    """
+    Run the loaded program from the current pc to the end with compiled closures.
+
+    Output, registers, memory, measurements and the clock end up the same as
+    after Procesor.run(). An error is reported and stops the processor at the
+    failing instruction. The loop also returns, with `running` still set, when
+    an `in` has no input (pc stays on it) or after max_cycles instructions;
+    calling run_fast again resumes.
+    """
+    if procesor.hooks["pre_instruction"] or procesor.hooks["post_instruction"]:
+        return _run_steps(procesor, max_cycles)
+    if procesor._decoded_from is not procesor.program:
+        procesor._decode_program()
+    code = compile_program(procesor)
+    registers = procesor.registers
+    end = len(code)
+    pc = registers.pc
+    clock = procesor.clock
+    procesor.running = True
+    try:
+        if max_cycles is None:
+            while pc < end:
+                pc = code[pc]()
+                clock += 1
+        else:
+            stop = clock + max_cycles
+            while pc < end and clock < stop:
+                pc = code[pc]()
+                clock += 1
+    except _Wait:
+        pass
+    except Exception as e:
+        procesor.output_handler.print_error(f"Error executing {procesor.decoded[pc].opcode}: {e}")
+        procesor.running = False
+    else:
+        if pc >= end:
+            procesor._finish()
+    registers.pc = pc
+    procesor.clock = clock
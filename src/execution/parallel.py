@@ -0,0 +1,345 @@
+# src/execution/parallel.py
+
+"""
+Process-pool execution of many shots or many input vectors of one program.
+
+The parent prepares the program once: it runs it up to the first measurement
+and publishes that pre-measurement statevector in a
+multiprocessing.shared_memory block. Workers attach to the block by name (no
+pickling of 2**n amplitudes) and either
+
+- sample terminal measurements from their own slice of the statevector
+  (every worker computes the probabilities of its slice, the parent splits
+  the shots between slices by their total probability), or
+- copy the shared state into their own Procesor and run the rest of the
+  program for each of their shots (measurement feedback / hybrid programs).
+
+Backends without a dense state that fits the memory budget (stabilizer,
+sparse over the budget, memmap) skip the shared block: terminal measurements
+are sampled by the registers themselves, other programs are rerun from
+scratch in workers rebuilt with the same backend.
+
+Input vectors (values consumed by `in`) are spread over the pool the same
+way, one full run per vector. Results are merged into one counts dict or one
+list of per-input reports.
+
+Instructions added with Procesor.register_instruction are replayed in every
+worker. Under the "fork" start method any handler works; other start methods
+pickle them, so handlers and parsers must be module-level functions there.
+
+Each job gets its own child seed of the processor's RandomSource, so a
+seeded processor gives the same merged result for the same worker count.
+"""
+
+import multiprocessing as mp
+import os
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .shots import MEASURE_OPCODES, _run_until, terminal_measurements
+
+# Backends whose state can be exported as a dense statevector (sparse only
+# while the dense export fits the memory budget)
+_DENSE_BACKENDS = ("statevector", "sparse")
+
+# State of the current worker process, filled by _init_worker
+_worker = {}
+
+
+class _CollectingOutput:
+    """Output handler that records program output and errors in lists."""
+
+    def __init__(self):
+        self.outputs = []
+        self.errors = []
+
+    def print_output(self, message, end='\n'):
+        self.outputs.append(message)
+
+    def print_error(self, error_message):
+        self.errors.append(error_message)
+
+    def print_debug(self, debug_message, debug_enabled=False):
+        pass
+
+
+class _ScriptedInput:
+    """Input handler that answers `in` from a fixed list of values."""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def read_keyboard_input(self, prompt=""):
+        if not self.values:
+            raise RuntimeError("Input vector exhausted")
+        return self.values.pop(0)
+
+
+def _snapshot(procesor):
+    """Classical part of the processor state (registers, memory, clock)."""
+    registers = procesor.registers
+    return {
+        "regs": list(registers.regs),
+        "pc": registers.pc,
+        "b": registers.b,
+        "memory": dict(procesor.memory.memory),
+        "queue": list(procesor.memory.queue),
+        "clock": procesor.clock,
+    }
+
+
+def _restore(procesor, snapshot):
+    registers = procesor.registers
+    registers.regs = list(snapshot["regs"])
+    registers.pc = snapshot["pc"]
+    registers.b = snapshot["b"]
+    procesor.memory.memory = dict(snapshot["memory"])
+    procesor.memory.queue.clear()
+    procesor.memory.queue.extend(snapshot["queue"])
+    procesor.clock = snapshot["clock"]
+    procesor.program_finished_shown = False
+
+
+def _plugins(procesor):
+    """Registered instructions as (opcode, handler, parse), checked for the pool's start method."""
+    plugins = [(opcode, handler, parse)
+               for opcode, (handler, parse) in procesor.instruction_set.plugins.items()]
+    if plugins and mp.get_start_method() != "fork":
+        try:
+            pickle.dumps(plugins)
+        except Exception as error:
+            names = ", ".join(opcode for opcode, _, _ in plugins)
+            raise RuntimeError(
+                f"Registered instructions ({names}) cannot be sent to worker processes: {error}; "
+                f"use module-level handler and parse functions or run without workers"
+            ) from error
+    return plugins
+
+
+def _config(procesor, backend):
+    """Everything a worker needs to rebuild an equivalent Procesor."""
+    return {
+        "mode": procesor.mode,
+        "num_qubits": procesor.num_qubits,
+        "precision": procesor.precision,
+        "memory_budget": procesor.memory_budget,
+        "fill_ratio": procesor.fill_ratio,
+        "defer_gates": procesor.defer_gates,
+        "memmap_dir": procesor.memmap_dir,
+        "chunk_qubits": procesor.chunk_qubits,
+        "backend": backend or procesor.backend,
+        "program": procesor.program,
+        "parameters": procesor.parameters,
+        "plugins": _plugins(procesor),
+    }
+
+
+def _make_procesor(config, seed, input_values=()):
+    """Worker-side Procesor running the already prepared program."""
+    from ..procesor import Procesor
+
+    output = _CollectingOutput()
+    procesor = Procesor(mode=config["mode"], custom_output_handler=output,
+                        custom_input_handler=_ScriptedInput(input_values),
+                        num_qubits=config["num_qubits"], precision=config["precision"],
+                        memory_budget=config["memory_budget"], fuse_gates=False,
+                        backend=config["backend"], fill_ratio=config["fill_ratio"], seed=seed,
+                        defer_gates=config["defer_gates"], memmap_dir=config["memmap_dir"],
+                        chunk_qubits=config["chunk_qubits"])
+    for opcode, handler, parse in config["plugins"]:
+        procesor.register_instruction(opcode, handler, parse)
+    # The program was prepared (fused, backend chosen) by the parent
+    procesor.program = config["program"]
+    procesor.parameters = dict(config["parameters"])
+    return procesor, output
+
+
+def _init_worker(config, shared):
+    """Pool initializer: keep the config and attach to the shared statevector."""
+    _worker.clear()
+    _worker["config"] = config
+    if shared is not None:
+        name, shape, dtype = shared
+        # Pool workers share the parent's resource tracker, so attaching does
+        # not add a second owner; the parent unlinks the block when done
+        block = shared_memory.SharedMemory(name=name)
+        _worker["block"] = block
+        _worker["state"] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# === Worker jobs ===
+
+def _chunk_mass(start, stop):
+    """Total probability of the basis states start..stop-1."""
+    chunk = _worker["state"][start:stop]
+    return float(np.einsum('i,i->', chunk.real, chunk.real) + np.einsum('i,i->', chunk.imag, chunk.imag))
+
+
+def _sample_chunk(start, stop, shots, qubits, seed):
+    """Draw `shots` basis states from start..stop-1 and count measured bitstrings."""
+    chunk = _worker["state"][start:stop]
+    probs = np.square(np.abs(chunk), dtype=np.float64)
+    counts = np.random.default_rng(seed).multinomial(shots, probs / probs.sum())
+    result = {}
+    for offset in np.flatnonzero(counts):
+        index = start + int(offset)
+        key = "".join(str((index >> q) & 1) for q in qubits)
+        result[key] = result.get(key, 0) + int(counts[offset])
+    return result
+
+
+def _run_shot_batch(shots, snapshot, seed):
+    """Run `shots` shots from the prepared state, return {bitstring: count}."""
+    procesor, _ = _make_procesor(_worker["config"], seed)
+    state = _worker.get("state")
+    counts = {}
+    for _ in range(shots):
+        procesor.reset()
+        if state is not None:
+            procesor.quantum_registers.set_full_state(state)
+            _restore(procesor, snapshot)
+        procesor.measurement_log = []
+        _run_until(procesor, len(procesor.program))
+        key = "".join(str(bit) for bit in procesor.measurement_log)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def _run_input(values, seed):
+    """Run the program once with one input vector, return its report."""
+    procesor, output = _make_procesor(_worker["config"], seed, values)
+    procesor.reset()
+    procesor.measurement_log = []
+    procesor.running = True
+    while procesor.running and procesor.step():
+        pass
+    return {
+        "outputs": output.outputs,
+        "errors": output.errors,
+        "registers": list(procesor.registers.regs),
+        "measurements": procesor.measurement_log,
+        "clock": procesor.clock,
+    }
+
+
+# === Parent side ===
+
+def _split(total, parts):
+    """Split `total` into `parts` near-equal non-negative integers."""
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+class _Pool:
+    """multiprocessing pool plus the shared-memory block holding the prepared state."""
+
+    def __init__(self, workers, config, state=None):
+        self.block = None
+        shared = None
+        if state is not None:
+            self.block = shared_memory.SharedMemory(create=True, size=max(state.nbytes, 1))
+            np.ndarray(state.shape, dtype=state.dtype, buffer=self.block.buf)[:] = state
+            shared = (self.block.name, state.shape, state.dtype.str)
+        try:
+            self.pool = mp.get_context().Pool(workers, initializer=_init_worker, initargs=(config, shared))
+        except Exception:
+            self._release()
+            raise
+
+    def _release(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def __enter__(self):
+        return self.pool
+
+    def __exit__(self, *exc):
+        self.pool.terminate()
+        self.pool.join()
+        self._release()
+        return False
+
+
+def _merge(counts_list):
+    merged = {}
+    for counts in counts_list:
+        for key, count in counts.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def run_shots_parallel(procesor, shots, workers=None):
+    """
+    Run the loaded program `shots` times on a pool of `workers` processes
+    (default: os.cpu_count()) and return the merged {bitstring: count}.
+
+    Counts use the same keys as shots.run_shots.
+    """
+    if procesor.quantum_registers is None:
+        raise RuntimeError("Multi-shot execution needs quantum or hybrid mode")
+    if not procesor.program:
+        raise RuntimeError("No program loaded")
+    if shots < 1:
+        raise ValueError("shots must be positive")
+    workers = workers or os.cpu_count() or 1
+
+    dense = procesor.active_backend in _DENSE_BACKENDS and procesor._statevector_fits()
+    plan = terminal_measurements(procesor.program, procesor.num_qubits)
+    output_handler = procesor.output_handler
+    procesor.output_handler = _CollectingOutput()
+    try:
+        if plan is not None:
+            first, qubits = plan
+            procesor.reset()
+            _run_until(procesor, first)
+        else:
+            # Run from a fresh state until the next instruction is a measurement
+            procesor.reset()
+            _run_until(procesor, None, MEASURE_OPCODES)
+        state = procesor.quantum_registers.get_full_state() if dense else None
+        snapshot = _snapshot(procesor)
+    finally:
+        procesor.output_handler = output_handler
+
+    if plan is not None and not dense:
+        # Stabilizer and sparse sampling never build the dense vector - no pool needed
+        return procesor.quantum_registers.sample_counts(plan[1], shots)
+
+    seeds = procesor.rng.seed_sequence.spawn(workers)
+    backend = "statevector" if dense else procesor.active_backend
+    with _Pool(workers, _config(procesor, backend), state) as pool:
+        if plan is not None:
+            size = state.size
+            bounds = [(i * size // workers, (i + 1) * size // workers) for i in range(workers)]
+            masses = np.array(pool.starmap(_chunk_mass, bounds))
+            split = procesor.rng.multinomial(shots, masses / masses.sum())
+            jobs = [(start, stop, int(count), plan[1], seed)
+                    for (start, stop), count, seed in zip(bounds, split, seeds) if count]
+            return _merge(pool.starmap(_sample_chunk, jobs))
+
+        jobs = [(count, snapshot, seed) for count, seed in zip(_split(shots, workers), seeds) if count]
+        return _merge(pool.starmap(_run_shot_batch, jobs))
+
+
+def run_inputs_parallel(procesor, inputs, workers=None):
+    """
+    Run the loaded program once per input vector on a pool of `workers`
+    processes. Each vector is the list of values returned to successive `in`
+    instructions.
+
+    Returns one report per input, in input order:
+    {"outputs", "errors", "registers", "measurements", "clock"}.
+    """
+    if not procesor.program:
+        raise RuntimeError("No program loaded")
+    inputs = [list(values) for values in inputs]
+    if not inputs:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(inputs))
+    seeds = procesor.rng.seed_sequence.spawn(len(inputs))
+    with _Pool(workers, _config(procesor, procesor.active_backend)) as pool:
+        return pool.starmap(_run_input, zip(inputs, seeds))
@@ -0,0 +1,177 @@
+# src/execution/shots.py
+
+"""
+Multi-shot execution of quantum and hybrid programs.
+
+When every measurement is terminal (after the first `measure` nothing changes
+the quantum state and no jump can be taken), the circuit is simulated once and
+all shots are drawn from the final probability vector with a single
+multinomial call. Otherwise a measurement result may feed back into classical
+control flow and each shot re-runs the program from a fresh state.
+
+Counts are keyed by bitstring, one bit per measured qubit in execution
+order (first measurement leftmost); `measure_all` and `measure_reg qA-qB`
+contribute one bit per qubit, lowest qubit first.
+"""
+
+from ..alu import gate_matrices as gates
+from .decode import OPCODE_NUMBERS
+
+JUMP_OPCODES = ("jmp", "jmpif")
+
+# Instructions that measure qubits into classical bits
+MEASURE_OPCODES = ("measure", "measure_all", "measure_reg")
+
+# Instructions that change the quantum state
+STATE_OPCODES = (
+    set(gates.SINGLE_QUBIT_GATES) | set(gates.ROTATION_GATES) | set(gates.TWO_QUBIT_GATES)
+    | {"ccx", "toffoli", "cswap", "mcx", "mcz", "unitary", "reset"}
+)
+
+
+def _qubit_index(op):
+    if op.startswith("q") and op[1:].isdigit():
+        return int(op[1:])
+    return None
+
+
+def measured_qubits(instr, num_qubits=None):
+    """
+    Qubits measured by a measure/measure_all/measure_reg instruction, in the
+    order their bits are logged, or None when they cannot be determined
+    (measure_all without num_qubits, malformed operands).
+    """
+    opcode = instr.get("opcode", "").lower()
+    operands = instr.get("operands", [])
+    if opcode == "measure":
+        qubit = _qubit_index(operands[0]) if operands else None
+        return None if qubit is None else [qubit]
+    if opcode == "measure_all":
+        return None if num_qubits is None else list(range(num_qubits))
+    if opcode == "measure_reg" and operands:
+        first, _, last = operands[0].partition("-")
+        first = _qubit_index(first)
+        last = _qubit_index(last) if last else first
+        if first is None or last is None or last < first:
+            return None
+        return list(range(first, last + 1))
+    return None
+
+
+def first_measurement(program):
+    """Index of the first measuring instruction, or None."""
+    for index, instr in enumerate(program):
+        if instr.get("opcode", "").lower() in MEASURE_OPCODES:
+            return index
+    return None
+
+
+def terminal_measurements(program, num_qubits=None):
+    """
+    Return (first_measure_index, measured_qubits) if all measurements are
+    terminal, else None.
+
+    Jumps are allowed only before the first measurement and only to targets
+    at or before it, so execution reaches the measurements exactly once and
+    then runs straight to the end. num_qubits is needed to expand
+    `measure_all`. Opcodes that are not built in (registered by plugins) after
+    the first measurement make the measurements non-terminal.
+    """
+    first = first_measurement(program)
+    if first is None:
+        return None
+    opcodes = [instr.get("opcode", "").lower() for instr in program]
+
+    qubits = []
+    for index, (opcode, instr) in enumerate(zip(opcodes, program)):
+        operands = instr.get("operands", [])
+        if opcode in JUMP_OPCODES:
+            if index >= first:
+                return None
+            if len(operands) != 1 or not operands[0].isdigit() or int(operands[0]) > first:
+                return None
+        if index < first:
+            continue
+        if opcode in MEASURE_OPCODES:
+            measured = measured_qubits(instr, num_qubits)
+            if measured is None:
+                return None
+            qubits.extend(measured)
+        elif opcode in STATE_OPCODES or opcode not in OPCODE_NUMBERS:
+            # Instructions added by plugins may touch the qubits
+            return None
+    return first, qubits
+
+
+class _QuietOutput:
+    """Output handler wrapper that drops program output but keeps errors."""
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+
+    def print_output(self, message, end='\n'):
+        pass
+
+    def print_error(self, error_message):
+        self.wrapped.print_error(error_message)
+
+    def print_debug(self, debug_message, debug_enabled=False):
+        self.wrapped.print_debug(debug_message, debug_enabled=debug_enabled)
+
+
+def _run_until(procesor, stop, stop_opcodes=()):
+    """
+    Step the processor until pc reaches `stop` (None = no fixed index), the
+    next instruction is one of `stop_opcodes`, or the program ends.
+    """
+    procesor.running = True
+    program = procesor.program
+    end = len(program)
+    while procesor.running:
+        pc = procesor.registers.get("pc")
+        if pc == stop or pc >= end:
+            return
+        if stop_opcodes and program[pc].get("opcode", "").lower() in stop_opcodes:
+            return
+        clock = procesor.clock
+        procesor.step()
+        if procesor.running and procesor.clock == clock:
+            raise RuntimeError(f"Shot waits for input at instruction {pc}")
+    raise RuntimeError(f"Shot aborted at instruction {procesor.registers.get('pc')}")
+
+
+def run_shots(procesor, shots, quiet=True):
+    """
+    Run the loaded program `shots` times and return {bitstring: count}.
+
+    quiet: suppress `out` output of the individual shots (errors still show)
+    """
+    if procesor.quantum_registers is None:
+        raise RuntimeError("Multi-shot execution needs quantum or hybrid mode")
+    if not procesor.program:
+        raise RuntimeError("No program loaded")
+    if shots < 1:
+        raise ValueError("shots must be positive")
+
+    output_handler = procesor.output_handler
+    if quiet:
+        procesor.output_handler = _QuietOutput(output_handler)
+    try:
+        plan = terminal_measurements(procesor.program, procesor.num_qubits)
+        if plan is not None:
+            first, qubits = plan
+            procesor.reset()
+            _run_until(procesor, first)
+            return procesor.quantum_registers.sample_counts(qubits, shots)
+
+        counts = {}
+        for _ in range(shots):
+            procesor.reset()
+            procesor.measurement_log = []
+            _run_until(procesor, len(procesor.program))
+            key = "".join(str(bit) for bit in procesor.measurement_log)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    finally:
+        procesor.output_handler = output_handler
+        procesor.measurement_log = None
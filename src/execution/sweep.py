@@ -0,0 +1,85 @@
+# src/execution/sweep.py
+
+"""
+Parameter sweeps over rotation angles.
+
+A rotation operand may name a parameter instead of a number, e.g.
+`rx theta q0`. run_sweep binds every parameter to an array of angles, swaps
+the processor's quantum backend for a BatchedQuantumRegisters holding one
+statevector per sweep point and executes the program once. Every gate then
+updates the whole batch in one NumPy operation.
+
+Measurements must be terminal (see shots.terminal_measurements): the sweep
+stops at the first measurement and reports the distribution of the measured
+qubits instead of sampling it.
+"""
+
+import numpy as np
+
+from ..alu.batched_alu import BatchedQuantumALU
+from ..registers.batched_registers import BatchedQuantumRegisters
+from .shots import _QuietOutput, _run_until, first_measurement, terminal_measurements
+
+
+def _sweep_size(params):
+    sizes = {name: np.size(values) for name, values in params.items()}
+    if not sizes:
+        raise ValueError("run_sweep needs at least one parameter")
+    batch = max(sizes.values())
+    for name, size in sizes.items():
+        if size not in (1, batch):
+            raise ValueError(f"Parameter '{name}' has {size} values, expected 1 or {batch}")
+    return batch
+
+
+def run_sweep(procesor, params, quiet=True):
+    """
+    Run the loaded program once for every point of a parameter sweep.
+
+    params: {name: angles}; arrays must share one length (scalars broadcast)
+    quiet: suppress `out` output of the program (errors still show)
+
+    Returns a dict with
+        "qubits": measured qubits (all qubits when the program measures none)
+        "probabilities": (batch, 2**k) distribution of the measured qubits,
+                         column j is bitstring format(j, "0kb"), first qubit leftmost
+        "expectations": (batch, k) ⟨Z⟩ of each measured qubit
+    """
+    if procesor.quantum_registers is None:
+        raise RuntimeError("Parameter sweeps need quantum or hybrid mode")
+    if not procesor.program:
+        raise RuntimeError("No program loaded")
+
+    batch = _sweep_size(params)
+    parameters = {name: np.broadcast_to(np.asarray(values, dtype=np.float64).ravel(), (batch,))
+                  for name, values in params.items()}
+
+    if first_measurement(procesor.program) is not None:
+        plan = terminal_measurements(procesor.program, procesor.num_qubits)
+        if plan is None:
+            raise ValueError("run_sweep needs a program whose measurements are all terminal")
+        stop, qubits = plan
+    else:
+        stop, qubits = len(procesor.program), list(range(procesor.num_qubits))
+
+    saved = (procesor.quantum_registers, procesor.quantum_alu, procesor.active_backend,
+             procesor.parameters, procesor.output_handler)
+    registers = BatchedQuantumRegisters(procesor.num_qubits, batch, precision=procesor.precision,
+                                        memory_budget=procesor.memory_budget)
+    procesor.quantum_registers = registers
+    procesor.quantum_alu = BatchedQuantumALU(registers)
+    procesor.active_backend = "batched"
+    procesor.parameters = {**procesor.parameters, **parameters}
+    if quiet:
+        procesor.output_handler = _QuietOutput(procesor.output_handler)
+    try:
+        procesor.reset()
+        _run_until(procesor, stop)
+        return {
+            "qubits": qubits,
+            "probabilities": registers.probabilities(qubits),
+            "expectations": registers.expectation_z(qubits),
+        }
+    finally:
+        (procesor.quantum_registers, procesor.quantum_alu, procesor.active_backend,
+         procesor.parameters, procesor.output_handler) = saved
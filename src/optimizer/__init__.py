@@ -0,0 +1,16 @@
+# src/optimizer/__init__.py
+
+"""
+Program optimization passes.
+
+Passes rewrite the loaded instruction list before execution while keeping
+instruction indices (and therefore jump targets) unchanged.
+"""
+
+from .cancellation import cancel_program
+from .gate_fusion import fuse_program
+
+__all__ = [
+    "cancel_program",
+    "fuse_program",
+]
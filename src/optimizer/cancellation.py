@@ -0,0 +1,182 @@
+# src/optimizer/cancellation.py
+
+"""
+Gate cancellation pass.
+
+Runs on the decoded program before gate fusion and backend selection. It
+tracks, per qubit, the last gate still in the program and
+
+- cancels a self-inverse gate (h, x, y, z, cx, cz, swap, ccx, ...) followed
+  by the same gate on the same qubits, e.g. `h q0` / `h q0`;
+- merges consecutive rotations about the same axis on one qubit into a
+  single rotation (`rz 0.1 q0` / `rz 0.2 q0` -> `rz 0.3 q0`);
+- drops identity gates: rotations by a multiple of 4π, including the
+  result of a merge.
+
+Gates on other qubits in between do not block a cancellation, and neither
+do classical data instructions (they never touch the qubits). Jump
+targets, jumps, `barrier`, measurements and any other instruction end the
+window, so no gate is moved across a point where control flow can enter
+or leave or where the state is observed.
+
+Removed instructions become `nop`, so instruction indices and jump
+targets stay valid.
+"""
+
+import math
+
+from .gate_fusion import jump_targets, _qubit_index
+
+# Gates equal to their own inverse; the value tells which operands are
+# interchangeable: "ordered" (control(s) then target), "symmetric" (all
+# qubits play the same role), "controls" (any order of the controls, target
+# last) or "targets" (control first, the two swapped qubits in any order)
+SELF_INVERSE = {
+    "h": "ordered", "x": "ordered", "y": "ordered", "z": "ordered",
+    "cx": "ordered", "cnot": "ordered", "cy": "ordered", "ch": "ordered",
+    "cz": "symmetric", "swap": "symmetric", "mcz": "symmetric",
+    "ccx": "controls", "toffoli": "controls", "mcx": "controls",
+    "cswap": "targets",
+}
+
+# Rotations merged by adding their angles
+ROTATIONS = ("rx", "ry", "rz")
+
+# A rotation by a multiple of 4π is exactly the identity
+_PERIOD = 4 * math.pi
+
+# Classical instructions that neither touch the qubits nor change control flow
+TRANSPARENT_OPCODES = {
+    "nop", "mov", "set", "add", "sub", "mul", "dvd", "neg",
+    "cmp", "gt", "lt", "eqq", "and", "or", "not",
+    "out", "in", "push", "pop",
+}
+
+_NOP = {"opcode": "nop", "operands": []}
+
+
+def _gate_key(opcode, qubits):
+    """Key under which two applications of a self-inverse gate cancel."""
+    role = SELF_INVERSE[opcode]
+    if opcode == "cnot":
+        opcode = "cx"
+    elif opcode == "toffoli":
+        opcode = "ccx"
+    if role == "symmetric":
+        return opcode, frozenset(qubits)
+    if role == "controls":
+        return opcode, frozenset(qubits[:-1]), qubits[-1]
+    if role == "targets":
+        return opcode, qubits[0], frozenset(qubits[1:])
+    return opcode, qubits
+
+
+def _decode(instr):
+    """
+    Return (kind, qubits, value) for a gate the pass understands, else None.
+
+    kind is "inverse" (value = cancellation key) or "rotation" (value = angle).
+    """
+    opcode = instr.get("opcode", "").lower()
+    operands = instr.get("operands", [])
+    if opcode in ROTATIONS:
+        if len(operands) != 2:
+            return None
+        qubit = _qubit_index(operands[1])
+        try:
+            angle = float(operands[0])
+        except ValueError:
+            return None     # Named parameter - bound only at run time
+        if qubit is None:
+            return None
+        return "rotation", (qubit,), angle
+    if opcode in SELF_INVERSE and operands:
+        qubits = tuple(_qubit_index(op) for op in operands)
+        if None in qubits or len(set(qubits)) != len(qubits):
+            return None
+        return "inverse", qubits, _gate_key(opcode, qubits)
+    return None
+
+
+def _is_identity_angle(angle):
+    remainder = math.fmod(angle, _PERIOD)
+    return abs(remainder) < 1e-12 or abs(abs(remainder) - _PERIOD) < 1e-12
+
+
+class _Window:
+    """Live gates of one straight-line window, indexed per qubit."""
+
+    def __init__(self, program, result):
+        self.program = program
+        self.result = result
+        self.stacks = {}    # qubit -> positions of live gates on it, newest last
+        self.gates = {}     # position -> (kind, qubits, value)
+        self.removed = 0
+
+    def _top(self, qubits):
+        """Position of the newest live gate if it is the newest on every qubit."""
+        tops = {self.stacks[q][-1] if self.stacks.get(q) else None for q in qubits}
+        if len(tops) == 1:
+            return tops.pop()
+        return None
+
+    def _drop(self, position):
+        _, qubits, _ = self.gates.pop(position)
+        for qubit in qubits:
+            self.stacks[qubit].pop()
+        self.result[position] = dict(_NOP)
+        self.removed += 1
+
+    def add(self, position, gate):
+        kind, qubits, value = gate
+        if kind == "rotation" and _is_identity_angle(value):
+            # e.g. `rz 0 q0` - nothing to apply
+            self.result[position] = dict(_NOP)
+            self.removed += 1
+            return
+        top = self._top(qubits)
+        previous = self.gates.get(top) if top is not None else None
+        if previous is not None and previous[0] == kind and set(previous[1]) == set(qubits):
+            if kind == "inverse" and previous[2] == value:
+                self._drop(top)
+                self.result[position] = dict(_NOP)
+                self.removed += 1
+                return
+            opcode = self.program[position]["opcode"].lower()
+            if kind == "rotation" and self.program[top]["opcode"].lower() == opcode:
+                angle = previous[2] + value
+                self.result[position] = dict(_NOP)
+                self.removed += 1
+                if _is_identity_angle(angle):
+                    self._drop(top)
+                else:
+                    self.gates[top] = (kind, qubits, angle)
+                    operands = [repr(angle)] + list(self.result[top]["operands"][1:])
+                    self.result[top] = {**self.result[top], "operands": operands}
+                return
+        self.gates[position] = gate
+        for qubit in qubits:
+            self.stacks.setdefault(qubit, []).append(position)
+
+
+def cancel_program(program):
+    """
+    Return (new_program, gates_removed).
+
+    gates_removed counts gate instructions replaced by `nop`.
+    """
+    targets = jump_targets(program)
+    result = list(program)
+    window = _Window(program, result)
+    removed = 0
+    for position, instr in enumerate(program):
+        if position in targets:
+            removed += window.removed
+            window = _Window(program, result)
+        gate = _decode(instr)
+        if gate is not None:
+            window.add(position, gate)
+        elif instr.get("opcode", "").lower() not in TRANSPARENT_OPCODES:
+            removed += window.removed
+            window = _Window(program, result)
+    return result, removed + window.removed
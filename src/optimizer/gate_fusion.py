@@ -0,0 +1,192 @@
+# src/optimizer/gate_fusion.py
+
+"""
+Gate fusion pass.
+
+Runs between program loading and execution. Inside every straight-line run
+of quantum gates (no jump target in the middle, no measurement or classical
+instruction) it multiplies consecutive single-qubit gates on the same qubit
+into one 2x2 unitary and folds adjacent two-qubit gates on the same pair,
+together with the single-qubit gates around them, into one 4x4 unitary.
+Each fused run then costs one pass over the statevector instead of one pass
+per gate.
+
+Instruction indices are preserved so jump targets stay valid: the fused
+operations are written at the start of the run and the remaining slots
+become `nop` instructions.
+"""
+
+import numpy as np
+
+from ..alu import gate_matrices as gates
+
+# Instructions whose integer operand is an instruction index
+JUMP_OPCODES = ("jmp", "jmpif")
+
+
+def jump_targets(program):
+    """Set of instruction indices that some jmp/jmpif can land on."""
+    targets = set()
+    for instr in program:
+        if instr.get("opcode", "").lower() in JUMP_OPCODES:
+            operands = instr.get("operands", [])
+            if len(operands) == 1 and operands[0].lstrip("-").isdigit():
+                targets.add(int(operands[0]))
+    return targets
+
+
+def _qubit_index(op):
+    if op.startswith("q") and op[1:].isdigit():
+        return int(op[1:])
+    return None
+
+
+def gate_of(instr):
+    """
+    Decode a fusible gate instruction into (qubits, matrix), or None.
+
+    Only gates with literal operands qualify; anything else ends a run.
+    """
+    opcode = instr.get("opcode", "").lower()
+    operands = instr.get("operands", [])
+
+    if opcode in gates.SINGLE_QUBIT_GATES and len(operands) == 1:
+        qubit = _qubit_index(operands[0])
+        if qubit is not None:
+            return (qubit,), gates.SINGLE_QUBIT_GATES[opcode]
+
+    elif opcode in gates.ROTATION_GATES and len(operands) == 2:
+        qubit = _qubit_index(operands[1])
+        try:
+            angle = float(operands[0])
+        except ValueError:
+            return None
+        if qubit is not None:
+            return (qubit,), gates.registry.matrix(opcode, angle)
+
+    elif opcode in gates.TWO_QUBIT_GATES and len(operands) == 2:
+        first = _qubit_index(operands[0])
+        second = _qubit_index(operands[1])
+        if first is not None and second is not None and first != second:
+            return (first, second), gates.TWO_QUBIT_GATES[opcode]
+
+    elif opcode == "unitary" and "matrix" in instr:
+        qubits = tuple(_qubit_index(op) for op in operands)
+        if None not in qubits and len(set(qubits)) == len(qubits) and len(qubits) in (1, 2):
+            return qubits, np.asarray(instr["matrix"])
+
+    return None
+
+
+class _Op:
+    """One operation of a fused run: the gates it absorbed and their product."""
+
+    def __init__(self, qubits, matrix, instr):
+        self.qubits = qubits
+        self.matrix = matrix
+        self.instrs = [instr]
+
+    def absorb(self, matrix, instrs):
+        self.matrix = matrix @ self.matrix
+        self.instrs.extend(instrs)
+
+    def to_instruction(self):
+        if len(self.instrs) == 1:
+            return self.instrs[0]
+        return {
+            "opcode": "unitary",
+            "operands": [f"q{q}" for q in self.qubits],
+            "matrix": self.matrix,
+            "fused": len(self.instrs),
+        }
+
+
+def _pair_matrix(pending, pair):
+    """Product of the pending single-qubit gates of `pair`, lifted to 4x4."""
+    matrix = np.eye(4, dtype=complex)
+    instrs = []
+    for position, qubit in enumerate(pair):
+        single = pending.pop(qubit, None)
+        if single is not None:
+            matrix = gates.embed(single.matrix, position) @ matrix
+            instrs.extend(single.instrs)
+    return matrix, instrs
+
+
+def fuse_run(run):
+    """Fuse one straight-line run of (instr, (qubits, matrix)) into a list of _Op."""
+    ops = []
+    pending = {}        # qubit -> _Op of single-qubit gates not yet emitted
+    last = {}           # qubit -> last emitted two-qubit _Op touching it
+
+    for instr, (qubits, matrix) in run:
+        if len(qubits) == 1:
+            qubit = qubits[0]
+            if qubit in pending:
+                pending[qubit].absorb(matrix, [instr])
+            else:
+                pending[qubit] = _Op(qubits, matrix, instr)
+            continue
+
+        first, second = qubits
+        open_block = last.get(first)
+        if open_block is not None and open_block is last.get(second):
+            # Nothing else touched the pair since that block - fold into it
+            if open_block.qubits != qubits:
+                matrix = gates.SWAP @ matrix @ gates.SWAP
+                pair = open_block.qubits
+            else:
+                pair = qubits
+            singles, absorbed = _pair_matrix(pending, pair)
+            open_block.absorb(matrix @ singles, absorbed + [instr])
+            continue
+
+        singles, absorbed = _pair_matrix(pending, qubits)
+        op = _Op(qubits, matrix @ singles, instr)
+        op.instrs = absorbed + op.instrs
+        ops.append(op)
+        last[first] = op
+        last[second] = op
+
+    # Leftover single-qubit products act after every block on their qubit
+    ops.extend(pending[qubit] for qubit in sorted(pending))
+    return ops
+
+
+def fuse_program(program):
+    """
+    Return (new_program, gates_fused).
+
+    gates_fused counts gate applications saved, i.e. gates in the input
+    minus unitaries left in the output.
+    """
+    targets = jump_targets(program)
+    result = list(program)
+    gates_fused = 0
+
+    index = 0
+    while index < len(program):
+        run = []
+        end = index
+        while end < len(program):
+            if end != index and end in targets:
+                break
+            gate = gate_of(program[end])
+            if gate is None:
+                break
+            run.append((program[end], gate))
+            end += 1
+
+        if len(run) > 1:
+            ops = fuse_run(run)
+            if len(ops) < len(run):
+                gates_fused += len(run) - len(ops)
+                for offset in range(len(run)):
+                    position = index + offset
+                    if offset < len(ops):
+                        result[position] = ops[offset].to_instruction()
+                    else:
+                        result[position] = {"opcode": "nop", "operands": []}
+        index = max(end, index + 1)
+
+    return result, gates_fused
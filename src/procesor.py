@@ -1,27 +1,88 @@
 # src/procesor.py
 
 import time
-from .alu import ClassicalALU, QuantumALU
+from .alu import (ClassicalALU, QuantumALU, StabilizerALU, SparseQuantumALU, MemmapQuantumALU,
+                  is_clifford_program)
+from .alu.stabilizer_alu import non_clifford_opcodes
 from .memory import ClassicalMemory
-from .registers import ClassicalRegisters, QuantumRegisters
+from .registers import (ClassicalRegisters, QuantumRegisters, StabilizerRegisters, SparseQuantumRegisters,
+                        MemmapQuantumRegisters, RandomSource, estimate_memory)
+from .registers.sparse_registers import DEFAULT_FILL_RATIO
+from .registers.memmap_registers import DEFAULT_CHUNK_QUBITS
+from .registers.quantum_registers import DEFAULT_MEMORY_BUDGET
 from .io import InputHandler, OutputHandler, ProgramLoader
+from .optimizer import cancel_program, fuse_program
+from .execution import run_shots, run_sweep, run_shots_parallel, run_inputs_parallel
+from .execution.decode import InstructionSet, decode_program
+from .execution.fast import run_fast
+from .execution.blocks import run_compiled
+
+
+def _debug_exec(procesor, pc, instr):
+    procesor._debug_print(f"Exec {instr.opcode} {instr.operands}")
+
+
+def _debug_clock(procesor, pc, instr):
+    procesor._debug_print(f"Clock cycle: {procesor.clock}")
+
 
 class Procesor:
-    def __init__(self, mode="classical", debug=False, cycle_delay=0, custom_output_handler=None, custom_input_handler=None):
+    # Events of add_hook
+    HOOK_EVENTS = ("pre_instruction", "post_instruction", "memory_write", "measurement")
+
+    # Method -> (variant firing the hooks, its events); see _select_hooked_methods
+    _HOOKED_METHODS = {
+        "step": ("_step_hooked", ("pre_instruction", "post_instruction")),
+        "set_operand_value": ("_set_operand_value_hooked", ("memory_write",)),
+        "_store_measurement": ("_store_measurement_hooked", ("measurement",)),
+    }
+
+    def __init__(self, mode="classical", debug=False, cycle_delay=0, custom_output_handler=None, custom_input_handler=None,
+                 num_qubits=8, precision="double", memory_budget=DEFAULT_MEMORY_BUDGET, fuse_gates=True,
+                 backend="auto", fill_ratio=DEFAULT_FILL_RATIO, seed=None, defer_gates=False,
+                 cancel_gates=True, memmap_dir=None, chunk_qubits=DEFAULT_CHUNK_QUBITS):
         """
         Initialize the processor.
 
         mode: "classical", "quantum", or "hybrid"
-        debug: enable debug output
+        debug: enable debug output (every executed instruction and clock cycle
+               is printed by hooks, see add_hook)
         cycle_delay: delay in seconds between cycles (0 = no delay)
         custom_output_handler: custom output handler for GUI integration
         custom_input_handler: custom input handler for GUI integration
+        num_qubits: number of qubits in quantum/hybrid mode
+        precision: amplitude precision, "single" (complex64) or "double" (complex128)
+        memory_budget: max bytes for the quantum state (None = unlimited);
+                       larger allocations raise MemoryError up front
+        fuse_gates: fuse runs of quantum gates into single unitaries at load time
+        backend: quantum simulator, "statevector", "stabilizer" (Clifford gates only),
+                 "sparse" (stores only non-zero amplitudes), "memmap" (statevector
+                 in a file on disk, for states larger than RAM) or "auto"
+                 (statevector whenever it fits the memory budget, otherwise the
+                 stabilizer for Clifford-only programs and sparse for the rest)
+        fill_ratio: share of non-zero amplitudes above which the sparse backend
+                    switches to a dense statevector
+        seed: seed of the measurement random source (None = fresh entropy);
+              the same seed reproduces the same measurement outcomes
+        defer_gates: record quantum gates in a circuit buffer and execute them
+                     as one compiled block only when a measure, reset, state
+                     read or `barrier` needs the state (statevector, sparse and
+                     memmap; ignored by the stabilizer)
+        cancel_gates: remove self-inverse gate pairs, merge same-axis rotations
+                      and drop identity gates at load time (before fusion)
+        memmap_dir: directory for the state file of the memmap backend (None = system temp)
+        chunk_qubits: the memmap backend processes 2**chunk_qubits amplitudes at a time
         """
+        if backend not in ("auto", "statevector", "stabilizer", "sparse", "memmap"):
+            raise ValueError(f"Unknown quantum backend: {backend}")
         self.mode = mode
         self.debug = debug
         self.running = False
         self.clock = 0  # Clock cycle counter
         self.cycle_delay = cycle_delay
+        self.fuse_gates = fuse_gates
+        self.cancel_gates = cancel_gates
+        self.stats = {"gates_removed": 0, "gates_fused": 0}  # Execution statistics of the loaded program
 
         # Core components
         self.registers = ClassicalRegisters()
@@ -32,22 +93,147 @@ class Procesor:
 
         # ALUs
         self.classical_alu = ClassicalALU(bit_width=8)
+        self.num_qubits = num_qubits
+        self.precision = precision
+        self.memory_budget = memory_budget
+        self.backend = backend
+        self.fill_ratio = fill_ratio
+        self.memmap_dir = memmap_dir
+        self.chunk_qubits = chunk_qubits
+        self.defer_gates = defer_gates
+        self.rng = RandomSource(seed)  # Shared by every quantum backend of this processor
+        self.active_backend = None  # Backend currently simulating the qubits
+        self.quantum_registers = None
+        self.quantum_alu = None
         if mode in ("quantum", "hybrid"):
-            self.quantum_registers = QuantumRegisters(num_qubits=8)
-            self.quantum_alu = QuantumALU(self.quantum_registers)
-        else:
-            self.quantum_registers = None
-            self.quantum_alu = None
+            if backend == "auto":
+                self._create_quantum_backend("statevector" if self._statevector_fits() else "stabilizer")
+            else:
+                self._create_quantum_backend(backend)
 
+        self.instruction_set = InstructionSet()  # Opcode table of this processor, see register_instruction
         self.program = []
+        self.decoded = []  # self.program decoded for the run loop (see execution.decode)
+        self._decoded_from = self.program
+        self._compiled_blocks = None  # Generated code of self.decoded, see execution.blocks
         self.program_finished_shown = False  # Flag to track if "Program finished" was shown
         self.source_line_mapping = []  # Maps program index to original source line number
+        self.measurement_log = None  # When a list, measurement outcomes are appended to it
+        self.parameters = {}  # Named rotation angles, e.g. {"theta": 0.5} for "rx theta q0"
+        self.hooks = {event: [] for event in self.HOOK_EVENTS}  # Callbacks of add_hook
+        if debug:
+            self.add_hook("pre_instruction", _debug_exec)
+            self.add_hook("post_instruction", _debug_clock)
         self._debug_print(f"Procesor initialized in {mode} mode")
 
     def _debug_print(self, message):
         if self.debug:
             self.output_handler.print_debug(message, debug_enabled=self.debug)
 
+    def add_hook(self, event, callback):
+        """
+        Call `callback` on every `event` of this processor:
+
+        pre_instruction(procesor, pc, instr)    before the instruction at pc executes
+        post_instruction(procesor, pc, instr)   after it completed (clock and pc updated);
+                                                not after an error or while `in` waits
+        memory_write(procesor, address, value)  a memory operand (hN) was written
+        measurement(procesor, qubits, value)    qubits (a range) were measured, value
+                                                packs the bits, first qubit lowest
+
+        instr is the decoded Instruction (instr.opcode, instr.operands).
+
+        The methods firing an event are swapped for their hooked variant only
+        while it has a callback, so a processor without hooks runs the plain
+        loop. run_fast() steps through step() while instruction hooks are
+        registered and run_compiled() runs as run_fast() while any hook is.
+        Sampled shots (see execution.shots) do not execute measurements.
+        """
+        if event not in self.hooks:
+            raise ValueError(f"Unknown hook event: {event}")
+        self.hooks[event].append(callback)
+        self._select_hooked_methods()
+
+    def remove_hook(self, event, callback):
+        """Remove a callback added by add_hook."""
+        if event not in self.hooks:
+            raise ValueError(f"Unknown hook event: {event}")
+        self.hooks[event].remove(callback)
+        self._select_hooked_methods()
+
+    def _select_hooked_methods(self):
+        """Use the hooked variant of a method (as an instance attribute) while its events have callbacks."""
+        for name, (variant, events) in self._HOOKED_METHODS.items():
+            if any(self.hooks[event] for event in events):
+                setattr(self, name, getattr(self, variant))
+            else:
+                self.__dict__.pop(name, None)
+
+    def _statevector_fits(self):
+        return self.memory_budget is None or estimate_memory(self.num_qubits, self.precision) <= self.memory_budget
+
+    def _create_quantum_backend(self, name):
+        """(Re)create the quantum registers and ALU for the given backend."""
+        if name == "stabilizer":
+            self.quantum_registers = StabilizerRegisters(num_qubits=self.num_qubits, rng=self.rng,
+                                                         memory_budget=self.memory_budget)
+            self.quantum_alu = StabilizerALU(self.quantum_registers)
+        elif name == "sparse":
+            self.quantum_registers = SparseQuantumRegisters(num_qubits=self.num_qubits, precision=self.precision,
+                                                            memory_budget=self.memory_budget,
+                                                            fill_ratio=self.fill_ratio, rng=self.rng)
+            self.quantum_alu = SparseQuantumALU(self.quantum_registers, deferred=self.defer_gates)
+        elif name == "memmap":
+            # The state lives on disk, so the memory budget does not apply
+            self.quantum_registers = MemmapQuantumRegisters(num_qubits=self.num_qubits, precision=self.precision,
+                                                            directory=self.memmap_dir,
+                                                            chunk_qubits=self.chunk_qubits, rng=self.rng)
+            self.quantum_alu = MemmapQuantumALU(self.quantum_registers, deferred=self.defer_gates)
+        else:
+            self.quantum_registers = QuantumRegisters(num_qubits=self.num_qubits, precision=self.precision,
+                                                      memory_budget=self.memory_budget, rng=self.rng)
+            self.quantum_alu = QuantumALU(self.quantum_registers, deferred=self.defer_gates)
+        self.active_backend = name
+        self._debug_print(f"Quantum backend: {name}")
+
+    def _select_backend(self, program):
+        """Pick the quantum backend for a freshly loaded program."""
+        if self.backend == "stabilizer":
+            unsupported = non_clifford_opcodes(program)
+            if unsupported:
+                raise ValueError(f"Stabilizer backend cannot run non-Clifford gates: {', '.join(sorted(unsupported))}")
+            return
+        if self.backend == "auto":
+            if self._statevector_fits():
+                name = "statevector"    # Full QuantumRegisters/QuantumALU surface
+            elif non_clifford_opcodes(program):
+                name = "sparse"
+            elif is_clifford_program(program):
+                name = "stabilizer"
+            else:
+                return  # No quantum instructions - keep the current backend
+            if name != self.active_backend:
+                self._create_quantum_backend(name)
+
+    def _prepare_program(self, program):
+        """Run load-time passes (gate cancellation, backend choice, gate fusion) over a freshly parsed program."""
+        self.stats["gates_removed"] = 0
+        self.stats["gates_fused"] = 0
+        if self.cancel_gates:
+            # Before backend selection: cancelling non-Clifford gates may allow the stabilizer
+            program, removed = cancel_program(program)
+            self.stats["gates_removed"] = removed
+            if removed:
+                self._debug_print(f"Removed {removed} redundant gates")
+        if self.quantum_alu is not None:
+            self._select_backend(program)
+        if self.fuse_gates and self.active_backend in ("statevector", "sparse", "memmap"):
+            program, fused = fuse_program(program)
+            self.stats["gates_fused"] = fused
+            if fused:
+                self._debug_print(f"Fused {fused} gates")
+        return program
+
     def load_program_from_string(self, program_str):
         try:
             if hasattr(self.program_loader, 'parse_program_str'):
@@ -67,6 +253,8 @@ class Procesor:
                 self.program = instructions
                 self.source_line_mapping = source_lines
 
+            self.program = self._prepare_program(self.program)
+            self._decode_program()
             self.registers.set("pc", 0)
             self.clock = 0
             self.program_finished_shown = False  # Reset flag when loading new program
@@ -77,7 +265,8 @@ class Procesor:
             return False
 
 
-    def status(self, include_ram=False, include_registers=False, include_current_instruction=False, include_pc=False, include_clock=False):
+    def status(self, include_ram=False, include_registers=False, include_current_instruction=False, include_pc=False, include_clock=False,
+               include_stats=False, include_marginals=False, zz_pairs=None):
         """
         Return a dict representing current processor status parts based on flags.
 
@@ -87,6 +276,11 @@ class Procesor:
             include_current_instruction (bool): Include the instruction at the current program counter.
             include_pc (bool): Include the current program counter value.
             include_clock (bool): Include the current clock cycle count.
+            include_stats (bool): Include execution statistics (e.g. gates fused at load time,
+                                  accumulated phase counters, deferred circuit counters).
+            include_marginals (bool): Include per-qubit probabilities [P(0), P(1)] and ⟨Z⟩ of every qubit,
+                                      computed in one pass and cached until the state changes.
+            zz_pairs (list): Qubit pairs (a, b) whose ⟨Z_a Z_b⟩ to include.
 
         Returns:
             dict: Status snapshot with selected information.
@@ -129,13 +323,26 @@ class Procesor:
         if include_clock:
             status['clock'] = getattr(self, 'clock', None)
 
+        if include_marginals and self.quantum_registers is not None:
+            status['marginals'] = self.quantum_registers.marginals().tolist()
+            status['expectation_z'] = self.quantum_registers.expectation_z().tolist()
+
+        if zz_pairs and self.quantum_registers is not None:
+            values = self.quantum_registers.expectation_zz(zz_pairs)
+            status['expectation_zz'] = {(int(a), int(b)): float(value) for (a, b), value in zip(zz_pairs, values)}
+
+        if include_stats:
+            status['stats'] = dict(self.stats)
+            status['stats'].update(getattr(self.quantum_alu, "circuit_stats", {}))
+
         return status
 
 
     def load_program(self, filename):
         """Load program from file."""
         try:
-            self.program = self.program_loader.load_program(filename)
+            self.program = self._prepare_program(self.program_loader.load_program(filename))
+            self._decode_program()
             self.registers.set("pc", 0)
             self.clock = 0  # Reset clock when loading new program
             self.program_finished_shown = False  # Reset flag when loading new program
@@ -145,6 +352,52 @@ class Procesor:
             self.output_handler.print_error(f"Failed to load: {e}")
             return False
 
+    def reset(self, seed=None):
+        """
+        Reset registers, memory, qubits and clock; keep the loaded program.
+
+        With a seed the measurement random source restarts from it, so the
+        next run repeats the outcomes of any earlier run with the same seed.
+        """
+        if seed is not None:
+            self.rng.reseed(seed)
+        self.registers.reset()
+        self.memory.reset()
+        if self.quantum_registers is not None:
+            self.quantum_registers.reset()
+        self.clock = 0
+        self.running = False
+        self.program_finished_shown = False
+
+    def run_shots(self, shots, quiet=True, workers=None):
+        """
+        Run the loaded program `shots` times and return {bitstring: count}.
+
+        Programs whose measurements are all terminal are simulated once and
+        sampled; otherwise every shot re-runs the program. See execution.shots.
+        workers: spread the shots over this many processes (None or 1 = run
+                 here); see execution.parallel
+        """
+        if workers is not None and workers > 1:
+            return run_shots_parallel(self, shots, workers=workers)
+        return run_shots(self, shots, quiet=quiet)
+
+    def run_inputs(self, inputs, workers=None):
+        """
+        Run the loaded program once per input vector (values for successive
+        `in` instructions) on a process pool; returns one report per input.
+        workers defaults to the number of CPUs. See execution.parallel.
+        """
+        return run_inputs_parallel(self, inputs, workers=workers)
+
+    def run_sweep(self, params, quiet=True):
+        """
+        Evaluate the loaded program for every point of a rotation-angle sweep
+        in one batched pass, e.g. run_sweep({"theta": np.linspace(0, np.pi, 100)})
+        for a program using "rx theta q0". See execution.sweep.
+        """
+        return run_sweep(self, params, quiet=quiet)
+
     def run(self):
         """Run the processor until completion."""
         self.running = True
@@ -155,22 +408,52 @@ class Procesor:
         self.output_handler.print_output("Processor stopped")
         self.report_clock()
 
+    def run_fast(self, max_cycles=None):
+        """
+        Run the processor until completion with the closure-compiled engine
+        (see execution.fast): same results as run(), but no cycle_delay.
+        Returns early when `in` has no input or after max_cycles instructions
+        (None = no limit). With instruction hooks (or debug) it steps.
+        """
+        self.output_handler.print_output("Processor starting...")
+        if self.program:
+            run_fast(self, max_cycles)
+        else:
+            self.output_handler.print_error("No program loaded")
+        self.output_handler.print_output("Processor stopped")
+        self.report_clock()
+
+    def run_compiled(self, max_cycles=None):
+        """
+        Run the processor until completion with classical basic blocks compiled
+        to Python (see execution.blocks); otherwise like run_fast(). The code
+        is generated on the first call and reused while the program stays.
+        max_cycles is checked between blocks.
+        """
+        self.output_handler.print_output("Processor starting...")
+        if self.program:
+            run_compiled(self, max_cycles)
+        else:
+            self.output_handler.print_error("No program loaded")
+        self.output_handler.print_output("Processor stopped")
+        self.report_clock()
+
     def step(self):
         """Execute one instruction."""
         if not self.program:
             self.output_handler.print_error("No program loaded")
             return False
-
-        pc = self.registers.get("pc")
-        if pc >= len(self.program):
-            if not self.program_finished_shown:
-                self.output_handler.print_output("Program finished")
-                self.program_finished_shown = True
-            self.running = False
+        if self._decoded_from is not self.program:
+            # The program was replaced without a load (e.g. by a worker process)
+            self._decode_program()
+
+        registers = self.registers
+        pc = registers.pc
+        if pc >= len(self.decoded):
+            self._finish()
             return False
 
-        instr = self.program[pc]
-        result = self.execute_instruction(instr)
+        result = self._execute(self.decoded[pc])
         
         # If instruction returns False, it means we're waiting for input
         # Don't increment PC or clock, just return True to keep running
@@ -179,20 +462,59 @@ class Procesor:
 
         # Increment clock cycle
         self.clock += 1
-        self._debug_print(f"Clock cycle: {self.clock}")
 
         # Optional delay between cycles
         if self.cycle_delay > 0:
             time.sleep(self.cycle_delay)
 
         # Increment PC unless modified by a jump
-        if self.registers.get("pc") == pc:
-            self.registers.set("pc", pc + 1)
+        if registers.pc == pc:
+            registers.pc = pc + 1
         return True
 
+    def _step_hooked(self):
+        """step() firing the pre/post instruction hooks; replaces step while any is registered."""
+        if not self.program:
+            self.output_handler.print_error("No program loaded")
+            return False
+        if self._decoded_from is not self.program:
+            self._decode_program()
+
+        registers = self.registers
+        pc = registers.pc
+        if pc >= len(self.decoded):
+            self._finish()
+            return False
+
+        instr = self.decoded[pc]
+        for hook in self.hooks["pre_instruction"]:
+            hook(self, pc, instr)
+        if self._execute(instr) is False:
+            return True
+
+        self.clock += 1
+        if self.cycle_delay > 0:
+            time.sleep(self.cycle_delay)
+        if registers.pc == pc:
+            registers.pc = pc + 1
+        for hook in self.hooks["post_instruction"]:
+            hook(self, pc, instr)
+        return True
+
+    def _finish(self):
+        """The program ran past its last instruction: report it once and stop."""
+        if not self.program_finished_shown:
+            self.output_handler.print_output("Program finished")
+            self.program_finished_shown = True
+        self.running = False
+
     def report_clock(self):
         """Report total clock cycles used."""
         self.output_handler.print_output(f"Total cycles: {self.clock}")
+        if self.stats["gates_fused"]:
+            self.output_handler.print_output(f"Gates fused: {self.stats['gates_fused']}")
+        if self.stats["gates_removed"]:
+            self.output_handler.print_output(f"Gates removed: {self.stats['gates_removed']}")
     
     def get_current_source_line(self):
         """Get the current source line number for highlighting."""
@@ -202,313 +524,195 @@ class Procesor:
         return None
 
     def execute_instruction(self, instr):
-        """Dispatch and execute a single instruction."""
-        opcode = instr["opcode"].lower()
-        operands = instr.get("operands", [])
-        self._debug_print(f"Exec {opcode} {operands}")
+        """Decode and execute a single instruction dict (the run loop uses the pre-decoded program)."""
+        return self._execute(self.instruction_set.decode(self, instr))
 
+    def _execute(self, instr):
+        """Execute a decoded instruction; an error is reported and stops the processor."""
         try:
-            # Classical ALU ops
-            if opcode == "mov": return self._execute_mov(operands)
-            if opcode == "set": return self._execute_set(operands)
-            if opcode == "add": return self._execute_alu(self.classical_alu.add, operands)
-            if opcode == "sub": return self._execute_alu(self.classical_alu.sub, operands)
-            if opcode == "mul": return self._execute_mul(operands)
-            if opcode == "dvd": return self._execute_dvd(operands)
-            if opcode == "neg": return self._execute_neg(operands)
-
-
-            # Quantum gates
-            if opcode in ("h","x","y","z","s","t","rx","ry","rz",
-                          "cx","cnot","cz","cy","ccx","toffoli","swap"):
-                return self._execute_quantum_gate(opcode, operands)
-
-            # Measurement & reset
-            if opcode == "measure": return self._execute_measure(operands)
-            if opcode == "reset": return self._execute_reset(operands)
-
-            # Control, I/O, queue, logic, jumps
-            if opcode == "cmp": return self._execute_cmp(operands)
-            if opcode == "gt": return self._execute_gt(operands)
-            if opcode == "lt": return self._execute_lt(operands)
-            if opcode == "eqq": return self._execute_eqq(operands)
-            if opcode == "and": return self._execute_and(operands)
-            if opcode == "or": return self._execute_or(operands)
-            if opcode == "not": return self._execute_not(operands)
-            if opcode == "jmp": return self._execute_jmp(operands)
-            if opcode == "jmpif": return self._execute_jmpif(operands)
-            if opcode == "out": return self._execute_out(operands)
-            if opcode == "in": return self._execute_in(operands)
-            if opcode == "push": return self._execute_push(operands)
-            if opcode == "pop": return self._execute_pop(operands)
-            if opcode == "pp": return self._execute_pp(operands)
-
-            raise ValueError(f"Unknown opcode: {opcode}")
-
+            return instr.handler(*instr.args)
         except Exception as e:
-            self.output_handler.print_error(f"Error executing {opcode}: {e}")
+            self.output_handler.print_error(f"Error executing {instr.opcode}: {e}")
             self.running = False
             return False
 
-    def _execute_push(self, ops):
-        if len(ops) != 1:
-            raise ValueError("PUSH requires 1 operand")
-        t, v = self.parse_operand(ops[0])
-        value = self.get_operand_value(t, v)
-        self.memory.push(value)
-
-    def _execute_pop(self, ops):
-        if len(ops) != 1:
-            raise ValueError("POP requires 1 operand")
-        t, v = self.parse_operand(ops[0])
+    def _decode_program(self):
+        """Decode the loaded program for the run loop (see execution.decode)."""
+        self.decoded = decode_program(self, self.program)
+        self._decoded_from = self.program
+
+    def register_instruction(self, opcode, handler, parse=None):
+        """
+        Add an instruction to this processor (or replace a built-in one).
+
+        handler(procesor, *args) executes it. It returns False to stay on the
+        instruction and wait (like `in`); a raised exception is reported as an
+        error and stops the processor. parse(procesor, operands) turns the
+        operand strings into args once at load time; by default every operand
+        goes through parse_operand, i.e. handlers get (kind, value) pairs for
+        get_operand_value / set_operand_value. The loaded program is decoded
+        again, so the instruction works at once.
+
+        Program analyses (shot sampling, gate cancellation and fusion) treat
+        new opcodes as opaque instructions they do not move gates across; a
+        replaced built-in gate may still be fused or cancelled at load time
+        unless fuse_gates / cancel_gates is off.
+        """
+        self.instruction_set.register(opcode, handler, parse)
+        self._decoded_from = None
+
+    # Handlers of decoded instructions take the operands parsed by execution.decode
+
+    def _execute_nop(self):
+        return True
+
+    def _execute_push(self, src):
+        self.memory.push(self.get_operand_value(*src))
+
+    def _execute_pop(self, dst):
         try:
             value = self.memory.pop()
         except IndexError:
             raise RuntimeError("POP from empty queue")
-        self.set_operand_value(t, v, value)
+        self.set_operand_value(*dst, value)
 
     # === Classical ALU helpers ===
 
-    def _execute_alu(self, fn, ops):
-        if len(ops) != 2:
-            raise ValueError(f"ALU operation requires 2 operands")
-        dst_t, dst_v = self.parse_operand(ops[0])
-        src_t, src_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(dst_t, dst_v)
-        b = self.get_operand_value(src_t, src_v)
-        res, _ = fn(a, b)
-        self.set_operand_value(dst_t, dst_v, res)
-        return True
-    
-    def _execute_set(self, ops):
-        if len(ops) != 2:
-            raise ValueError("MOV requires 2 operands")
-        src_t, src_v = self.parse_operand(ops[1])
-        dst_t, dst_v = self.parse_operand(ops[0])
-        val = self.get_operand_value(src_t, src_v)
-        self.set_operand_value(dst_t, dst_v, val)
+    def _execute_alu(self, fn, dst, src):
+        res, _ = fn(self.get_operand_value(*dst), self.get_operand_value(*src))
+        self.set_operand_value(*dst, res)
         return True
 
-    def _execute_mov(self, ops):
-        if len(ops) != 2:
-            raise ValueError("MOV requires 2 operands")
-        src_t, src_v = self.parse_operand(ops[0])
-        dst_t, dst_v = self.parse_operand(ops[1])
-        val = self.get_operand_value(src_t, src_v)
-        self.set_operand_value(dst_t, dst_v, val)
+    def _execute_mov(self, src, dst):
+        """mov src dst / set dst src"""
+        self.set_operand_value(*dst, self.get_operand_value(*src))
         return True
 
-    def _execute_mul(self, ops):
-        if len(ops) != 2:
-            raise ValueError("MUL requires 2 operands")
-        dst_t, dst_v = self.parse_operand(ops[0])
-        src_t, src_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(dst_t, dst_v)
-        b = self.get_operand_value(src_t, src_v)
-        result = a * b
-        self.set_operand_value(dst_t, dst_v, result)
+    def _execute_mul(self, dst, src):
+        result = self.get_operand_value(*dst) * self.get_operand_value(*src)
+        self.set_operand_value(*dst, result)
         return True
 
-    def _execute_dvd(self, ops):
-        if len(ops) != 2:
-            raise ValueError("DVD requires 2 operands")
-        dst_t, dst_v = self.parse_operand(ops[0])
-        src_t, src_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(dst_t, dst_v)
-        b = self.get_operand_value(src_t, src_v)
+    def _execute_dvd(self, dst, src):
+        a = self.get_operand_value(*dst)
+        b = self.get_operand_value(*src)
         if b == 0:
             raise ValueError("Division by zero")
-        result = a // b
-        self.set_operand_value(dst_t, dst_v, result)
+        self.set_operand_value(*dst, a // b)
         return True
 
-    def _execute_neg(self, ops):
-        if len(ops) != 1:
-            raise ValueError("NEG requires 1 operand")
-        dst_t, dst_v = self.parse_operand(ops[0])
-        a = self.get_operand_value(dst_t, dst_v)
-        result = -a
-        self.set_operand_value(dst_t, dst_v, result)
+    def _execute_neg(self, dst):
+        self.set_operand_value(*dst, -self.get_operand_value(*dst))
         return True
 
-    # === Quantum gate dispatcher ===
-
-    def _execute_quantum_gate(self, opcode, ops):
-        if self.mode not in ("quantum", "hybrid"):
-            raise RuntimeError("Quantum instructions disabled in classical mode")
-
-        mapping = {
-            "h":"h_gate","x":"x_gate","y":"y_gate","z":"z_gate",
-            "s":"s_gate","t":"t_gate",
-            "rx":"rx_gate","ry":"ry_gate","rz":"rz_gate",
-            "cx":"cnot_gate","cnot":"cnot_gate",
-            "cz":"cz_gate","cy":"cy_gate",
-            "ccx":"ccx_gate","toffoli":"ccx_gate",
-            "swap":"swap_gate"
-        }
-        method = mapping[opcode]
-        fn = getattr(self.quantum_alu, method)
-
-        # Rotations: angle, qubit
-        if opcode in ("rx","ry","rz"):
-            angle = float(ops[0])
-            qubit = self.parse_qubit(ops[1])
-            fn(qubit, angle)
-            return True
+    # === Quantum gates ===
 
-        # Toffoli: 3 qubits
-        if opcode in ("ccx","toffoli"):
-            c1 = self.parse_qubit(ops[0])
-            c2 = self.parse_qubit(ops[1])
-            tgt = self.parse_qubit(ops[2])
-            fn(c1, c2, tgt)
-            return True
-
-        # Single or two-qubit gates
-        qubits = [self.parse_qubit(o) for o in ops]
-        fn(*qubits)
+    def _execute_quantum_gate(self, method, *qubits):
+        """Call the QuantumALU gate method (looked up now: sweeps swap the ALU after loading)."""
+        getattr(self.quantum_alu, method)(*qubits)
         return True
 
-    # === Measurement & Reset ===
+    def _execute_rotation(self, method, qubit, angle):
+        if angle.__class__ is str:
+            angle = self.parse_angle(angle)
+        getattr(self.quantum_alu, method)(qubit, angle)
+        return True
 
-    def _execute_measure(self, ops):
-        if len(ops) != 2:
-            raise ValueError("MEASURE requires 2 operands")
-        q = self.parse_qubit(ops[0])
-        dst_t, dst_v = self.parse_operand(ops[1])
-        bit = self.quantum_registers.measure(q)
-        self.set_operand_value(dst_t, dst_v, bit)
+    def _execute_unitary(self, qubits, matrix):
+        """Apply a fused 2x2/4x4 unitary produced by the gate fusion pass."""
+        self.quantum_alu.apply_unitary(qubits, matrix)
         return True
 
-    def _execute_reset(self, ops):
-        if len(ops) != 1:
-            raise ValueError("RESET requires 1 operand")
-        q = self.parse_qubit(ops[0])
-        self.quantum_registers.set(q, 0)
+    def _execute_barrier(self):
+        """Execute all deferred gates now; also stops load-time gate fusion across it."""
+        if self.quantum_alu is not None:
+            self.quantum_alu.flush()
         return True
 
-    # === Control / Logic / Jumps ===
+    # === Measurement & Reset ===
 
-    def _execute_cmp(self, ops):
-        if len(ops) != 2:
-            raise ValueError("CMP requires 2 operands")
-        a_t, a_v = self.parse_operand(ops[0])
-        b_t, b_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(a_t, a_v)
-        b = self.get_operand_value(b_t, b_v)
-        result = a > b
-        self.registers.set("b", result)
+    def _execute_measure(self, qubit, dst):
+        self._store_measurement(qubit, qubit, self.quantum_registers.measure(qubit), dst)
         return True
 
-    def _execute_gt(self, ops):
-        if len(ops) != 2:
-            raise ValueError("CMP requires 2 operands")
-        a_t, a_v = self.parse_operand(ops[0])
-        b_t, b_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(a_t, a_v)
-        b = self.get_operand_value(b_t, b_v)
-        result = a > b
-        self.registers.set("b", result)
+    def _store_measurement(self, first, last, value, dst):
+        """Log the measured bits (first qubit first) and store the packed value in the optional operand."""
+        if self.measurement_log is not None:
+            self.measurement_log.extend((value >> offset) & 1 for offset in range(last - first + 1))
+        if dst is not None:
+            self.set_operand_value(*dst, value)
+
+    def _store_measurement_hooked(self, first, last, value, dst):
+        type(self)._store_measurement(self, first, last, value, dst)
+        for hook in self.hooks["measurement"]:
+            hook(self, range(first, last + 1), value)
+
+    def _execute_measure_all(self, dst):
+        value = self.quantum_registers.measure_all()
+        self._store_measurement(0, self.quantum_registers.num_qubits - 1, value, dst)
         return True
 
-    def _execute_lt(self, ops):
-        if len(ops) != 2:
-            raise ValueError("CMP requires 2 operands")
-        a_t, a_v = self.parse_operand(ops[0])
-        b_t, b_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(a_t, a_v)
-        b = self.get_operand_value(b_t, b_v)
-        result = a < b
-        self.registers.set("b", result)
+    def _execute_measure_reg(self, first, last, dst):
+        value = self.quantum_registers.measure_range(first, last)
+        self._store_measurement(first, last, value, dst)
         return True
 
+    def _execute_reset(self, qubit):
+        self.quantum_registers.set(qubit, 0)
+        return True
 
+    # === Control / Logic / Jumps ===
 
-    def _execute_eqq(self, ops):
-        if len(ops) != 2:
-            raise ValueError("EQQ requires 2 operands")
-        a_t, a_v = self.parse_operand(ops[0])
-        b_t, b_v = self.parse_operand(ops[1])
-        a = self.get_operand_value(a_t, a_v)
-        b = self.get_operand_value(b_t, b_v)
-        result = a == b
-        self.registers.set("b", result)
+    def _execute_compare(self, test, a, b):
+        """cmp/gt (a > b), lt (a < b) and eqq (a == b) set the b flag."""
+        self.registers.b = bool(test(self.get_operand_value(*a), self.get_operand_value(*b)))
         return True
 
-    def _execute_and(self, ops):
-        if len(ops) != 1:
-            raise ValueError("AND requires 1 operand")
-        src_t, src_v = self.parse_operand(ops[0])
-        a = self.get_operand_value(src_t, src_v)
-        b = self.registers.get("b")
-        result = bool(a) and bool(b)
-        self.registers.set("b", result)
+    def _execute_and(self, src):
+        a = self.get_operand_value(*src)
+        self.registers.b = bool(a) and bool(self.registers.b)
         return True
 
-    def _execute_or(self, ops):
-        if len(ops) != 1:
-            raise ValueError("OR requires 1 operand")
-        src_t, src_v = self.parse_operand(ops[0])
-        a = self.get_operand_value(src_t, src_v)
-        b = self.registers.get("b")
-        result = bool(a) or bool(b)
-        self.registers.set("b", result)
+    def _execute_or(self, src):
+        a = self.get_operand_value(*src)
+        self.registers.b = bool(a) or bool(self.registers.b)
         return True
 
-    def _execute_not(self, ops):
-        if len(ops) != 1 or ops[0] != 'b':
-            raise ValueError("NOT only works for b register")
-        value = self.registers.get('b')
-        self.registers.set('b', not value)
+    def _execute_not(self):
+        self.registers.b = not self.registers.b
         return True
 
-    def _execute_jmp(self, ops):
-        if len(ops) != 1:
-            raise ValueError("JMP requires 1 operand")
-        target = int(ops[0])
+    def _execute_jmp(self, target):
         if 0 <= target < len(self.program):
-            self.registers.set("pc", target)
+            self.registers.pc = target
         else:
             raise ValueError(f"Jump target {target} out of range")
         return True
 
-    def _execute_jmpif(self, ops):
-        if len(ops) != 1:
-            raise ValueError("JMPIF requires 1 operand")
-        if self.registers.get("b"):
-            target = int(ops[0])
-            if 0 <= target < len(self.program):
-                self.registers.set("pc", target)
-            else:
-                raise ValueError(f"Jump target {target} out of range")
+    def _execute_jmpif(self, target):
+        if self.registers.b:
+            self._execute_jmp(target)
         return True
 
     # === I/O Operations ===
 
-    def _execute_out(self, ops):
-        if len(ops) != 1:
-            raise ValueError("OUT requires 1 operand")
-        t, v = self.parse_operand(ops[0])
-        value = self.get_operand_value(t, v)
+    def _execute_out(self, src):
+        value = self.get_operand_value(*src)
         self.output_handler.print_output(f"OUT: {value}")
         return True
 
-    def _execute_in(self, ops):
-        if len(ops) != 1:
-            raise ValueError("IN requires 1 operand")
-        t, v = self.parse_operand(ops[0])
-        
+    def _execute_in(self, dst, prompt):
         # Check if we have a custom input handler with pending input
         if hasattr(self.input_handler, 'pending_input') and self.input_handler.pending_input is not None:
             input_val = str(self.input_handler.pending_input)
             self.input_handler.pending_input = None  # Clear the pending input
-            self.set_operand_value(t, v, int(input_val))
+            self.set_operand_value(*dst, int(input_val))
             return True  # Input processed successfully
         else:
             # Request input and wait for it
-            input_val = self.input_handler.read_keyboard_input(f"IN for {ops[0]}: ")
+            input_val = self.input_handler.read_keyboard_input(prompt)
             if input_val is not None:
-                self.set_operand_value(t, v, int(input_val))
+                self.set_operand_value(*dst, int(input_val))
                 return True  # Input processed successfully
             else:
                 # If no input available, don't increment PC - stay on this instruction
@@ -558,6 +762,30 @@ class Procesor:
         else:
             raise ValueError(f"Cannot set operand type: {t}")
 
+    def _set_operand_value_hooked(self, t, v, val):
+        type(self).set_operand_value(self, t, v, val)
+        if t == "memory_addr":
+            for hook in self.hooks["memory_write"]:
+                hook(self, v, val)
+
+    def parse_angle(self, op):
+        """Rotation angle operand: a number or the name of a parameter in self.parameters."""
+        try:
+            return float(op)
+        except ValueError:
+            if op in self.parameters:
+                return self.parameters[op]
+            raise ValueError(f"Invalid angle: {op}")
+
+    def parse_qubit_range(self, op):
+        """Qubit range operand "qA-qB" (or a single "qA"), returns (A, B) with A <= B."""
+        first, _, last = op.partition("-")
+        first = self.parse_qubit(first)
+        last = self.parse_qubit(last) if last else first
+        if last < first:
+            raise ValueError(f"Invalid qubit range: {op}")
+        return first, last
+
     def parse_qubit(self, op):
         if op.startswith('q') and op[1:].isdigit():
             q = int(op[1:])
@@ -2,11 +2,22 @@
 
 # Pouze relativní importy
 from .classical_registers import ClassicalRegisters
-from .quantum_registers import QuantumRegisters
+from .quantum_registers import QuantumRegisters, estimate_memory
+from .stabilizer_registers import StabilizerRegisters
+from .sparse_registers import SparseQuantumRegisters
+from .batched_registers import BatchedQuantumRegisters
+from .memmap_registers import MemmapQuantumRegisters
 from .registers_interface import RegisterInterface
+from .random_source import RandomSource
 
 __all__ = [
     "RegisterInterface",
     "ClassicalRegisters",
     "QuantumRegisters",
+    "StabilizerRegisters",
+    "SparseQuantumRegisters",
+    "BatchedQuantumRegisters",
+    "MemmapQuantumRegisters",
+    "RandomSource",
+    "estimate_memory",
 ]
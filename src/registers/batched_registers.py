@@ -0,0 +1,120 @@
+# src/registers/batched_registers.py
+
+from .registers_interface import RegisterInterface
+from .quantum_registers import DEFAULT_MEMORY_BUDGET, resolve_dtype, estimate_memory
+import numpy as np
+
+
+class BatchedQuantumRegisters(RegisterInterface):
+    """
+    Dávka `batch` nezávislých stavových vektorů v jednom poli (batch, 2**n).
+
+    Slouží pro parametrické sweepy: všechny členy dávky procházejí stejným
+    programem, jen úhly rotací se mohou lišit (viz BatchedQuantumALU).
+    Měření uprostřed obvodu není podporováno - výsledky se čtou jako
+    pravděpodobnosti nebo střední hodnoty pro každý člen dávky.
+    """
+
+    def __init__(self, num_qubits, batch, precision="double", memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        num_qubits: počet qubitů
+        batch: počet stavových vektorů v dávce
+        precision: "single" (complex64), "double" (complex128) nebo dtype
+        memory_budget: maximum bajtů pro všechny stavy + buffer (None = bez omezení)
+        """
+        if num_qubits < 1:
+            raise ValueError("BatchedQuantumRegisters need at least 1 qubit")
+        if batch < 1:
+            raise ValueError("batch must be at least 1")
+        self.num_qubits = num_qubits
+        self.batch = batch
+        self.dtype = resolve_dtype(precision)
+        required = batch * estimate_memory(num_qubits, self.dtype)
+        if memory_budget is not None and required > memory_budget:
+            raise MemoryError(
+                f"A batch of {batch} states of {num_qubits} qubits needs {required / 1024**2:.1f} MiB, "
+                f"over the memory budget of {memory_budget / 1024**2:.1f} MiB"
+            )
+        self.state = np.zeros((batch, 2**num_qubits), dtype=self.dtype)
+        # Pracovní buffer pro brány (plochý, stejné velikosti jako celá dávka)
+        self.scratch = np.empty(self.state.size, dtype=self.dtype)
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        """Reset všech stavů dávky do |00...0⟩"""
+        self.state.fill(0)
+        self.state[:, 0] = 1.0
+        self.mark_modified()
+
+    def get(self, idx):
+        """Vrátí popis stavu qubitu (nelze přímo číst kvantový stav)"""
+        return f"qubit_{idx}"
+
+    def set(self, idx, value):
+        """Nastavení qubitu do základního stavu (projekce v každém členu dávky)"""
+        if value not in (0, 1):
+            return
+        view = self.state.reshape(self.batch, -1, 2, 1 << idx)
+        kept = view[:, :, value, :]
+        norms = np.sqrt(np.einsum('bij,bij->b', kept.real, kept.real)
+                        + np.einsum('bij,bij->b', kept.imag, kept.imag))
+        # Stejně jako QuantumRegisters: při nulové pravděpodobnosti se stav nemění
+        collapse = norms > 0
+        view[collapse, :, 1 - value, :] = 0
+        kept[collapse] /= norms[collapse, None, None]
+        self.mark_modified()
+
+    def get_full_state(self):
+        """Kopie všech stavů, tvar (batch, 2**n)"""
+        return self.state.copy()
+
+    def view(self):
+        """Vypůjčený pohled na stavy (batch, 2**n) bez kopírování (viz QuantumRegisters.view)"""
+        return self.state
+
+    def mark_modified(self):
+        """Zaznamená změnu stavu (zvýší čítač verzí)"""
+        self.version += 1
+
+    def probabilities(self, qubits=None):
+        """
+        Pravděpodobnosti pro každý člen dávky, tvar (batch, 2**k).
+
+        Bez qubits jde o všechny bázové stavy. Se seznamem qubitů jde
+        o marginální rozdělení; index j odpovídá bitovému řetězci
+        format(j, f"0{k}b") s prvním qubitem vlevo jako u sample_counts.
+        """
+        probs = np.square(np.abs(self.state), dtype=np.float64)
+        probs /= probs.sum(axis=1, keepdims=True)
+        if qubits is None:
+            return probs
+        n = self.num_qubits
+        tensor = probs.reshape((self.batch,) + (2,) * n)
+        # Osa 1 + n-1-q patří qubitu q; ostatní qubity se sečtou
+        keep = [1 + n - 1 - q for q in qubits]
+        summed = tuple(axis for axis in range(1, n + 1) if axis not in keep)
+        marginal = tensor.sum(axis=summed)
+        remaining = [axis for axis in range(1, n + 1) if axis in keep]
+        order = [0] + [1 + remaining.index(axis) for axis in keep]
+        return marginal.transpose(order).reshape(self.batch, -1)
+
+    def expectation_z(self, qubits):
+        """⟨Z_q⟩ pro každý qubit a člen dávky, tvar (batch, len(qubits))"""
+        probs = self.probabilities()
+        indices = np.arange(probs.shape[1])
+        signs = np.array([1 - 2 * ((indices >> q) & 1) for q in qubits], dtype=np.float64)
+        return probs @ signs.T
+
+    def get_probability(self, qubit, outcome):
+        """Pravděpodobnosti výsledku měření qubitu pro každý člen dávky, tvar (batch,)"""
+        return self.probabilities([qubit])[:, outcome]
+
+    def measure(self, qubit):
+        raise RuntimeError("Batched registers do not support mid-circuit measurement")
+
+    def measure_range(self, first, last):
+        raise RuntimeError("Batched registers do not support mid-circuit measurement")
+
+    def measure_all(self):
+        raise RuntimeError("Batched registers do not support mid-circuit measurement")
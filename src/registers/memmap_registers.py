@@ -0,0 +1,321 @@
+# src/registers/memmap_registers.py
+
+from .registers_interface import RegisterInterface
+from .quantum_registers import resolve_dtype, cached_by_version, z_expectations, _pair_key
+from .random_source import RandomSource
+import tempfile
+import numpy as np
+
+# Výchozí velikost chunku: 2**16 amplitud (1 MiB v complex128) se vejde do cache
+DEFAULT_CHUNK_QUBITS = 16
+
+# Brána s k qubity nad chunkem načte najednou 2**k chunků (dvouqubitová max. 4)
+_MAX_GROUP = 4
+
+
+class MemmapQuantumRegisters(RegisterInterface):
+    """
+    Stavový vektor mimo RAM: amplitudy leží v numpy.memmap na lokálním disku
+    a zpracovávají se po chuncích 2**chunk_qubits amplitud.
+
+    Qubity 0..chunk_qubits-1 leží uvnitř chunku, vyšší qubity určují číslo
+    chunku. Brána na nízkém qubitu zpracuje každý chunk zvlášť, brána na
+    vysokém qubitu načte dvojici (čtveřici) chunků lišících se v jeho bitu.
+    Každý chunk se tak při jedné bráně přečte a zapíše nejvýš jednou.
+    V RAM jsou jen pracovní buffery o velikosti několika chunků.
+    """
+
+    def __init__(self, num_qubits=30, precision="double", directory=None,
+                 chunk_qubits=DEFAULT_CHUNK_QUBITS, rng=None):
+        """
+        num_qubits: počet qubitů
+        precision: "single" (complex64), "double" (complex128) nebo dtype
+        directory: adresář pro soubor se stavem (None = systémový temp)
+        chunk_qubits: velikost chunku jako počet qubitů (2**chunk_qubits amplitud)
+        rng: RandomSource pro měření (None = vlastní s náhodným seedem)
+        """
+        if num_qubits < 1:
+            raise ValueError("MemmapQuantumRegisters need at least 1 qubit")
+        if chunk_qubits < 1:
+            raise ValueError("chunk_qubits must be at least 1")
+        self.num_qubits = num_qubits
+        self.dtype = resolve_dtype(precision)
+        self.rng = rng if rng is not None else RandomSource()
+        self.chunk_qubits = min(chunk_qubits, num_qubits)
+        self.chunk_size = 1 << self.chunk_qubits
+        self.num_chunks = 1 << (num_qubits - self.chunk_qubits)
+        # Nepojmenovaný dočasný soubor - systém ho smaže, jakmile zanikne mapování
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self.state = np.memmap(self._file, dtype=self.dtype, mode="w+", shape=(2**num_qubits,))
+        # Buffery v RAM: načtená skupina chunků a pracovní buffer kernelů
+        self.block = np.empty(_MAX_GROUP * self.chunk_size, dtype=self.dtype)
+        self.scratch = np.empty_like(self.block)
+        self.version = 0
+        # Nový soubor (mode="w+") je už vynulovaný - stačí nastavit |00...0⟩
+        self.state[0] = 1.0
+        self.mark_modified()
+
+    def close(self):
+        """Uvolní mapování a soubor se stavem (registry pak už nejdou použít)"""
+        del self.state
+        self._file.close()
+
+    # === Chunky ===
+
+    def chunk(self, index):
+        """Pohled do souboru na chunk `index` (čtení/zápis jde přes page cache)"""
+        start = index * self.chunk_size
+        return self.state[start:start + self.chunk_size]
+
+    def load(self, group):
+        """Načte chunky `group` za sebe do bufferu block a vrátí jeho část"""
+        size = self.chunk_size
+        block = self.block[:len(group) * size]
+        for k, index in enumerate(group):
+            np.copyto(block[k * size:(k + 1) * size], self.chunk(index))
+        return block
+
+    def store(self, group, block):
+        """Zapíše buffer z load() zpět do chunků `group`"""
+        size = self.chunk_size
+        for k, index in enumerate(group):
+            np.copyto(self.chunk(index), block[k * size:(k + 1) * size])
+
+    def chunk_groups(self, high_qubits, high_controls=()):
+        """
+        Skupiny chunků pro bránu na vysokých qubitech high_qubits: v každé
+        skupině je 2**k chunků, k-tý bit pozice ve skupině odpovídá
+        high_qubits[k]. Chunky, kde některý vysoký řídicí qubit není |1⟩,
+        se vynechají.
+        """
+        offsets = [1 << (q - self.chunk_qubits) for q in high_qubits]
+        free = sum(offsets)
+        need = sum(1 << (q - self.chunk_qubits) for q in high_controls)
+        combos = [sum(offset for bit, offset in enumerate(offsets) if (k >> bit) & 1)
+                  for k in range(1 << len(offsets))]
+        for base in range(self.num_chunks):
+            if base & free or (base & need) != need:
+                continue
+            yield [base + combo for combo in combos]
+
+    def _chunk_probs(self, index):
+        chunk = self.chunk(index)
+        return np.square(np.abs(chunk), dtype=np.float64)
+
+    def _chunk_masses(self):
+        """Součet |a|² každého chunku (jeden průchod souborem)"""
+        return np.array([float(np.sum(self._chunk_probs(index))) for index in range(self.num_chunks)])
+
+    # === Rozhraní registrů ===
+
+    def reset(self):
+        """Reset všech qubitů do |00...0⟩"""
+        self.sync(discard=True)
+        for index in range(self.num_chunks):
+            self.chunk(index).fill(0)
+        self.state[0] = 1.0
+        self.mark_modified()
+
+    def get(self, idx):
+        """Vrátí popis stavu qubitu (nelze přímo číst kvantový stav)"""
+        return f"qubit_{idx}"
+
+    def set(self, idx, value):
+        """Nastavení qubitu do základního stavu"""
+        if value in (0, 1):
+            self._collapse_to_outcome(idx, value)
+
+    def get_full_state(self):
+        """Celý stav jako pole v RAM (jen pro stavy, které se do RAM vejdou)"""
+        self.sync()
+        return np.array(self.state)
+
+    def set_full_state(self, new_state):
+        """Nastaví nový kvantový stav (kopíruje po chuncích)"""
+        self.sync(discard=True)
+        new_state = np.asarray(new_state)
+        for index in range(self.num_chunks):
+            start = index * self.chunk_size
+            np.copyto(self.chunk(index), new_state[start:start + self.chunk_size])
+        self.mark_modified()
+
+    def view(self):
+        """Celý stav jako memmap (viz QuantumRegisters.view) - přístup jde přes disk"""
+        self.sync()
+        return self.state
+
+    def mark_modified(self):
+        """Zaznamená změnu stavu (zvýší čítač verzí)"""
+        self.version += 1
+
+    def flush_to_disk(self):
+        """Zapíše změněné stránky stavu na disk"""
+        self.sync()
+        self.state.flush()
+
+    # === Pravděpodobnosti a měření ===
+
+    def probabilities(self):
+        """Pravděpodobnosti všech bázových stavů - pole 2**n v RAM"""
+        self.sync()
+        probs = np.empty(2**self.num_qubits, dtype=np.float64)
+        for index in range(self.num_chunks):
+            start = index * self.chunk_size
+            probs[start:start + self.chunk_size] = self._chunk_probs(index)
+        return probs / probs.sum()
+
+    def sample_counts(self, qubits, shots):
+        """
+        Navzorkuje `shots` měření zadaných qubitů bez kolapsu stavu.
+
+        Výstřely se nejprve rozdělí mezi chunky podle jejich pravděpodobnosti
+        a pak se losuje uvnitř chunků - v RAM je vždy jen jeden chunk.
+        """
+        self.sync()
+        masses = self._chunk_masses()
+        per_chunk = self.rng.multinomial(shots, masses / masses.sum())
+        result = {}
+        for index in np.flatnonzero(per_chunk):
+            probs = self._chunk_probs(int(index))
+            counts = self.rng.multinomial(int(per_chunk[index]), probs / probs.sum())
+            start = int(index) * self.chunk_size
+            for offset in np.flatnonzero(counts):
+                basis = start + int(offset)
+                key = "".join(str((basis >> q) & 1) for q in qubits)
+                result[key] = result.get(key, 0) + int(counts[offset])
+        return result
+
+    def get_probability(self, qubit, outcome):
+        """Pravděpodobnost měření konkrétního qubitu (jeden průchod souborem)"""
+        self.sync()
+        total = 0.0
+        if qubit >= self.chunk_qubits:
+            bit = 1 << (qubit - self.chunk_qubits)
+            for index in range(self.num_chunks):
+                if bool(index & bit) == bool(outcome):
+                    total += float(np.sum(self._chunk_probs(index)))
+            return total
+        for index in range(self.num_chunks):
+            half = self.chunk(index).reshape(-1, 2, 1 << qubit)[:, outcome, :]
+            total += float(np.sum(np.square(np.abs(half), dtype=np.float64)))
+        return total
+
+    def measure(self, qubit):
+        """Změří qubit a vrátí 0 nebo 1"""
+        self.sync()
+        prob_0 = self.get_probability(qubit, 0)
+        outcome = 0 if self.rng.random() < prob_0 else 1
+        prob = prob_0 if outcome == 0 else 1 - prob_0
+        self._collapse_to_outcome(qubit, outcome, prob)
+        return outcome
+
+    def _collapse_to_outcome(self, qubit, outcome, prob=None):
+        """Kolaps po měření: vynuluje amplitudy s druhým výsledkem a přenormuje"""
+        self.sync()
+        if prob is None:
+            prob = self.get_probability(qubit, outcome)
+        if prob <= 0:
+            return
+        scale = self.dtype.type(1 / np.sqrt(prob))
+        for index in range(self.num_chunks):
+            chunk = self.chunk(index)
+            if qubit >= self.chunk_qubits:
+                if bool(index & (1 << (qubit - self.chunk_qubits))) == bool(outcome):
+                    chunk *= scale
+                else:
+                    chunk.fill(0)
+            else:
+                halves = chunk.reshape(-1, 2, 1 << qubit)
+                halves[:, 1 - outcome, :] = 0
+                halves[:, outcome, :] *= scale
+        self.mark_modified()
+
+    def measure_range(self, first, last):
+        """
+        Změří qubity first..last najednou (viz QuantumRegisters.measure_range):
+        chunk se vylosuje podle součtů chunků, bázový stav uvnitř chunku.
+        """
+        self.sync()
+        width = last - first + 1
+        if first < 0 or last >= self.num_qubits or width < 1:
+            raise ValueError(f"Invalid qubit range {first}..{last}")
+        masses = self._chunk_masses()
+        draw = self.rng.random() * masses.sum()
+        index = min(int(np.searchsorted(np.cumsum(masses), draw, side="right")), self.num_chunks - 1)
+        cumulative = np.cumsum(self._chunk_probs(index))
+        draw -= masses[:index].sum()
+        offset = min(int(np.searchsorted(cumulative, draw, side="right")), self.chunk_size - 1)
+        mask_bits = (1 << width) - 1
+        value = ((index * self.chunk_size + offset) >> first) & mask_bits
+
+        # Kolaps: amplitudy s jinou hodnotou měřených qubitů se vynulují
+        offsets = np.arange(self.chunk_size, dtype=np.int64)
+        kept_chunks = []
+        prob = 0.0
+        for index in range(self.num_chunks):
+            chunk = self.chunk(index)
+            mismatch = (((index * self.chunk_size + offsets) >> first) & mask_bits) != value
+            chunk[mismatch] = 0
+            prob += float(np.sum(np.square(np.abs(chunk), dtype=np.float64)))
+            kept_chunks.append(not mismatch.all())
+        scale = self.dtype.type(1 / np.sqrt(prob))
+        for index, kept in enumerate(kept_chunks):
+            if kept:
+                self.chunk(index)[...] *= scale
+        self.mark_modified()
+        return value
+
+    def measure_all(self):
+        """Změří všechny qubity najednou, vrátí celé číslo"""
+        return self.measure_range(0, self.num_qubits - 1)
+
+    # === Marginály a střední hodnoty ===
+
+    def marginals(self):
+        """Pravděpodobnosti (P(0), P(1)) všech qubitů, tvar (n, 2) - jeden průchod souborem"""
+        return cached_by_version(self, "marginals", self._compute_marginals)
+
+    def _compute_marginals(self):
+        c = self.chunk_qubits
+        ones = np.zeros(self.num_qubits)
+        total = 0.0
+        for index in range(self.num_chunks):
+            probs = self._chunk_probs(index)
+            mass = float(probs.sum())
+            total += mass
+            for qubit in range(c, self.num_qubits):
+                if index & (1 << (qubit - c)):
+                    ones[qubit] += mass
+            # Nízké qubity: postupné půlení jako v QuantumRegisters.marginals
+            for qubit in range(c - 1, -1, -1):
+                halves = probs.reshape(2, -1)
+                ones[qubit] += halves[1].sum()
+                probs = np.add(halves[0], halves[1], out=halves[0])
+        ones /= total
+        return np.stack([1 - ones, ones], axis=1)
+
+    def expectation_z(self, qubits=None):
+        """⟨Z_q⟩ pro zadané qubity (None = všechny), z marginálů"""
+        if qubits is None:
+            qubits = range(self.num_qubits)
+        return z_expectations(self.marginals(), qubits)
+
+    def expectation_zz(self, pairs):
+        """⟨Z_a Z_b⟩ pro seznam dvojic qubitů; chybějící dvojice jedním průchodem souborem"""
+        keys = [_pair_key(pair) for pair in pairs]
+        cache = cached_by_version(self, "zz", dict)
+        missing = sorted({key for key in keys if key[0] != key[1] and key not in cache})
+        if missing:
+            offsets = np.arange(self.chunk_size, dtype=np.int64)
+            sums = np.zeros(len(missing))
+            total = 0.0
+            for index in range(self.num_chunks):
+                probs = self._chunk_probs(index)
+                total += float(probs.sum())
+                basis = index * self.chunk_size + offsets
+                for k, (first, second) in enumerate(missing):
+                    parity = ((basis >> first) ^ (basis >> second)) & 1
+                    sums[k] += float(probs @ (1 - 2 * parity))
+            for key, value in zip(missing, sums / total):
+                cache[key] = float(value)
+        return np.array([1.0 if first == second else cache[first, second] for first, second in keys])
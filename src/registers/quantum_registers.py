@@ -1,17 +1,115 @@
 # src/registers/quantum_registers.py
 
 from .registers_interface import RegisterInterface
+from .random_source import RandomSource
 import numpy as np
 
+# Přesnost amplitud: complex64 zabere polovinu paměti complex128
+PRECISIONS = {
+    "single": np.complex64,
+    "double": np.complex128,
+}
+
+# Výchozí strop paměti pro stav + pracovní buffer (4 GiB)
+DEFAULT_MEMORY_BUDGET = 4 * 1024**3
+
+
+def resolve_dtype(precision):
+    """Převede "single"/"double" nebo numpy dtype na komplexní dtype amplitud"""
+    if isinstance(precision, str):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {sorted(PRECISIONS)}")
+        return np.dtype(PRECISIONS[precision])
+    dtype = np.dtype(precision)
+    if dtype not in (np.complex64, np.complex128):
+        raise ValueError(f"Unsupported amplitude dtype {dtype}, expected complex64 or complex128")
+    return dtype
+
+
+def estimate_memory(num_qubits, precision="double"):
+    """Odhad paměti v bajtech: stavový vektor + pracovní buffer stejné velikosti"""
+    return 2 * (2**num_qubits) * resolve_dtype(precision).itemsize
+
+
+def _qubit_halves(state, num_qubits):
+    """Pro každý qubit dvojice pohledů (qubit=0, qubit=1) na stav"""
+    halves = []
+    for qubit in range(num_qubits):
+        view = state.reshape(-1, 2, 1 << qubit)
+        halves.append((view[:, 0, :], view[:, 1, :]))
+    return halves
+
+
+def _norm_squared(amplitudes):
+    """Součet |a|² bez pomocných polí (einsum nad reálnou a imaginární částí)"""
+    return float(np.einsum('ij,ij->', amplitudes.real, amplitudes.real)
+                 + np.einsum('ij,ij->', amplitudes.imag, amplitudes.imag))
+
+
+def cached_by_version(registers, key, compute):
+    """
+    Výsledek compute() uložený k aktuální verzi stavu registrů: opakovaný
+    dotaz mezi dvěma branami se nepočítá znovu. Odložené brány se nejprve
+    provedou (sync), protože mění verzi.
+    """
+    registers.sync()
+    cache = registers.__dict__.get("_state_cache")
+    if cache is None or cache[0] != registers.version:
+        cache = (registers.version, {})
+        registers._state_cache = cache
+    values = cache[1]
+    if key not in values:
+        values[key] = compute()
+    return values[key]
+
+
+def z_expectations(marginals, qubits):
+    """⟨Z_q⟩ = P(0) - P(1) z tabulky marginálů (n, 2)"""
+    marginals = marginals[list(qubits)]
+    return marginals[:, 0] - marginals[:, 1]
+
+
+def _pair_key(pair):
+    first, second = (int(q) for q in pair)
+    return (first, second) if first <= second else (second, first)
+
+
 class QuantumRegisters(RegisterInterface):
-    def __init__(self, num_qubits=8):
+    def __init__(self, num_qubits=8, precision="double", memory_budget=DEFAULT_MEMORY_BUDGET, rng=None):
+        """
+        num_qubits: počet qubitů
+        precision: "single" (complex64), "double" (complex128) nebo dtype
+        memory_budget: maximum bajtů pro stav + buffer (None = bez omezení)
+        rng: RandomSource pro měření (None = vlastní s náhodným seedem)
+        """
+        if num_qubits < 1:
+            raise ValueError("QuantumRegisters need at least 1 qubit")
         self.num_qubits = num_qubits
+        self.dtype = resolve_dtype(precision)
+        self.rng = rng if rng is not None else RandomSource()
+        required = estimate_memory(num_qubits, self.dtype)
+        if memory_budget is not None and required > memory_budget:
+            raise MemoryError(
+                f"{num_qubits} qubits in {self.dtype} need {required / 1024**2:.1f} MiB, "
+                f"over the memory budget of {memory_budget / 1024**2:.1f} MiB"
+            )
+        self.state = np.zeros(2**num_qubits, dtype=self.dtype)
+        # Pracovní buffer pro brány - alokuje se jednou, ne při každé bráně
+        self.scratch = np.empty_like(self.state)
+        # Předpočítané "masky" qubitů: pro každý qubit dvojice pohledů na
+        # amplitudy s qubitem v |0⟩ a v |1⟩. Jsou to pohledy (hi, lo) do
+        # self.state, takže nic nekopírují a platí po celou dobu života registru.
+        self._qubit_halves = _qubit_halves(self.state, num_qubits)
+        # Čítač verzí stavu - zvyšuje se při každé změně amplitud
+        self.version = 0
         self.reset()
     
     def reset(self):
         """Reset všech qubitů do |00...0⟩"""
-        self.state = np.zeros(2**self.num_qubits, dtype=complex)
+        self.sync(discard=True)
+        self.state.fill(0)
         self.state[0] = 1.0  # |00...0⟩
+        self.mark_modified()
     
     def get(self, idx):
         """Vrátí popis stavu qubitu (nelze přímo číst kvantový stav)"""
@@ -19,6 +117,7 @@ class QuantumRegisters(RegisterInterface):
     
     def set(self, idx, value):
         """Nastavení qubitu do základního stavu"""
+        self.sync()
         if value == 0:
             self._project_to_zero(idx)
         elif value == 1:
@@ -26,39 +125,154 @@ class QuantumRegisters(RegisterInterface):
     
     def get_full_state(self):
         """Vrátí celý kvantový stav (pro debugging)"""
+        self.sync()
         return self.state.copy()
     
     def set_full_state(self, new_state):
-        """Nastaví nový kvantový stav (používá ALU)"""
-        self.state = new_state.copy()
+        """Nastaví nový kvantový stav (kopíruje do existujícího bufferu)"""
+        self.sync(discard=True)
+        np.copyto(self.state, new_state)
+        self.mark_modified()
+    
+    def view(self):
+        """
+        Vrátí vypůjčený pohled na stav bez kopírování.
+
+        Volající smí amplitudy měnit na místě a po změně musí zavolat
+        mark_modified(). Pohled je platný jen do další operace registru.
+        """
+        self.sync()
+        return self.state
+    
+    def mark_modified(self):
+        """Zaznamená změnu stavu (zvýší čítač verzí)"""
+        self.version += 1
     
+    def probabilities(self):
+        """Pravděpodobnosti všech bázových stavů (|amplituda|², normované)"""
+        self.sync()
+        probs = np.square(np.abs(self.state), dtype=np.float64)
+        return probs / probs.sum()
+    
+    def sample_counts(self, qubits, shots):
+        """
+        Navzorkuje `shots` měření zadaných qubitů bez kolapsu stavu.
+
+        Všechny výsledky se vylosují jedním voláním multinomial nad celým
+        rozdělením. Vrací slovník bitový řetězec -> počet; bit prvního
+        qubitu v seznamu je vlevo.
+        """
+        self.sync()
+        counts = self.rng.multinomial(shots, self.probabilities())
+        result = {}
+        for index in np.flatnonzero(counts):
+            key = "".join(str((int(index) >> q) & 1) for q in qubits)
+            result[key] = result.get(key, 0) + int(counts[index])
+        return result
+    
+    def marginals(self):
+        """
+        Pravděpodobnosti (P(0), P(1)) všech qubitů najednou, tvar (n, 2).
+
+        Jeden průchod stavem na |a|², pak se rozdělení postupně půlí: součet
+        horní poloviny je P(1) nejvyššího qubitu a součet obou polovin je
+        rozdělení zbylých qubitů. Celkem ~2·2**n sčítání místo n průchodů.
+        Výsledek se drží do další změny stavu.
+        """
+        return cached_by_version(self, "marginals", self._compute_marginals)
+
+    def _compute_marginals(self):
+        probs = np.square(np.abs(self.state), dtype=np.float64)
+        total = probs.sum()
+        ones = np.empty(self.num_qubits)
+        for qubit in range(self.num_qubits - 1, -1, -1):
+            halves = probs.reshape(2, -1)
+            ones[qubit] = halves[1].sum()
+            probs = np.add(halves[0], halves[1], out=halves[0])
+        ones /= total
+        return np.stack([1 - ones, ones], axis=1)
+
+    def expectation_z(self, qubits=None):
+        """⟨Z_q⟩ pro zadané qubity (None = všechny), z marginálů"""
+        if qubits is None:
+            qubits = range(self.num_qubits)
+        return z_expectations(self.marginals(), qubits)
+
+    def expectation_zz(self, pairs):
+        """
+        ⟨Z_a Z_b⟩ pro seznam dvojic qubitů, tvar (len(pairs),).
+
+        |a|² se spočítá jednou pro všechny dvojice, které ještě nejsou
+        v cache; každá dvojice je pak jedna redukce na 2x2 rozdělení.
+        """
+        keys = [_pair_key(pair) for pair in pairs]
+        missing = [key for key in set(keys) if key[0] != key[1]]
+        cache = cached_by_version(self, "zz", dict)
+        missing = [key for key in missing if key not in cache]
+        if missing:
+            n = self.num_qubits
+            probs = np.square(np.abs(self.state), dtype=np.float64)
+            probs /= probs.sum()
+            tensor = probs.reshape((2,) * n)
+            for first, second in missing:
+                kept = (n - 1 - first, n - 1 - second)
+                joint = tensor.sum(axis=tuple(axis for axis in range(n) if axis not in kept))
+                cache[first, second] = float(joint[0, 0] + joint[1, 1] - joint[0, 1] - joint[1, 0])
+        return np.array([1.0 if first == second else cache[first, second] for first, second in keys])
+
     def get_probability(self, qubit, outcome):
-        """Pravděpodobnost měření konkrétního qubitu"""
-        prob = 0.0
-        for i in range(2**self.num_qubits):
-            if (i >> qubit) & 1 == outcome:
-                prob += abs(self.state[i])**2
-        return prob
+        """Pravděpodobnost měření konkrétního qubitu (jedna redukce přes polovinu stavu)"""
+        self.sync()
+        return _norm_squared(self._qubit_halves[qubit][outcome])
     
     def measure(self, qubit):
         """Změří qubit a vrátí 0 nebo 1"""
+        self.sync()
         prob_0 = self.get_probability(qubit, 0)
-        outcome = 0 if np.random.random() < prob_0 else 1
-        self._collapse_to_outcome(qubit, outcome)
+        outcome = 0 if self.rng.random() < prob_0 else 1
+        prob = prob_0 if outcome == 0 else self.get_probability(qubit, 1)
+        self._collapse_to_outcome(qubit, outcome, prob)
         return outcome
     
-    def _collapse_to_outcome(self, qubit, outcome):
-        """Kolaps vlnové funkce po měření"""
-        new_state = np.zeros_like(self.state)
-        norm = 0.0
-        
-        for i in range(2**self.num_qubits):
-            if (i >> qubit) & 1 == outcome:
-                new_state[i] = self.state[i]
-                norm += abs(self.state[i])**2
-        
-        if norm > 0:
-            self.state = new_state / np.sqrt(norm)
+    def measure_range(self, first, last):
+        """
+        Změří qubity first..last najednou a vrátí jejich hodnotu jako celé
+        číslo (qubit first = nejnižší bit).
+
+        Vylosuje se jeden bázový stav z celého rozdělení |a|² a stav se
+        zkolabuje jedním průchodem - O(2**n) místo n měření po qubitech.
+        """
+        self.sync()
+        width = last - first + 1
+        if first < 0 or last >= self.num_qubits or width < 1:
+            raise ValueError(f"Invalid qubit range {first}..{last}")
+        cumulative = np.cumsum(np.square(np.abs(self.state), dtype=np.float64))
+        index = int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side="right"))
+        index = min(index, self.state.size - 1)
+        value = (index >> first) & ((1 << width) - 1)
+        # Osa 1 = hodnota měřených qubitů; ponechá se jen řez s výsledkem
+        view = self.state.reshape(-1, 1 << width, 1 << first)
+        kept = view[:, value, :]
+        prob = _norm_squared(kept)
+        view[:, :value, :] = 0
+        view[:, value + 1:, :] = 0
+        kept *= 1 / np.sqrt(prob)
+        self.mark_modified()
+        return value
+
+    def measure_all(self):
+        """Změří všechny qubity najednou (viz measure_range), vrátí celé číslo"""
+        return self.measure_range(0, self.num_qubits - 1)
+
+    def _collapse_to_outcome(self, qubit, outcome, prob=None):
+        """Kolaps vlnové funkce po měření: vynuluje druhou polovinu a přenormuje"""
+        kept = self._qubit_halves[qubit][outcome]
+        if prob is None:
+            prob = _norm_squared(kept)
+        if prob > 0:
+            self._qubit_halves[qubit][1 - outcome].fill(0)
+            kept *= 1 / np.sqrt(prob)
+            self.mark_modified()
     
     def _project_to_zero(self, qubit):
         """Projekce qubitu do |0⟩"""
@@ -0,0 +1,68 @@
+# src/registers/random_source.py
+
+import numpy as np
+
+# Počet náhodných čísel vylosovaných najednou pro measure()
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class RandomSource:
+    """
+    Zdroj náhodnosti pro měření: vlastní numpy Generator s volitelným seedem.
+
+    Jednotlivá čísla pro measure() se losují po blocích, takže jedno měření
+    stojí jen indexaci do předem vylosovaného pole. Stav (včetně nevyčerpané
+    části bloku) jde exportovat a obnovit, takže běh lze přesně zopakovat.
+    """
+
+    def __init__(self, seed=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        seed: int, SeedSequence nebo None (náhodný seed od OS)
+        block_size: kolik čísel random() se vylosuje najednou
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.block_size = block_size
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """Začne znovu od zadaného seedu (zahodí vylosovaný blok)"""
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self._block = []
+        self._position = 0
+
+    def random(self):
+        """Jedno číslo z [0, 1) z předem vylosovaného bloku"""
+        if self._position >= len(self._block):
+            # Blok jako list floatů: indexace listu je levnější než numpy skalár
+            self._block = self.generator.random(self.block_size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def bits(self, shape):
+        """Pole náhodných bitů (uint8) daného tvaru"""
+        return self.generator.integers(0, 2, size=shape, dtype=np.uint8)
+
+    def multinomial(self, n, pvals):
+        """Počty výsledků n losování z rozdělení pvals"""
+        return self.generator.multinomial(n, pvals)
+
+    def spawn(self, count):
+        """Nezávislé zdroje pro paralelní běhy (odvozené ze stejného seedu)"""
+        return [RandomSource(child, self.block_size) for child in self.seed_sequence.spawn(count)]
+
+    def get_state(self):
+        """Export stavu (generátor + nevyčerpaná část bloku)"""
+        return {
+            "bit_generator": self.generator.bit_generator.state,
+            "block": self._block[self._position:],
+        }
+
+    def set_state(self, state):
+        """Obnoví stav získaný z get_state()"""
+        self.generator.bit_generator.state = state["bit_generator"]
+        self._block = list(state["block"])
+        self._position = 0
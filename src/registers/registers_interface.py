@@ -3,6 +3,15 @@
 from abc import ABC, abstractmethod
 
 class RegisterInterface(ABC):
+    # Volitelný hook pro odložené operace (např. QuantumALU.flush); volá se
+    # před každým čtením nebo přepsáním stavu, viz sync()
+    sync_hook = None
+
+    def sync(self, discard=False):
+        """Provede odložené operace nad stavem (discard=True je zahodí)"""
+        if self.sync_hook is not None:
+            self.sync_hook(discard)
+
     @abstractmethod
     def get(self, idx):
         pass
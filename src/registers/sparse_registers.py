@@ -0,0 +1,282 @@
+# src/registers/sparse_registers.py
+
+from .registers_interface import RegisterInterface
+from .quantum_registers import (QuantumRegisters, DEFAULT_MEMORY_BUDGET, resolve_dtype, estimate_memory,
+                                cached_by_version, z_expectations, _pair_key)
+from .random_source import RandomSource
+import numpy as np
+
+# Výchozí podíl nenulových amplitud, nad kterým se přejde na hustý vektor
+DEFAULT_FILL_RATIO = 0.25
+
+# Indexy bázových stavů jsou int64
+MAX_SPARSE_QUBITS = 62
+
+
+class SparseQuantumRegisters(RegisterInterface):
+    """
+    Kvantové registry, které drží jen nenulové amplitudy: seřazené pole
+    indexů bázových stavů a pole hodnot. Hodí se pro obvody, které se
+    dotknou jen několika bázových stavů (reverzibilní logika x/cx/ccx,
+    stavy zkolabované měřením).
+
+    Když podíl nenulových amplitud přesáhne fill_ratio, stav se převede do
+    husté QuantumRegisters (pokud se vejde do memory_budget). Po měření se
+    řídký stav znovu zkusí obnovit.
+    """
+
+    def __init__(self, num_qubits=8, precision="double", memory_budget=DEFAULT_MEMORY_BUDGET,
+                 fill_ratio=DEFAULT_FILL_RATIO, rng=None):
+        """
+        num_qubits: počet qubitů (nejvýše 62)
+        precision: "single" (complex64), "double" (complex128) nebo dtype
+        memory_budget: maximum bajtů pro hustý stav + buffer (None = bez omezení)
+        fill_ratio: podíl nenulových amplitud, nad kterým se přejde na hustý stav
+        rng: RandomSource pro měření (None = vlastní s náhodným seedem)
+        """
+        if not 1 <= num_qubits <= MAX_SPARSE_QUBITS:
+            raise ValueError(f"SparseQuantumRegisters support 1 to {MAX_SPARSE_QUBITS} qubits")
+        if not 0 < fill_ratio <= 1:
+            raise ValueError("fill_ratio must be in (0, 1]")
+        self.num_qubits = num_qubits
+        self.dtype = resolve_dtype(precision)
+        self.memory_budget = memory_budget
+        self.fill_ratio = fill_ratio
+        self.rng = rng if rng is not None else RandomSource()
+        # Amplitudy menší než tato mez se při řídkém výpočtu zahodí
+        self.tolerance = float(np.finfo(self.dtype).eps)
+        self.dense = None  # QuantumRegisters, když je stav hustý
+        self.version = 0
+        self.reset()
+
+    # === Reprezentace ===
+
+    @property
+    def is_sparse(self):
+        return self.dense is None
+
+    @property
+    def nnz(self):
+        """Počet uložených (nenulových) amplitud"""
+        self.sync()
+        if self.is_sparse:
+            return int(self.indices.size)
+        return int(np.count_nonzero(np.abs(self.dense.state) > self.tolerance))
+
+    def _dense_fits(self):
+        return (self.memory_budget is None
+                or estimate_memory(self.num_qubits, self.dtype) <= self.memory_budget)
+
+    def _to_dense(self):
+        """Převede řídký stav na hustý vektor"""
+        dense = QuantumRegisters(self.num_qubits, precision=self.dtype, memory_budget=self.memory_budget,
+                                 rng=self.rng)
+        dense.state.fill(0)
+        dense.state[self.indices] = self.values
+        self.dense = dense
+        self.indices = self.values = None
+
+    def _to_sparse(self):
+        """Převede hustý vektor zpět na řídký stav a uvolní ho"""
+        state = self.dense.state
+        self.indices = np.flatnonzero(np.abs(state) > self.tolerance).astype(np.int64)
+        self.values = state[self.indices]
+        self.dense = None
+
+    def _check_fill(self):
+        """Po bráně: přejde na hustý stav, pokud je řídký příliš zaplněný"""
+        if self.is_sparse and self.indices.size > self.fill_ratio * 2**self.num_qubits and self._dense_fits():
+            self._to_dense()
+
+    def _check_collapse(self):
+        """Po měření: vrátí se k řídkému stavu, pokud kolaps většinu amplitud vynuloval"""
+        # Poloviční mez brání přepínání tam a zpět na hranici fill_ratio
+        if not self.is_sparse and self.nnz <= self.fill_ratio * 2**self.num_qubits / 2:
+            self._to_sparse()
+
+    # === Rozhraní registrů ===
+
+    def reset(self):
+        """Reset všech qubitů do |00...0⟩ (řídký stav s jedinou amplitudou)"""
+        self.sync(discard=True)
+        self.dense = None
+        self.indices = np.zeros(1, dtype=np.int64)
+        self.values = np.ones(1, dtype=self.dtype)
+        self.mark_modified()
+
+    def get(self, idx):
+        """Vrátí popis stavu qubitu (nelze přímo číst kvantový stav)"""
+        return f"qubit_{idx}"
+
+    def set(self, idx, value):
+        """Nastavení qubitu do základního stavu"""
+        self.sync()
+        if value in (0, 1):
+            self._collapse_to_outcome(idx, value)
+
+    def get_full_state(self):
+        """Vrátí celý kvantový stav jako hustý vektor (pro debugging)"""
+        self.sync()
+        if not self.is_sparse:
+            return self.dense.get_full_state()
+        state = np.zeros(2**self.num_qubits, dtype=self.dtype)
+        state[self.indices] = self.values
+        return state
+
+    def set_full_state(self, new_state):
+        """Nastaví nový kvantový stav z hustého vektoru"""
+        self.sync(discard=True)
+        new_state = np.asarray(new_state, dtype=self.dtype)
+        self.dense = None
+        self.indices = np.flatnonzero(np.abs(new_state) > self.tolerance).astype(np.int64)
+        self.values = new_state[self.indices]
+        self._check_fill()
+        self.mark_modified()
+
+    def set_sparse_state(self, indices, values):
+        """Nastaví řídký stav (seřazené indexy, hodnoty) - používá SparseQuantumALU"""
+        self.indices = indices
+        self.values = values
+        self._check_fill()
+        self.mark_modified()
+
+    def view(self):
+        """Vypůjčený pohled na hustý stav; řídký stav se nejprve převede na hustý"""
+        self.sync()
+        if self.is_sparse:
+            self._to_dense()
+        return self.dense.view()
+
+    @property
+    def scratch(self):
+        """Pracovní buffer hustého stavu (viz QuantumRegisters.scratch)"""
+        self.view()
+        return self.dense.scratch
+
+    def mark_modified(self):
+        """Zaznamená změnu stavu (zvýší čítač verzí)"""
+        self.version += 1
+
+    def probabilities(self):
+        """Pravděpodobnosti všech bázových stavů (|amplituda|², normované)"""
+        self.sync()
+        if not self.is_sparse:
+            return self.dense.probabilities()
+        probs = np.zeros(2**self.num_qubits, dtype=np.float64)
+        probs[self.indices] = np.square(np.abs(self.values), dtype=np.float64)
+        return probs / probs.sum()
+
+    def sample_counts(self, qubits, shots):
+        """
+        Navzorkuje `shots` měření zadaných qubitů bez kolapsu stavu.
+
+        V řídkém stavu losuje multinomial jen přes uložené amplitudy.
+        Formát výsledku je stejný jako u QuantumRegisters.sample_counts.
+        """
+        self.sync()
+        if not self.is_sparse:
+            return self.dense.sample_counts(qubits, shots)
+        probs = np.square(np.abs(self.values), dtype=np.float64)
+        counts = self.rng.multinomial(shots, probs / probs.sum())
+        result = {}
+        for position in np.flatnonzero(counts):
+            index = int(self.indices[position])
+            key = "".join(str((index >> q) & 1) for q in qubits)
+            result[key] = result.get(key, 0) + int(counts[position])
+        return result
+
+    def marginals(self):
+        """Pravděpodobnosti (P(0), P(1)) všech qubitů, tvar (n, 2) - viz QuantumRegisters.marginals"""
+        return cached_by_version(self, "marginals", self._compute_marginals)
+
+    def _compute_marginals(self):
+        if not self.is_sparse:
+            return self.dense.marginals()
+        probs = np.square(np.abs(self.values), dtype=np.float64)
+        # Bity všech uložených indexů naráz: (nnz, n), jeden maticový součin
+        bits = (self.indices[:, None] >> np.arange(self.num_qubits)) & 1
+        ones = (probs @ bits) / probs.sum()
+        return np.stack([1 - ones, ones], axis=1)
+
+    def expectation_z(self, qubits=None):
+        """⟨Z_q⟩ pro zadané qubity (None = všechny), z marginálů"""
+        if qubits is None:
+            qubits = range(self.num_qubits)
+        return z_expectations(self.marginals(), qubits)
+
+    def expectation_zz(self, pairs):
+        """⟨Z_a Z_b⟩ pro seznam dvojic qubitů (viz QuantumRegisters.expectation_zz)"""
+        return np.array([cached_by_version(self, ("zz",) + _pair_key(pair),
+                                           lambda pair=pair: self._compute_zz(*_pair_key(pair)))
+                         for pair in pairs])
+
+    def _compute_zz(self, first, second):
+        if not self.is_sparse:
+            return float(self.dense.expectation_zz([(first, second)])[0])
+        probs = np.square(np.abs(self.values), dtype=np.float64)
+        parity = ((self.indices >> first) ^ (self.indices >> second)) & 1
+        return float(probs @ (1 - 2 * parity) / probs.sum())
+
+    def _outcome_mask(self, qubit, outcome):
+        """Maska uložených amplitud, kde má qubit hodnotu outcome"""
+        return ((self.indices >> qubit) & 1) == outcome
+
+    def get_probability(self, qubit, outcome):
+        """Pravděpodobnost měření konkrétního qubitu"""
+        self.sync()
+        if not self.is_sparse:
+            return self.dense.get_probability(qubit, outcome)
+        kept = self.values[self._outcome_mask(qubit, outcome)]
+        return float(np.sum(np.square(np.abs(kept), dtype=np.float64)))
+
+    def measure(self, qubit):
+        """Změří qubit a vrátí 0 nebo 1"""
+        self.sync()
+        prob_0 = self.get_probability(qubit, 0)
+        outcome = 0 if self.rng.random() < prob_0 else 1
+        prob = prob_0 if outcome == 0 else self.get_probability(qubit, 1)
+        self._collapse_to_outcome(qubit, outcome, prob)
+        return outcome
+
+    def measure_range(self, first, last):
+        """Změří qubity first..last najednou (viz QuantumRegisters.measure_range)"""
+        self.sync()
+        if not self.is_sparse:
+            value = self.dense.measure_range(first, last)
+            self._check_collapse()
+            self.mark_modified()
+            return value
+        width = last - first + 1
+        if first < 0 or last >= self.num_qubits or width < 1:
+            raise ValueError(f"Invalid qubit range {first}..{last}")
+        cumulative = np.cumsum(np.square(np.abs(self.values), dtype=np.float64))
+        position = int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side="right"))
+        position = min(position, self.values.size - 1)
+        mask_bits = (1 << width) - 1
+        value = (int(self.indices[position]) >> first) & mask_bits
+        mask = ((self.indices >> first) & mask_bits) == value
+        kept = self.values[mask]
+        prob = float(np.sum(np.square(np.abs(kept), dtype=np.float64)))
+        self.indices = self.indices[mask]
+        self.values = kept * self.dtype.type(1 / np.sqrt(prob))
+        self.mark_modified()
+        return value
+
+    def measure_all(self):
+        """Změří všechny qubity najednou, vrátí celé číslo"""
+        return self.measure_range(0, self.num_qubits - 1)
+
+    def _collapse_to_outcome(self, qubit, outcome, prob=None):
+        """Kolaps vlnové funkce po měření: zahodí druhou polovinu a přenormuje"""
+        if not self.is_sparse:
+            self.dense._collapse_to_outcome(qubit, outcome, prob)
+            self._check_collapse()
+            self.mark_modified()
+            return
+        if prob is None:
+            prob = self.get_probability(qubit, outcome)
+        if prob > 0:
+            mask = self._outcome_mask(qubit, outcome)
+            self.indices = self.indices[mask]
+            self.values = self.values[mask] * self.dtype.type(1 / np.sqrt(prob))
+            self.mark_modified()
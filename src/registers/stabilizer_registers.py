@@ -0,0 +1,305 @@
+# src/registers/stabilizer_registers.py
+
+from .registers_interface import RegisterInterface
+from .random_source import RandomSource
+from .quantum_registers import (cached_by_version, z_expectations, _pair_key,
+                               DEFAULT_MEMORY_BUDGET, estimate_memory)
+import numpy as np
+
+
+def _g(x1, z1, x2, z2):
+    """Exponent of i when multiplying Pauli (x1,z1) by (x2,z2) - Aaronson & Gottesman"""
+    x1 = x1.astype(np.int8)
+    z1 = z1.astype(np.int8)
+    x2 = x2.astype(np.int8)
+    z2 = z2.astype(np.int8)
+    return np.where(x1 & z1, z2 - x2,
+           np.where(x1 & (1 - z1), z2 * (2 * x2 - 1),
+           np.where((1 - x1) & z1, x2 * (1 - 2 * z2), 0)))
+
+
+class StabilizerTableau:
+    """
+    Stabilizer tableau (CHP): řádky 0..n-1 destabilizátory, n..2n-1
+    stabilizátory (řádek 2n je rezerva pro pomocný výpočet). Paměť O(n²), brány O(n), měření O(n²).
+
+    Fáze r má tvar (2n+1, w): sloupec 0 je konstanta, další sloupce jsou
+    koeficienty náhodných bitů nad GF(2). Při běžné simulaci je w = 1;
+    vzorkování přidá sloupec pro každý náhodný výsledek měření.
+    """
+
+    def __init__(self, num_qubits, width=1):
+        n = num_qubits
+        self.num_qubits = n
+        self.x = np.zeros((2 * n + 1, n), dtype=bool)
+        self.z = np.zeros((2 * n + 1, n), dtype=bool)
+        self.r = np.zeros((2 * n + 1, width), dtype=bool)
+        self.x[np.arange(n), np.arange(n)] = True
+        self.z[n + np.arange(n), np.arange(n)] = True
+
+    def copy(self, width=None):
+        other = StabilizerTableau.__new__(StabilizerTableau)
+        other.num_qubits = self.num_qubits
+        other.x = self.x.copy()
+        other.z = self.z.copy()
+        if width is None:
+            other.r = self.r.copy()
+        else:
+            other.r = np.zeros((self.r.shape[0], width), dtype=bool)
+            other.r[:, :self.r.shape[1]] = self.r
+        return other
+
+    # === Cliffordovy brány (aktualizace sloupců, O(n)) ===
+
+    def h(self, a):
+        self.r[:, 0] ^= self.x[:, a] & self.z[:, a]
+        self.x[:, a], self.z[:, a] = self.z[:, a].copy(), self.x[:, a].copy()
+
+    def s(self, a):
+        self.r[:, 0] ^= self.x[:, a] & self.z[:, a]
+        self.z[:, a] ^= self.x[:, a]
+
+    def cx(self, a, b):
+        self.r[:, 0] ^= self.x[:, a] & self.z[:, b] & ~(self.x[:, b] ^ self.z[:, a])
+        self.x[:, b] ^= self.x[:, a]
+        self.z[:, a] ^= self.z[:, b]
+
+    def x_gate(self, a):
+        self.r[:, 0] ^= self.z[:, a]
+
+    def z_gate(self, a):
+        self.r[:, 0] ^= self.x[:, a]
+
+    def y_gate(self, a):
+        self.r[:, 0] ^= self.x[:, a] ^ self.z[:, a]
+
+    # === Měření ===
+
+    def _rowsum(self, rows, source):
+        """Vynásobí řádky `rows` řádkem `source` (vektorově přes všechny rows)"""
+        phase = _g(self.x[source][None, :], self.z[source][None, :],
+                   self.x[rows], self.z[rows]).sum(axis=1)
+        self.x[rows] ^= self.x[source]
+        self.z[rows] ^= self.z[source]
+        self.r[rows] ^= self.r[source]
+        self.r[rows, 0] ^= (phase % 4) == 2
+
+    def random_row(self, a):
+        """Stabilizátor antikomutující se Z_a, nebo None (výsledek je deterministický)"""
+        n = self.num_qubits
+        hits = np.flatnonzero(self.x[n:2 * n, a])
+        return n + int(hits[0]) if hits.size else None
+
+    def collapse_random(self, a, p, outcome_bits):
+        """Kolaps pro náhodné měření; outcome_bits je nový řádek fáze řádku p"""
+        n = self.num_qubits
+        rows = np.flatnonzero(self.x[:2 * n, a])
+        rows = rows[rows != p]
+        if rows.size:
+            self._rowsum(rows, p)
+        self.x[p - n] = self.x[p]
+        self.z[p - n] = self.z[p]
+        self.r[p - n] = self.r[p]
+        self.x[p] = False
+        self.z[p] = False
+        self.z[p, a] = True
+        self.r[p] = outcome_bits
+
+    def deterministic_outcome(self, a):
+        """Fáze výsledku deterministického měření (řádek r, sloupec 0 = hodnota)"""
+        n = self.num_qubits
+        rows = n + np.flatnonzero(self.x[:n, a])
+        # Součin stabilizátorů `rows`: mezisoučiny jsou kumulativní XOR, takže
+        # fáze všech násobení se spočítají najednou místo rowsum po řádcích
+        x = self.x[rows]
+        z = self.z[rows]
+        prefix_x = np.zeros_like(x)
+        prefix_z = np.zeros_like(z)
+        np.logical_xor.accumulate(x[:-1], axis=0, out=prefix_x[1:])
+        np.logical_xor.accumulate(z[:-1], axis=0, out=prefix_z[1:])
+        phase = int(_g(x, z, prefix_x, prefix_z).sum())
+        result = np.logical_xor.reduce(self.r[rows], axis=0)
+        result[0] ^= (phase % 4) == 2
+        return result
+
+
+class StabilizerRegisters(RegisterInterface):
+    """
+    Kvantové registry pro Cliffordovské obvody (h, x, y, z, s, cx, cz, cy,
+    swap, measure, reset). Stav drží stabilizer tableau místo 2**n amplitud,
+    takže zvládne stovky qubitů.
+    """
+
+    def __init__(self, num_qubits=8, rng=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        num_qubits: počet qubitů
+        rng: RandomSource pro měření (None = vlastní s náhodným seedem)
+        memory_budget: limit bajtů pro hustý export get_full_state() (None = bez omezení)
+        """
+        if num_qubits < 1:
+            raise ValueError("StabilizerRegisters need at least 1 qubit")
+        self.num_qubits = num_qubits
+        self.rng = rng if rng is not None else RandomSource()
+        self.memory_budget = memory_budget
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        """Reset všech qubitů do |00...0⟩"""
+        self.tableau = StabilizerTableau(self.num_qubits)
+        self.mark_modified()
+
+    def mark_modified(self):
+        """Zaznamená změnu stavu (zvýší čítač verzí)"""
+        self.version += 1
+
+    def get(self, idx):
+        """Vrátí popis stavu qubitu (nelze přímo číst kvantový stav)"""
+        return f"qubit_{idx}"
+
+    def set(self, idx, value):
+        """Nastavení qubitu do základního stavu (projekce jako u stavového vektoru)"""
+        self._measure(idx, forced=value)
+
+    def get_full_state(self):
+        """Hustý stavový vektor (až na globální fázi), jen pokud se vejde do limitu paměti"""
+        return cached_by_version(self, "full_state", self._compute_full_state).copy()
+
+    def probabilities(self):
+        """Pravděpodobnosti všech bázových stavů (|amplituda|², normované)"""
+        probs = np.square(np.abs(self.get_full_state()), dtype=np.float64)
+        return probs / probs.sum()
+
+    def _compute_full_state(self):
+        # Stav je jediný vektor stabilizovaný všemi S_i: projektory (I + S_i)/2
+        # aplikované na libovolný vektor s nenulovým překryvem dají tento stav.
+        n = self.num_qubits
+        required = estimate_memory(n, "double")
+        if self.memory_budget is not None and required > self.memory_budget:
+            raise RuntimeError(
+                f"Exporting {n} stabilizer qubits as a statevector needs {required / 1024**2:.1f} MiB, "
+                f"over the memory budget of {self.memory_budget / 1024**2:.1f} MiB"
+            )
+        tab = self.tableau
+        index = np.arange(2**n)
+        noise = np.random.default_rng(0)
+        state = noise.standard_normal(2**n) + 1j * noise.standard_normal(2**n)
+        for row in range(n, 2 * n):
+            xs = np.flatnonzero(tab.x[row])
+            zs = np.flatnonzero(tab.z[row])
+            xmask = int(np.sum(1 << xs.astype(np.int64)))
+            # P = (-1)^r i^{#Y} X^x Z^z, protože Y = iXZ
+            phase = (-1) ** int(tab.r[row, 0]) * 1j ** int(np.count_nonzero(tab.x[row] & tab.z[row]))
+            source = index ^ xmask
+            parity = np.zeros(2**n, dtype=np.int64)
+            for qubit in zs:
+                parity ^= (source >> qubit) & 1
+            state = (state + phase * (1 - 2 * parity) * state[source]) / 2
+        state /= np.linalg.norm(state)
+        # Globální fáze: první nenulová amplituda reálná a kladná
+        first = state[np.flatnonzero(np.abs(state) > 1e-12)[0]]
+        return state * (abs(first) / first)
+
+    def get_probability(self, qubit, outcome):
+        """Pravděpodobnost měření: 1/2 pro náhodný výsledek, jinak 0 nebo 1"""
+        if self.tableau.random_row(qubit) is not None:
+            return 0.5
+        value = int(self.tableau.deterministic_outcome(qubit)[0])
+        return 1.0 if value == outcome else 0.0
+
+    def marginals(self):
+        """Pravděpodobnosti (P(0), P(1)) všech qubitů, tvar (n, 2): 1/2 nebo 0/1"""
+        return cached_by_version(self, "marginals", self._compute_marginals)
+
+    def _compute_marginals(self):
+        ones = np.array([self.get_probability(qubit, 1) for qubit in range(self.num_qubits)])
+        return np.stack([1 - ones, ones], axis=1)
+
+    def expectation_z(self, qubits=None):
+        """⟨Z_q⟩ pro zadané qubity (None = všechny), z marginálů"""
+        if qubits is None:
+            qubits = range(self.num_qubits)
+        return z_expectations(self.marginals(), qubits)
+
+    def expectation_zz(self, pairs):
+        """⟨Z_a Z_b⟩ pro seznam dvojic qubitů: 0 nebo ±1"""
+        return np.array([cached_by_version(self, ("zz",) + _pair_key(pair),
+                                           lambda pair=pair: self._compute_zz(*_pair_key(pair)))
+                         for pair in pairs])
+
+    def _compute_zz(self, first, second):
+        if first == second:
+            return 1.0
+        # CX(a, b) převede Z_a Z_b na Z_b: ⟨Z_a Z_b⟩ stavu = ⟨Z_b⟩ stavu po CX
+        tableau = self.tableau
+        tableau.cx(first, second)
+        try:
+            if tableau.random_row(second) is not None:
+                return 0.0
+            return -1.0 if tableau.deterministic_outcome(second)[0] else 1.0
+        finally:
+            tableau.cx(first, second)
+
+    def measure(self, qubit):
+        """Změří qubit a vrátí 0 nebo 1"""
+        return self._measure(qubit)
+
+    def measure_range(self, first, last):
+        """
+        Změří qubity first..last a vrátí jejich hodnotu jako celé číslo
+        (qubit first = nejnižší bit). Tableau měří po qubitech - každé
+        měření je jen O(n²).
+        """
+        if first < 0 or last >= self.num_qubits or last < first:
+            raise ValueError(f"Invalid qubit range {first}..{last}")
+        value = 0
+        for qubit in range(first, last + 1):
+            value |= self._measure(qubit) << (qubit - first)
+        return value
+
+    def measure_all(self):
+        """Změří všechny qubity, vrátí celé číslo"""
+        return self.measure_range(0, self.num_qubits - 1)
+
+    def _measure(self, qubit, forced=None):
+        tableau = self.tableau
+        p = tableau.random_row(qubit)
+        if p is None:
+            return int(tableau.deterministic_outcome(qubit)[0])
+        if forced is None:
+            outcome = 0 if self.rng.random() < 0.5 else 1
+        else:
+            outcome = int(forced)
+        bits = np.zeros(tableau.r.shape[1], dtype=bool)
+        bits[0] = outcome
+        tableau.collapse_random(qubit, p, bits)
+        self.mark_modified()
+        return outcome
+
+    def sample_counts(self, qubits, shots):
+        """
+        Navzorkuje `shots` měření zadaných qubitů bez kolapsu stavu.
+
+        Měření se provede jednou symbolicky: každý náhodný výsledek je nová
+        proměnná nad GF(2) a ostatní výsledky jsou její afinní funkce.
+        Všechny vzorky pak vzniknou jedním maticovým součinem náhodných bitů.
+        """
+        tableau = self.tableau.copy(width=1 + len(qubits))
+        outcomes = []
+        variables = 0
+        for qubit in qubits:
+            p = tableau.random_row(qubit)
+            if p is None:
+                outcomes.append(tableau.deterministic_outcome(qubit))
+            else:
+                variables += 1
+                bits = np.zeros(tableau.r.shape[1], dtype=bool)
+                bits[variables] = True
+                tableau.collapse_random(qubit, p, bits)
+                outcomes.append(bits)
+        affine = np.array(outcomes, dtype=np.uint8)[:, :1 + variables]     # (k, 1+V)
+        draws = self.rng.bits((shots, variables))
+        values = (affine[:, 0][None, :] + draws @ affine[:, 1:].T.astype(np.int64)) & 1
+
+        keys, counts = np.unique(values, axis=0, return_counts=True)
+        return {"".join(str(int(b)) for b in key): int(count) for key, count in zip(keys, counts)}